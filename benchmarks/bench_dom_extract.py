@@ -0,0 +1,170 @@
+"""Round-trip benchmark for dom_extract against element-by-element WebDriver reads
+
+Usage:
+    python benchmarks/bench_dom_extract.py [--rows N] [--repeat N] [--site italy|macedonia|korea]
+
+A synthetic list page shaped like each site's table is loaded into headless Chrome.
+The rows are then read the way the scrapers used to (find_element and .text per
+field or cell) and with a single extract_rows call. The WebDriver commands sent and
+the wall time of both are printed, along with whether they returned the same data.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+
+from dom_extract import extract_cells, extract_rows
+import italy_scrapper
+import macedonia_scrapper
+
+
+def italy_page(rows):
+    row = """
+<div class="listVetrina col-sm-12 nopadding ng-scope">
+  <div class="stato borderElenco nopadding col-sm-1"><p class="regular-14">{i}</p></div>
+  <div class="borderElenco"><p class="semibold semibold-16-sm ellipsis"><a class="ng-binding" href="/dettaglio/{i}">Fornitura di servizi {i}</a></p></div>
+  <div class="listaCatIniz"><div class="regular responsiveText16"><strong>Area {i}</strong></div></div>
+  <div class="stato borderElenco nopadding col-sm-2"><div style="font-size:12px">Ente {i}</div></div>
+  <div class="stato borderElenco nopadding col-sm-2 col-md-1"><div class="regular-14">{i}0.000 EUR</div></div>
+  <div class="stato borderElenco nopadding"><div class="hidden-sm hidden-md">01/07/2025</div></div>
+  <div class="stato nopadding noBorderElenco"><div class="hidden-sm hidden-md">02/08/2025 12:00</div></div>
+</div>"""
+    return "".join(row.format(i=i) for i in range(rows))
+
+
+def macedonia_page(rows):
+    row = """
+<tr class="MuiTableRow-root"><th class="MuiTableCell-body"><a href="/tender/{i}">{i}/2025</a></th>
+<td class="MuiTableCell-body">Authority {i}</td><td class="MuiTableCell-body">Subject {i}</td>
+<td class="MuiTableCell-body">Goods</td><td class="MuiTableCell-body">01.07.2025</td>
+<td class="MuiTableCell-body">02.08.2099 12:00</td></tr>"""
+    body = "".join(row.format(i=i) for i in range(rows))
+    return f'<div class="MuiTableContainer-root"><table><tbody>{body}</tbody></table></div>'
+
+
+def korea_page(rows):
+    cells = "".join(f"<td>cell {{i}}-{column}</td>" for column in range(12))
+    body = "".join(f"<tr>{cells.format(i=i)}</tr>" for i in range(rows))
+    return f'<table id="mf_gridView1_body_table">{body}</table>'
+
+
+def legacy_italy(driver):
+    """STEP 1 as it was: one find_element and one .text per field"""
+    records = []
+    for row in driver.find_elements(By.CSS_SELECTOR, italy_scrapper.ROW_SELECTOR):
+        record = {}
+        for name, (selector, kind) in italy_scrapper.ROW_FIELDS.items():
+            element = row.find_element(By.CSS_SELECTOR, selector)
+            record[name] = element.text.strip() if kind == 'text' else element.get_attribute(kind)
+        records.append(record)
+    return records
+
+
+def bulk_italy(driver):
+    return extract_rows(driver, italy_scrapper.ROW_SELECTOR, italy_scrapper.ROW_FIELDS)
+
+
+def legacy_macedonia(driver):
+    container = driver.find_element(By.CSS_SELECTOR, "div.MuiTableContainer-root")
+    records = []
+    for row in container.find_elements(By.CSS_SELECTOR, "tbody tr.MuiTableRow-root"):
+        number_cell = row.find_element(By.CSS_SELECTOR, "th.MuiTableCell-body")
+        link = number_cell.find_element(By.TAG_NAME, "a").get_attribute('href')
+        cells = row.find_elements(By.CSS_SELECTOR, "td.MuiTableCell-body")
+        records.append({'number': number_cell.text.strip(), 'link': link,
+                        'cells': [cell.text.strip() for cell in cells]})
+    return records
+
+
+def bulk_macedonia(driver):
+    return extract_rows(driver, "tbody tr.MuiTableRow-root", macedonia_scrapper.ROW_FIELDS,
+                        "div.MuiTableContainer-root")
+
+
+def legacy_korea(driver):
+    table = driver.find_element(By.XPATH, "//table[contains(@id, 'gridView1_body_table')]")
+    return [[col.text for col in row.find_elements(By.TAG_NAME, "td")]
+            for row in table.find_elements(By.TAG_NAME, "tr")]
+
+
+def bulk_korea(driver):
+    return extract_cells(driver, "tr", "td", "table[id*='gridView1_body_table']")
+
+
+SITES = {
+    'italy': (italy_page, legacy_italy, bulk_italy),
+    'macedonia': (macedonia_page, legacy_macedonia, bulk_macedonia),
+    'korea': (korea_page, legacy_korea, bulk_korea),
+}
+
+
+def count_commands(driver):
+    """Wrap driver.execute so every WebDriver command is counted"""
+    counter = {'commands': 0}
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter['commands'] += 1
+        return execute(*args, **kwargs)
+    driver.execute = counting_execute
+    return counter
+
+
+def run(driver, counter, func, repeat):
+    """Return the best wall time, the commands of one pass and the result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        counter['commands'] = 0
+        start = time.perf_counter()
+        result = func(driver)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, counter['commands'], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100, help="Rows on the synthetic page")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes per implementation (best is reported)")
+    parser.add_argument('--site', choices=sorted(SITES), action='append', help="Site layouts to test (default: all)")
+    args = parser.parse_args()
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    driver = webdriver.Chrome(options=options)
+    counter = count_commands(driver)
+    try:
+        print(f"{'site':<10} {'implementation':<14} {'commands':>9} {'seconds':>9} {'ms/row':>8}")
+        for site in args.site or sorted(SITES):
+            make_page, legacy, bulk = SITES[site]
+            with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+                f.write(f"<html><body>{make_page(args.rows)}</body></html>")
+            try:
+                driver.get(f"file://{f.name}")
+                timings = {}
+                for name, func in (('element-wise', legacy), ('bulk', bulk)):
+                    elapsed, commands, result = run(driver, counter, func, args.repeat)
+                    timings[name] = (elapsed, result)
+                    print(f"{site:<10} {name:<14} {commands:>9} {elapsed:>9.3f} "
+                          f"{elapsed / args.rows * 1000:>8.2f}")
+            finally:
+                os.unlink(f.name)
+            (legacy_time, legacy_result), (bulk_time, bulk_result) = timings['element-wise'], timings['bulk']
+            same = "same data" if legacy_result == bulk_result else "DIFFERENT data"
+            print(f"{site:<10} speedup {legacy_time / bulk_time:.1f}x, {same}")
+    finally:
+        driver.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
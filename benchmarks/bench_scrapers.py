@@ -0,0 +1,336 @@
+"""End-to-end extraction benchmark of every scraper against saved pages, offline
+
+Usage:
+    python benchmarks/bench_scrapers.py [--site italy|japan|macedonia|korea] [--repeat N]
+                                        [--pages N] [--revalidate] [--save-baseline] [--tolerance 0.25] [--json]
+
+The snapshots in benchmarks/fixtures (an acquistinretepa.it RDO list, a JETRO list and
+detail page, the e-pazar MUI table and the g2b bid grid) are served by a local HTTP
+server, so nothing leaves the machine. Each scraper's own extraction path runs against
+them, from loading the list to writing its records, with translation answered by the
+offline StubBackend. Per site the rows/sec of the best of --repeat passes, the lowest
+peak Python memory of --repeat traced passes and the per-stage breakdown of
+metrics.Metrics are reported.
+
+The results are compared with benchmarks/baseline.json, written by --save-baseline on
+the same machine: a site whose rows/sec dropped by more than --tolerance, whose peak
+memory grew by more than --memory-tolerance, or which produced a different number of
+rows, is a regression and the exit code is 1. Japan reads its pages over HTTP; the other sites need headless Chrome
+and are skipped when it cannot be started.
+
+With --revalidate the server sends an ETag and Last-Modified with every page and answers
+matching conditional requests with 304, and the detail cache is kept from one pass to
+the next, so the passes after the first measure the revalidation path of detail_cache.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detail_cache
+import page_archive
+import translation_engine
+from detail_cache import DetailCache
+from metrics import get_metrics, reset_metrics
+from output_sink import RecordSink
+from seen_index import SeenIndex
+from translation_cache import TranslationCache
+from translation_engine import StubBackend, TranslationEngine
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+KOREA_SCROLL_ID = "mf_wfm_container_tacBidPbancLst_contents_tab2_body_gridView1_scrollY_div"
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    fixtures = {}
+    for name in os.listdir(fixture_dir):
+        if name.endswith('.html'):
+            with open(os.path.join(fixture_dir, name), 'rb') as f:
+                fixtures[name] = f.read()
+    return fixtures
+
+
+def fixture_name(path):
+    """/japan/list.html -> japan_list.html; /<site>/detail/<anything> -> <site>_detail.html"""
+    parts = [part for part in urlsplit(path).path.split('/') if part]
+    if len(parts) >= 2 and parts[1] == 'detail':
+        return f"{parts[0]}_detail.html"
+    name = '_'.join(parts)
+    return name if name.endswith('.html') else f"{name}.html"
+
+
+# Last-Modified sent with every fixture when validators are on
+FIXTURE_LAST_MODIFIED = "Tue, 01 Jul 2025 00:00:00 GMT"
+
+
+def start_server(fixtures, validators=False):
+    """Serve the fixtures from memory on a free local port; returns the server and its base URL
+
+    With validators, pages carry an ETag and Last-Modified, and a request presenting
+    either one gets an empty 304.
+    """
+    etags = {name: f'"{hashlib.sha256(body).hexdigest()[:16]}"' for name, body in fixtures.items()}
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        # Keep-alive like the portals, so pooled connections are reused after a body-less 304
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            name = fixture_name(self.path)
+            body = fixtures.get(name)
+            if body is None:
+                self.send_error(404)
+                return
+            if validators and (self.headers.get('If-None-Match') == etags[name]
+                               or self.headers.get('If-Modified-Since') == FIXTURE_LAST_MODIFIED):
+                self.send_response(304)
+                self.send_header('ETag', etags[name])
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if validators:
+                self.send_header('ETag', etags[name])
+                self.send_header('Last-Modified', FIXTURE_LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stub_translation():
+    """Install a fresh offline engine with an empty in-memory cache, so every pass translates"""
+    translation_engine._engine = TranslationEngine(backend=StubBackend(), cache=TranslationCache(path=None))
+
+
+def bench_italy(context):
+    import italy_scrapper
+
+    driver = context['driver']
+    driver.get(f"{context['base_url']}/italy/list.html")
+    tenders = italy_scrapper.extract_tender_details(driver, SeenIndex(':memory:'), incremental=False)
+    italy_scrapper.save_tenders(context['sink']('italy'), tenders, 1)
+    return len(tenders)
+
+
+def bench_japan(context):
+    import japan_scrapper
+    from driver_pool import DriverPool
+
+    base_url = f"{context['base_url']}/japan/list.html?type="
+    pages = context['pages']
+    sink = context['sink']('japan')
+    list_pages = japan_scrapper.fetch_list_pages(1, pages, base_url=base_url)
+    # Every page is read over HTTP, so the pool never starts a browser
+    with DriverPool(size=1) as pool:
+        japan_scrapper.scrape_page_range(pool, 1, pages, list_pages, base_url, SeenIndex(':memory:'), sink,
+                                         incremental=False)
+    return sink.count
+
+
+def bench_macedonia(context):
+    import macedonia_scrapper
+
+    driver = context['driver']
+    driver.get(f"{context['base_url']}/macedonia/list.html")
+    tenders, _ = macedonia_scrapper.extract_table_data(driver, SeenIndex(':memory:'), incremental=False)
+    macedonia_scrapper.save_tenders(context['sink']('macedonia'), tenders, 1)
+    return len(tenders)
+
+
+def bench_korea(context):
+    import southkorea_scrapper
+    from grid_harvester import GridHarvester
+
+    driver = context['driver']
+    driver.get(f"{context['base_url']}/korea/grid.html")
+    harvester = GridHarvester(driver, KOREA_SCROLL_ID, "table[id*='gridView1_body_table'] tr", key_column=5,
+                              total_rows=southkorea_scrapper.read_total_count(driver),
+                              namespace="bench")
+    rows = [row for new_rows in harvester.harvest() for row in new_rows]
+    sink = context['sink']('south_korea')
+    southkorea_scrapper.process_and_save_data(rows, 0, len(rows), SeenIndex(':memory:'), sink, incremental=False)
+    return sink.count
+
+
+# Site -> (benchmark, whether it needs the browser)
+CASES = {
+    'italy': (bench_italy, True),
+    'japan': (bench_japan, False),
+    'macedonia': (bench_macedonia, True),
+    'korea': (bench_korea, True),
+}
+
+
+def run_pass(func, context, output_dir):
+    """One quiet pass with fresh metrics, translation and sink; returns (seconds, rows, stages)"""
+    reset_metrics()
+    stub_translation()
+    if not context['revalidate']:
+        detail_cache._cache = DetailCache(':memory:')
+    # Pages are archived as in a real run, but under the temporary directory
+    page_archive._archive = page_archive.PageArchive(os.path.join(output_dir, 'archive'))
+    sinks = []
+
+    def make_sink(name):
+        sinks.append(RecordSink(name, output_dir, durable=False))
+        return sinks[-1]
+
+    context = dict(context, sink=make_sink)
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            rows = func(context)
+            elapsed = time.perf_counter() - start
+    finally:
+        for sink in sinks:
+            sink.close()
+    stages = {stage: {'count': entry['count'], 'total': entry['total']}
+              for stage, entry in get_metrics().report()['stages'].items()}
+    return elapsed, rows, stages
+
+
+def bench_site(site, context, repeat, output_dir):
+    func, _ = CASES[site]
+    # Revalidation passes share one cache per site; otherwise each pass starts empty
+    detail_cache._cache = DetailCache(':memory:')
+    best = None
+    for _ in range(repeat):
+        elapsed, rows, stages = run_pass(func, context, output_dir)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, rows, stages)
+    elapsed, rows, stages = best
+
+    # Allocation tracing slows a pass down, so memory is measured on separate passes; the
+    # smallest peak is kept because worker threads overlap their downloads differently each time
+    peak = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        try:
+            run_pass(func, context, output_dir)
+            pass_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        peak = pass_peak if peak is None else min(peak, pass_peak)
+
+    return {
+        'rows': rows,
+        'seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed else 0.0,
+        'peak_kb': round(peak / 1024, 1),
+        'stages': stages,
+    }
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Regressions of results against baseline, as readable lines"""
+    regressions = []
+    for site, result in results.items():
+        expected = baseline.get(site)
+        if not expected:
+            continue
+        if result['rows'] != expected['rows']:
+            regressions.append(f"{site}: {result['rows']} rows, baseline {expected['rows']}")
+        if result['rows_per_sec'] < expected['rows_per_sec'] * (1 - tolerance):
+            regressions.append(f"{site}: {result['rows_per_sec']} rows/sec, baseline {expected['rows_per_sec']}")
+        if result['peak_kb'] > expected['peak_kb'] * (1 + memory_tolerance):
+            regressions.append(f"{site}: peak {result['peak_kb']} KB, baseline {expected['peak_kb']} KB")
+    return regressions
+
+
+def start_browser():
+    """Headless Chrome as the scrapers start it, or None if it cannot be started"""
+    try:
+        from driver_pool import create_driver
+
+        return create_driver(headless=True)
+    except Exception as e:
+        print(f"Could not start headless Chrome, skipping the browser sites: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--site', choices=sorted(CASES), action='append', help="Sites to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per site (best is reported)")
+    parser.add_argument('--pages', type=int, default=3, help="JETRO list pages read per pass")
+    parser.add_argument('--revalidate', action='store_true',
+                        help="Serve ETag/Last-Modified and keep the detail cache across passes")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file to compare with or save to")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative drop in rows/sec")
+    parser.add_argument('--memory-tolerance', type=float, default=0.5,
+                        help="Allowed relative growth in peak memory")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args()
+
+    sites = args.site or sorted(CASES)
+    server, base_url = start_server(load_fixtures(), validators=args.revalidate)
+    driver = start_browser() if any(CASES[site][1] for site in sites) else None
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            context = {'base_url': base_url, 'driver': driver, 'pages': args.pages, 'revalidate': args.revalidate}
+            for site in sites:
+                if CASES[site][1] and driver is None:
+                    continue
+                results[site] = bench_site(site, context, args.repeat, output_dir)
+    finally:
+        if driver is not None:
+            driver.quit()
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'site':<10} {'rows':>6} {'seconds':>9} {'rows/sec':>10} {'peak KB':>9}  stages (s)")
+        for site, result in results.items():
+            stages = ', '.join(f"{stage} {entry['total']:.3f}" for stage, entry in result['stages'].items())
+            print(f"{site:<10} {result['rows']:>6} {result['seconds']:>9.3f} {result['rows_per_sec']:>10.1f} "
+                  f"{result['peak_kb']:>9.1f}  {stages}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        # Sites not run this time keep their stored numbers
+        baseline.update({site: {key: result[key] for key in ('rows', 'rows_per_sec', 'peak_kb')}
+                         for site, result in results.items()})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}, memory {args.memory_tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
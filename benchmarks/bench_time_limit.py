@@ -0,0 +1,217 @@
+"""Micro-benchmark for japan_scrapper.extract_time_limit
+
+Usage:
+    python benchmarks/bench_time_limit.py CORPUS_DIR [--repeat N]
+
+CORPUS_DIR holds saved JETRO notice pages (*.html). Every summary cell the scraper
+would inspect is run through the current extractor and through the previous
+pattern-by-pattern implementation, and the throughput of both is printed.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from japan_scrapper import DETAIL_SELECTORS, extract_time_limit, standardize_datetime
+
+
+def legacy_extract_time_limit(text):
+    """extract_time_limit as it was before the patterns were precompiled, kept for comparison"""
+    time_limits = []
+    
+    # Clean the text by removing unnecessary HTML tags and normalizing spaces
+    text = re.sub(r'<(?!br|/br)[^>]+>', ' ', text)  # Keep <br> tags for splitting
+    text = re.sub(r'\s+', ' ', text)
+    
+    # Split text by <br> tags to process line by line
+    lines = re.split(r'<br\s*/?>', text)
+    
+    # First look for comment submission deadline in the specific format
+    comment_patterns = [
+        (r'[⑴-⑽]\s*Time\s*limit\s*for\s*(?:the\s*)?submission\s*of\s*comments\s*:\s*([^<>\n]+)', 'Comment Submission'),
+        (r'[⑴-⑽]\s*Comment\s*deadline\s*:\s*([^<>\n]+)', 'Comment Deadline'),
+        (r'[⑴-⑽]\s*Comments\s*due\s*by\s*:\s*([^<>\n]+)', 'Comments Due'),
+        (r'[⑴-⑽]\s*Comment\s*period\s*(?:ends|closes)\s*:\s*([^<>\n]+)', 'Comment Period End')
+    ]
+    
+    for line in lines:
+        for pattern, label in comment_patterns:
+            comment_match = re.search(pattern, line, re.IGNORECASE)
+            if comment_match:
+                comment_deadline = comment_match.group(1).strip()
+                if comment_deadline and comment_deadline.lower() != 'none':
+                    # Standardize the date/time format
+                    formatted_deadline = standardize_datetime(comment_deadline)
+                    time_limits.append(f"{label}: {formatted_deadline}")
+    
+    # Pattern to match time-limit for the tender entries
+    tender_patterns = [
+        # Electronic bidding patterns
+        (r'[⑴-⑽]\s*Term\s*for\s*(?:the\s*)?submission\s*of\s*tenders?\s*by\s*electronic\s*bidding\s*system[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+        (r'[⑴-⑽]\s*Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+        (r'[⑴-⑽]\s*E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+        (r'[⑴-⑽]\s*Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+        
+        # Specific tender submission patterns
+        (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Mailing\)[^:]*:\s*([^<>\n]+)', 'Tender (Mailing)'),
+        (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Bringing\)[^:]*:\s*([^<>\n]+)', 'Tender (Bringing)'),
+        (r'[⑴-⑽]\s*Time-limit\s*for\s*(?:tender|submission|application)[^:]*:\s*([^<>\n]+)', 'Tender'),
+        (r'[⑴-⑽]\s*Time-limit\s*for\s*receipt\s*of\s*tenders[^:]*:\s*([^<>\n]+)', 'Tender Receipt'),
+        (r'[⑴-⑽]\s*Time-limit\s*for\s*submission[^:]*:\s*([^<>\n]+)', 'Submission'),
+        (r'[⑴-⑽]\s*Due\s*date[^:]*:\s*([^<>\n]+)', 'Due Date'),
+        
+        # Specific date patterns
+        (r'[⑴-⑽]\s*Submission\s*deadline[^:]*:\s*([^<>\n]+)', 'Submission Deadline'),
+        (r'[⑴-⑽]\s*Application\s*deadline[^:]*:\s*([^<>\n]+)', 'Application Deadline'),
+        (r'[⑴-⑽]\s*Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing Date'),
+        (r'[⑴-⑽]\s*Expiration\s*date[^:]*:\s*([^<>\n]+)', 'Expiration Date'),
+        (r'[⑴-⑽]\s*Tender\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Tender Closing Date'),
+        (r'[⑴-⑽]\s*Bid\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Bid Closing Date'),
+        
+        # Specific time patterns
+        (r'[⑴-⑽]\s*Time\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender Time'),
+        (r'[⑴-⑽]\s*Time\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission Time'),
+        (r'[⑴-⑽]\s*Time\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing Time'),
+        (r'[⑴-⑽]\s*Tender\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Tender Closing Time'),
+        (r'[⑴-⑽]\s*Bid\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Bid Closing Time'),
+        
+        # Combined date and time patterns
+        (r'[⑴-⑽]\s*Deadline\s*for\s*(?:tender|submission)[^:]*:\s*([^<>\n]+)', 'Tender Deadline'),
+        (r'[⑴-⑽]\s*Final\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Final Date/Time'),
+        (r'[⑴-⑽]\s*Last\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Last Date/Time'),
+        (r'[⑴-⑽]\s*Tender\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender Date/Time'),
+        (r'[⑴-⑽]\s*Bid\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid Date/Time')
+    ]
+    
+    # Look for tender time limits
+    for line in lines:
+        for pattern, label in tender_patterns:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                time_limit = match.group(1).strip()
+                if time_limit and time_limit.lower() != 'none':
+                    # Standardize the date/time format
+                    formatted_time_limit = standardize_datetime(time_limit)
+                    time_limits.append(f"{label}: {formatted_time_limit}")
+    
+    # If no specific time limits found, try broader patterns
+    if not time_limits:
+        broader_patterns = [
+            # Electronic bidding patterns
+            (r'Term\s*for\s*(?:the\s*)?submission\s*(?:of\s*tenders?)?\s*by\s*electronic\s*bidding[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+            (r'Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+            (r'E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+            (r'Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Online submission'),
+            
+            # General time limit patterns
+            (r'Time-limit[^:]*:\s*([^<>\n]+)', 'Time-limit'),
+            (r'Deadline[^:]*:\s*([^<>\n]+)', 'Deadline'),
+            (r'Due\s*date[^:]*:\s*([^<>\n]+)', 'Due date'),
+            (r'Submission\s*date[^:]*:\s*([^<>\n]+)', 'Submission date'),
+            
+            # Additional date patterns
+            (r'Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing date'),
+            (r'End\s*date[^:]*:\s*([^<>\n]+)', 'End date'),
+            (r'Expiry\s*date[^:]*:\s*([^<>\n]+)', 'Expiry date'),
+            (r'Tender\s*date[^:]*:\s*([^<>\n]+)', 'Tender date'),
+            (r'Bid\s*date[^:]*:\s*([^<>\n]+)', 'Bid date'),
+            
+            # Additional time patterns
+            (r'Closing\s*time[^:]*:\s*([^<>\n]+)', 'Closing time'),
+            (r'End\s*time[^:]*:\s*([^<>\n]+)', 'End time'),
+            (r'Final\s*time[^:]*:\s*([^<>\n]+)', 'Final time'),
+            (r'Tender\s*time[^:]*:\s*([^<>\n]+)', 'Tender time'),
+            (r'Bid\s*time[^:]*:\s*([^<>\n]+)', 'Bid time'),
+            
+            # Date/time combinations
+            (r'(?:Date|Time)\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission date/time'),
+            (r'(?:Date|Time)\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing date/time'),
+            (r'(?:Date|Time)\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender date/time'),
+            (r'(?:Date|Time)\s*of\s*bid[^:]*:\s*([^<>\n]+)', 'Bid date/time'),
+            
+            # Additional combinations
+            (r'Tender\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender closing'),
+            (r'Bid\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid closing'),
+            (r'Submission\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Submission closing')
+        ]
+        
+        for line in lines:
+            for pattern, label in broader_patterns:
+                match = re.search(pattern, line, re.IGNORECASE)
+                if match:
+                    time_limit = match.group(1).strip()
+                    if time_limit and time_limit.lower() != 'none':
+                        # Standardize the date/time format
+                        formatted_time_limit = standardize_datetime(time_limit)
+                        time_limits.append(f"{label}: {formatted_time_limit}")
+    
+    if time_limits:
+        # Remove duplicates while preserving order
+        unique_limits = []
+        for limit in time_limits:
+            if limit not in unique_limits:
+                unique_limits.append(limit)
+        return " | ".join(unique_limits)
+    
+    return "Not specified"
+
+
+def load_cells(corpus_dir):
+    """Collect the innerHTML of every cell the detail parser would scan"""
+    cells = []
+    paths = sorted(glob.glob(os.path.join(corpus_dir, '**', '*.htm*'), recursive=True))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        for selector in DETAIL_SELECTORS:
+            cells.extend(cell.decode_contents() for cell in soup.select(selector))
+    return paths, [cell for cell in cells if cell]
+
+
+def run(func, cells, repeat):
+    """Return the best wall time over several passes and the results of the last one"""
+    best = None
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(cell) for cell in cells]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus_dir', help="Directory of saved JETRO notice HTML")
+    parser.add_argument('--repeat', type=int, default=5, help="Passes per implementation (best is reported)")
+    args = parser.parse_args()
+
+    paths, cells = load_cells(args.corpus_dir)
+    if not cells:
+        print(f"No notice cells found under {args.corpus_dir}")
+        return 1
+    total_chars = sum(len(cell) for cell in cells)
+    print(f"Corpus: {len(paths)} pages, {len(cells)} cells, {total_chars / 1024:.0f} KiB")
+
+    legacy_time, legacy_results = run(legacy_extract_time_limit, cells, args.repeat)
+    current_time, current_results = run(extract_time_limit, cells, args.repeat)
+
+    print(f"{'implementation':<12} {'seconds':>10} {'cells/s':>12} {'MiB/s':>8}")
+    for name, elapsed in (('legacy', legacy_time), ('compiled', current_time)):
+        print(f"{name:<12} {elapsed:>10.4f} {len(cells) / elapsed:>12.0f} "
+              f"{total_chars / elapsed / 1024 / 1024:>8.2f}")
+    print(f"Speedup: {legacy_time / current_time:.1f}x")
+
+    differing = sum(1 for old, new in zip(legacy_results, current_results) if old != new)
+    print(f"Cells with a different result: {differing}/{len(cells)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Local stub server that answers a recorded list endpoint from saved response fixtures
+
+Usage:
+    python benchmarks/fixture_server.py SPEC FIXTURE_DIR [--port 8765]
+
+SPEC is a saved endpoint (e.g. tenders/g2b_endpoint.json) and FIXTURE_DIR holds
+page_N.json responses, as written by southkorea_scrapper.main(fixture_dir=...).
+Each request is mapped back to its page number through the recorded paging
+parameters; pages without a fixture come back with an empty record list. Point
+a scraper at it with main(endpoint_url="http://127.0.0.1:8765").
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from request_recorder import ReplayableRequest, get_path
+
+
+def load_fixtures(fixture_dir):
+    pages = {}
+    for name in os.listdir(fixture_dir):
+        if name.startswith('page_') and name.endswith('.json'):
+            with open(os.path.join(fixture_dir, name), 'r', encoding='utf-8') as f:
+                pages[int(name[5:-5])] = json.load(f)
+    return pages
+
+
+def empty_page(payload, records_path):
+    """The same response with its record list emptied"""
+    payload = copy.deepcopy(payload)
+    if records_path:
+        get_path(payload, records_path[:-1])[records_path[-1]] = []
+    else:
+        payload = []
+    return payload
+
+
+def make_handler(request, pages):
+    empty = empty_page(pages[min(pages)], request.records_path) if pages else []
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def _answer(self, body=None):
+            query = dict(parse_qsl(urlsplit(self.path).query, keep_blank_values=True))
+            if body and request.body_kind == 'json':
+                body = json.loads(body)
+            elif body:
+                body = dict(parse_qsl(body, keep_blank_values=True))
+            try:
+                page = request.page_of(query, body)
+            except Exception as e:
+                self.send_error(400, f"Not a request for this endpoint: {e}")
+                return
+            payload = json.dumps(pages.get(page, empty), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._answer()
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self._answer(self.rfile.read(length).decode('utf-8') if length else None)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def serve(spec_path, fixture_dir, port=8765):
+    """Create the fixture server; call serve_forever() on it, e.g. from a thread"""
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    request = ReplayableRequest.from_dict(spec.get('request', spec))
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(request, load_fixtures(fixture_dir)))
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('spec', help="Saved endpoint JSON")
+    parser.add_argument('fixture_dir', help="Directory of page_N.json responses")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = serve(args.spec, args.fixture_dir, args.port)
+    print(f"Serving {args.fixture_dir} on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_CHECKPOINT_DIR = os.path.join("tenders", "checkpoints")
+
+# Page numbers shift as tenders are published, so older checkpoints are not resumed
+MAX_AGE = timedelta(hours=24)
+
+
+class CheckpointStore:
+    """Stages a run finished, per page and per tender, kept on disk until the run completes
+
+    A page records 'listing' (the rows read from the list page) and 'done' (written to the
+    sink). A tender records 'detail' and 'translation' with the data they produced, keyed
+    on its ID, so a resumed run reuses them instead of repeating the network work. Every
+    save() replaces the file atomically, so a crash leaves either the old or the new state.
+    scope describes what the run covers (page range, filters, ...); a checkpoint left by
+    a run with another scope is not resumed, since its pages hold other tenders.
+    """
+
+    def __init__(self, source, path=None, resume=True, scope=None):
+        self.source = source
+        self.path = path or os.path.join(DEFAULT_CHECKPOINT_DIR, f"{source}.json")
+        # Compared with the stored scope as it reads back from JSON
+        self.scope = json.loads(json.dumps(scope, default=str))
+        self.run_id = None
+        self.pages = {}
+        self.tenders = {}
+        self._dirty = False
+        # Page workers share the store
+        self._lock = threading.Lock()
+        if resume:
+            self.load()
+        else:
+            self.clear()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if datetime.now() - datetime.fromisoformat(stored['updated']) > MAX_AGE:
+                print(f"Checkpoint {self.path} is older than {MAX_AGE}, starting over")
+                return
+            if stored.get('scope') != self.scope:
+                print(f"Checkpoint {self.path} was left by a run over other pages or filters, starting over")
+                return
+            self.run_id = stored.get('run_id')
+            self.pages = stored.get('pages', {})
+            self.tenders = stored.get('tenders', {})
+            done = sum(1 for page in self.pages.values() if 'done' in page)
+            print(f"Resuming {self.source} from {self.path}: {done} pages done, "
+                  f"{len(self.tenders)} tenders with finished stages")
+        except Exception as e:
+            print(f"Could not load checkpoint {self.path}: {str(e)}")
+            self.pages, self.tenders = {}, {}
+
+    def page_stage(self, page_number, stage):
+        """What the page's stage produced (True if nothing), or None if it did not finish"""
+        with self._lock:
+            return self.pages.get(str(page_number), {}).get(stage)
+
+    def page_done(self, page_number):
+        return self.page_stage(page_number, 'done') is not None
+
+    def first_pending_page(self, first_page, last_page):
+        """The first page of the range not written yet, or None if every page was"""
+        for page_number in range(first_page, last_page + 1):
+            if not self.page_done(page_number):
+                return page_number
+        return None
+
+    def mark_page(self, page_number, stage, data=True):
+        with self._lock:
+            self.pages.setdefault(str(page_number), {})[stage] = data
+            if stage == 'done':
+                # A written page no longer needs its rows or its tenders' stage results
+                self.pages[str(page_number)] = {'done': True}
+                self.tenders = {tender_id: entry for tender_id, entry in self.tenders.items()
+                                if entry.get('page') != page_number}
+            self._dirty = True
+
+    def tender_stage(self, tender_id, stage):
+        """What the tender's stage produced, or None if it did not finish"""
+        with self._lock:
+            return self.tenders.get(str(tender_id), {}).get(stage)
+
+    def mark_tender(self, tender_id, stage, data=True, page_number=None):
+        with self._lock:
+            entry = self.tenders.setdefault(str(tender_id), {})
+            entry[stage] = data
+            if page_number is not None:
+                entry['page'] = page_number
+            self._dirty = True
+
+    def save(self):
+        """Write the checkpoint atomically if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                'source': self.source,
+                'run_id': self.run_id,
+                'scope': self.scope,
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'pages': self.pages,
+                'tenders': self.tenders,
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def clear(self):
+        """Forget every stage and remove the file, once the run finished every page"""
+        with self._lock:
+            self.pages, self.tenders = {}, {}
+            self._dirty = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
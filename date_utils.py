@@ -0,0 +1,197 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from metrics import instrumented
+
+# English month names and abbreviations -> month number
+MONTHS = {}
+for _number, _name in enumerate(['january', 'february', 'march', 'april', 'may', 'june', 'july',
+                                 'august', 'september', 'october', 'november', 'december'], 1):
+    MONTHS[_name] = _number
+    MONTHS[_name[:3]] = _number
+MONTHS['sept'] = 9
+
+# Reiwa 1 = 2019
+REIWA_OFFSET = 2018
+
+# ISO 8601 timestamps from JSON APIs: "2025-07-02T10:00:00.000+02:00" -> "2025-07-02 10:00:00"
+# (the wall-clock time is kept and the offset dropped, as for every other layout)
+ISO_DATETIME_REGEX = re.compile(r'(\d{4}-\d{1,2}-\d{1,2})T(\d{1,2}:\d{2}(?::\d{2})?)(?:[.,]\d+)?(?:Z|[+-]\d{2}(?::?\d{2})?)?')
+TIME_REGEX = re.compile(r'(\d{1,2})\s*:\s*(\d{2})(?:\s*:\s*(\d{2}))?')
+REIWA_REGEX = re.compile(r'(?:Reiwa|令和)\s*(\d+)\s*(?:Year|年)\s*(\d+)\s*(?:Month|月)\s*(\d+)\s*(?:Day|日)', re.IGNORECASE)
+KANJI_DATE_REGEX = re.compile(r'(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日')
+# Dotted, slashed, dashed or spaced numeric dates: 2025.07.02, 02/07/2025, 2025-07-02, 2 7 2025
+NUMERIC_DATE_REGEX = re.compile(r'(\d{1,4})\s*([./\- ])\s*(\d{1,2})\s*\2\s*(\d{1,4})')
+DAY_MONTH_YEAR_REGEX = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?\s+([A-Za-z]{3,})\s+(\d{4})')
+MONTH_DAY_YEAR_REGEX = re.compile(r'([A-Za-z]{3,})\s+(\d{1,2})(?:st|nd|rd|th)?\s+(\d{4})')
+TOKEN_REGEX = re.compile(r'\d{1,4}|[A-Za-z]+')
+PUNCTUATION_REGEX = re.compile(r'[,]|\.(?!\d)')
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def month_number(name):
+    """Look up an English month name or abbreviation"""
+    name = name.lower()
+    return MONTHS.get(name) or MONTHS.get(name[:3])
+
+
+def _valid(year, month, day):
+    try:
+        datetime(year, month, day)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _match_reiwa(date_string):
+    match = REIWA_REGEX.search(date_string)
+    if match:
+        year, month, day = (int(group) for group in match.groups())
+        return REIWA_OFFSET + year, month, day
+
+
+def _match_kanji(date_string):
+    match = KANJI_DATE_REGEX.search(date_string)
+    if match:
+        return tuple(int(group) for group in match.groups())
+
+
+def _match_numeric(date_string):
+    match = NUMERIC_DATE_REGEX.fullmatch(date_string)
+    if not match:
+        return None
+    first, _, middle, last = match.groups()
+    first, middle, last = int(first), int(middle), int(last)
+    if len(match.group(1)) == 4:
+        return first, middle, last
+    if len(match.group(4)) == 4:
+        # Day first, unless that is impossible and the date is month first (US style)
+        if middle > 12 and first <= 12:
+            return last, first, middle
+        return last, middle, first
+
+
+def _match_day_month_year(date_string):
+    match = DAY_MONTH_YEAR_REGEX.fullmatch(date_string)
+    if match and month_number(match.group(2)):
+        return int(match.group(3)), month_number(match.group(2)), int(match.group(1))
+
+
+def _match_month_day_year(date_string):
+    match = MONTH_DAY_YEAR_REGEX.fullmatch(date_string)
+    if match and month_number(match.group(1)):
+        return int(match.group(3)), month_number(match.group(1)), int(match.group(2))
+
+
+def _match_tokens(date_string):
+    """Fallback for loosely formatted dates such as "Due 2 July 2025 (JST)" """
+    year = month = day = None
+    for token in TOKEN_REGEX.findall(date_string):
+        if token.isdigit() and len(token) == 4:
+            year = int(token)
+        elif token.isalpha() and len(token) >= 3:
+            month = month_number(token) or month
+        elif token.isdigit() and len(token) <= 2:
+            day = int(token)
+    if year and month and day:
+        return year, month, day
+
+
+# Tried in order; the first layout that yields a valid date wins
+DATE_LAYOUTS = [
+    _match_reiwa,
+    _match_kanji,
+    _match_numeric,
+    _match_day_month_year,
+    _match_month_day_year,
+    _match_tokens
+]
+
+
+@lru_cache(maxsize=8192)
+def parse_components(date_string):
+    """Split a date string into ((year, month, day) or None, (hour, minute, second) or None)"""
+    # Remove any leading/trailing whitespace and commas
+    date_string = date_string.strip().strip(',')
+    date_string = ISO_DATETIME_REGEX.sub(r'\1 \2', date_string)
+
+    # First separate the time if it exists (looking for patterns like "17:00" or "17 : 00")
+    time_parts = None
+    time_match = TIME_REGEX.search(date_string)
+    if time_match:
+        hours, minutes, seconds = time_match.groups()
+        time_parts = (int(hours), int(minutes), int(seconds or 0))
+        date_string = date_string[:time_match.start()] + date_string[time_match.end():]
+
+    # Normalize spacing and drop commas and abbreviation periods ("Jul. 2, 2025")
+    date_string = PUNCTUATION_REGEX.sub(' ', date_string)
+    date_string = WHITESPACE_REGEX.sub(' ', date_string).strip()
+
+    for layout in DATE_LAYOUTS:
+        date_parts = layout(date_string)
+        if date_parts and _valid(*date_parts):
+            return date_parts, time_parts
+    return None, time_parts
+
+
+@instrumented('date_parsing')
+def standardize_datetime(date_string):
+    """Convert various date/time formats to dd-mm-yyyy and hh-mm-ss format"""
+    date_parts, time_parts = parse_components(date_string)
+
+    date_part = ""
+    time_part = ""
+    if date_parts:
+        year, month, day = date_parts
+        date_part = f"{day:02d}-{month:02d}-{year}"
+    if time_parts:
+        hours, minutes, seconds = time_parts
+        time_part = f"{hours:02d}-{minutes:02d}-{seconds:02d}"
+
+    # Return formatted date and time
+    if date_part and time_part:
+        return f"{date_part} {time_part}"
+    elif date_part:
+        return date_part
+    elif time_part:
+        return time_part
+    return WHITESPACE_REGEX.sub(' ', date_string.strip().strip(','))  # Return original string if parsing failed
+
+
+@instrumented('date_parsing')
+def parse_datetime(date_string):
+    """Parse a date string into (datetime, has_time), or (None, False) if it cannot be parsed"""
+    if not date_string or not isinstance(date_string, str):
+        return None, False
+    date_parts, time_parts = parse_components(date_string)
+    if not date_parts:
+        return None, False
+    try:
+        return datetime(*date_parts, *(time_parts or (0, 0, 0))), time_parts is not None
+    except ValueError:
+        return datetime(*date_parts), False
+
+
+def is_past(date_string, now=None):
+    """Check whether a deadline has passed; date-only deadlines last until the end of the day
+
+    Returns None if the deadline cannot be parsed.
+    """
+    deadline, has_time = parse_datetime(date_string)
+    if deadline is None:
+        return None
+    now = now or datetime.now()
+    if has_time:
+        return deadline < now
+    return deadline.date() < now.date()
+
+
+@instrumented('date_parsing')
+@lru_cache(maxsize=8192)
+def split_date_range(date_text):
+    """Split "publishing date (closing date)" into its two parts"""
+    if '(' not in date_text or ')' not in date_text:
+        return date_text, ""
+    publishing_date, _, closing_date = date_text.partition('(')
+    return publishing_date.strip(), closing_date.replace(')', '').strip()
@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from http_client import DEFAULT_TIMEOUT, get_session
+from metrics import get_metrics
+
+DEFAULT_CACHE_PATH = os.path.join("tenders", "detail_cache.sqlite")
+
+
+class DetailCache:
+    """SQLite store of detail pages' validators and the result parsed from them, keyed on URL
+
+    fetch() sends the stored ETag and Last-Modified as If-None-Match and If-Modified-Since,
+    so a page that did not change comes back as an empty 304 and its stored result is
+    returned without downloading or parsing it again. Only successful responses that carry
+    a validator are stored, and results must be JSON-serializable. Each result is stored
+    with the version of the parser that produced it; a row from another version is not
+    revalidated, so the page is downloaded and parsed again.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Detail pages are fetched from worker threads, and by scrapers in other processes
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS detail_pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                result TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                parser_version TEXT
+            )
+        """)
+        try:
+            # Stores created before results carried their parser version
+            self.conn.execute("ALTER TABLE detail_pages ADD COLUMN parser_version TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self.conn.commit()
+        self.not_modified = 0
+        self.downloaded = 0
+
+    def lookup(self, url, version=None):
+        """Return (etag, last_modified, result) stored for url by parser version, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, result, parser_version FROM detail_pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, result, parser_version = row
+        if parser_version != (None if version is None else str(version)):
+            return None
+        return etag, last_modified, json.loads(result)
+
+    def store(self, url, etag, last_modified, result, version=None):
+        now = datetime.now().isoformat(timespec='seconds')
+        payload = json.dumps(result, ensure_ascii=False)
+        version = None if version is None else str(version)
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO detail_pages (url, etag, last_modified, result, fetched_at, parser_version)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url)
+                DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified,
+                              result = excluded.result, fetched_at = excluded.fetched_at,
+                              parser_version = excluded.parser_version
+            """, (url, etag, last_modified, payload, now, version))
+            self.conn.commit()
+
+    def forget(self, url):
+        with self._lock:
+            self.conn.execute("DELETE FROM detail_pages WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def fetch(self, url, parse, session=None, timeout=DEFAULT_TIMEOUT, version=None, **kwargs):
+        """GET url and return parse(response), or the stored result if the page is unchanged
+
+        parse receives every response other than a 304 that can be answered from the
+        store, and decides itself what an error status means. A result of None is not
+        stored. version identifies parse; only results stored under the same version are
+        reused. Extra keyword arguments are passed to session.get.
+        """
+        session = session or get_session()
+        entry = self.lookup(url, version)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            etag, last_modified, _ = entry
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+            get_metrics().count('detail_not_modified')
+            return entry[2]
+
+        with self._lock:
+            self.downloaded += 1
+        result = parse(response)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.ok and result is not None and (etag or last_modified):
+            self.store(url, etag, last_modified, result, version)
+        elif entry is not None:
+            # The page changed and can no longer be revalidated
+            self.forget(url)
+        return result
+
+    def report(self):
+        print(f"Detail cache: {self.not_modified} pages unchanged (304), {self.downloaded} downloaded")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_detail_cache():
+    """Return the process-wide detail page cache, opening it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DetailCache()
+        return _cache
@@ -0,0 +1,100 @@
+import json
+from urllib.parse import urljoin
+
+from metrics import timed
+
+# Serializes every row matching a selector in one round-trip. Each field is
+# [selector, kind]: kind 'text' is the trimmed innerText of the first match, 'all'
+# is the list of trimmed innerTexts of every match, anything else reads that
+# property (e.g. 'href', resolved like get_attribute) or attribute. An empty
+# selector means the row itself; a missing element yields null.
+ROWS_SCRIPT = """
+var root = arguments[2] ? document.querySelector(arguments[2]) : document;
+if (!root) { return '[]'; }
+var fields = arguments[1];
+function read(element, kind) {
+    if (kind === 'text') { return (element.innerText || '').trim(); }
+    var value = element[kind];
+    if (value === undefined || value === null) { value = element.getAttribute(kind); }
+    return value === null ? null : String(value);
+}
+var records = [];
+var rows = root.querySelectorAll(arguments[0]);
+for (var i = 0; i < rows.length; i++) {
+    var record = {};
+    for (var name in fields) {
+        var selector = fields[name][0], kind = fields[name][1];
+        if (kind === 'all') {
+            var matches = selector ? rows[i].querySelectorAll(selector) : [rows[i]];
+            record[name] = Array.prototype.map.call(matches, function (element) {
+                return (element.innerText || '').trim();
+            });
+            continue;
+        }
+        var element = selector ? rows[i].querySelector(selector) : rows[i];
+        record[name] = element ? read(element, kind) : null;
+    }
+    records.push(record);
+}
+return JSON.stringify(records);
+"""
+
+
+def extract_rows(driver, row_selector, fields, root_selector=None):
+    """Read every row matching row_selector into a dict of fields with one execute_script call
+
+    fields maps a field name to (selector, kind) as described above ROWS_SCRIPT.
+    The page returns a JSON string, which is parsed here in one step.
+    """
+    fields = {name: list(spec) for name, spec in fields.items()}
+    with timed('list_extraction') as measured:
+        payload = driver.execute_script(ROWS_SCRIPT, row_selector, fields, root_selector)
+        measured['bytes'] = len(payload or '')
+        return json.loads(payload) if payload else []
+
+
+def extract_cells(driver, row_selector, cell_selector="td", root_selector=None):
+    """Read the text of every cell of every row as a list of lists"""
+    rows = extract_rows(driver, row_selector, {'cells': (cell_selector, 'all')}, root_selector)
+    return [row['cells'] for row in rows]
+
+
+def extract_rows_from_html(html, row_selector, fields, root_selector=None, base_url=None):
+    """extract_rows over saved page HTML instead of the live page, for re-parsing archived pages
+
+    Text is read with BeautifulSoup instead of the browser's innerText: block elements
+    are joined with spaces rather than line breaks. 'href' and 'src' are resolved
+    against base_url as the browser resolves them.
+    """
+    from bs4 import BeautifulSoup
+
+    def text(element):
+        return element.get_text(' ', strip=True)
+
+    def read(element, kind):
+        if kind == 'text':
+            return text(element)
+        value = element.get(kind)
+        if value is None:
+            return None
+        if isinstance(value, list):
+            value = ' '.join(value)
+        return urljoin(base_url or '', value) if kind in ('href', 'src') else value
+
+    with timed('list_extraction', len(html or '')):
+        soup = BeautifulSoup(html or '', 'html.parser')
+        root = soup.select_one(root_selector) if root_selector else soup
+        if root is None:
+            return []
+        records = []
+        for row in root.select(row_selector):
+            record = {}
+            for name, (selector, kind) in fields.items():
+                if kind == 'all':
+                    matches = row.select(selector) if selector else [row]
+                    record[name] = [text(element) for element in matches]
+                    continue
+                element = row.select_one(selector) if selector else row
+                record[name] = read(element, kind) if element is not None else None
+            records.append(record)
+        return records
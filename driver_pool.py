@@ -0,0 +1,204 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+# Resolved chromedriver path, reused by later runs without asking webdriver-manager again
+DRIVER_PATH_CACHE = os.path.join("tenders", "chromedriver_path.txt")
+
+# URL patterns blocked in pooled browsers, by resource type
+BLOCKED_RESOURCES = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'stylesheet': ['*.css'],
+}
+DEFAULT_BLOCKED = ('image', 'font', 'stylesheet')
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """Find chromedriver once: $CHROMEDRIVER, then the cached path, then webdriver-manager"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+
+        path = os.environ.get('CHROMEDRIVER')
+        if not path and os.path.exists(DRIVER_PATH_CACHE):
+            with open(DRIVER_PATH_CACHE, 'r', encoding='utf-8') as f:
+                path = f.read().strip()
+        if not path or not os.path.exists(path):
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            print("Resolving chromedriver with webdriver-manager...")
+            path = ChromeDriverManager().install()
+            try:
+                os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+                with open(DRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+                    f.write(path)
+            except Exception as e:
+                print(f"Could not cache the chromedriver path: {e}")
+        _driver_path = path
+        return path
+
+
+def create_driver(headless=True, block=DEFAULT_BLOCKED, arguments=(), user_agent=None):
+    """Start Chrome with the shared driver binary, optionally headless and with resources blocked"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1920,1080")
+    else:
+        chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-popup-blocking")
+    if user_agent:
+        chrome_options.add_argument(f"--user-agent={user_agent}")
+    for argument in arguments:
+        chrome_options.add_argument(argument)
+    if 'image' in block:
+        chrome_options.add_experimental_option(
+            'prefs', {'profile.managed_default_content_settings.images': 2}
+        )
+
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options)
+
+    patterns = [pattern for kind in block for pattern in BLOCKED_RESOURCES.get(kind, [])]
+    if patterns:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except Exception as e:
+            print(f"Could not block {', '.join(block)} requests: {e}")
+    return driver
+
+
+class DriverPool:
+    """Up to size warm browsers leased to workers and recycled after max_pages pages
+
+    Browsers are started lazily on the first lease that finds none idle, so a run
+    that never needs one never starts Chrome.
+    """
+
+    def __init__(self, size=2, max_pages=25, **driver_options):
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_options = driver_options
+        self._idle = []
+        self._pages = {}
+        self._started = 0
+        # Guards _idle, _pages and _started; waiters are woken when a browser is returned or discarded
+        self._available = threading.Condition()
+        self._closed = False
+
+    def acquire(self):
+        """Take an idle browser, start one if the pool is not full, or wait for one"""
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+            number = self._started
+        try:
+            print(f"Starting browser {number}/{self.size}...")
+            driver = create_driver(**self.driver_options)
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def release(self, driver, pages=1, broken=False):
+        """Return a browser after it served pages; broken or worn-out browsers are replaced"""
+        with self._available:
+            served = self._pages.get(id(driver), 0) + pages
+            keep = not (broken or self._closed or served >= self.max_pages)
+            if keep:
+                self._pages[id(driver)] = served
+                self._idle.append(driver)
+                self._available.notify()
+                return
+        reason = "it failed" if broken else f"{served} pages"
+        if not self._closed:
+            print(f"Recycling browser after {reason}")
+        self._discard(driver)
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        # A waiting worker may now start the replacement
+        with self._available:
+            self._pages.pop(id(driver), None)
+            self._started -= 1
+            self._available.notify()
+
+    @contextmanager
+    def lease(self, pages=1):
+        """Lease a browser for a unit of work covering the given number of pages"""
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, pages, broken=True)
+            raise
+        self.release(driver, pages)
+
+    def close(self):
+        """Quit every idle browser; browsers still leased are quit when released"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def split_page_range(start_page, end_page, parts, max_chunk=None):
+    """Split start..end into up to parts contiguous (first, last) chunks of at most max_chunk pages"""
+    total = end_page - start_page + 1
+    if total <= 0:
+        return []
+    chunk = -(-total // max(parts, 1))
+    if max_chunk:
+        chunk = min(chunk, max_chunk)
+    return [(first, min(first + chunk - 1, end_page)) for first in range(start_page, end_page + 1, chunk)]
+
+
+def run_page_ranges(start_page, end_page, worker, workers=1, max_chunk=None):
+    """Run worker(first, last) over chunks of the page range on up to workers threads
+
+    Returns the workers' results in page order; a chunk that raised yields None.
+    """
+    chunks = split_page_range(start_page, end_page, workers, max_chunk)
+
+    def run(chunk):
+        try:
+            return worker(*chunk)
+        except Exception as e:
+            print(f"Error processing pages {chunk[0]}-{chunk[1]}: {e}")
+            return None
+
+    if workers <= 1:
+        return [run(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, chunks))
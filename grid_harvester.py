@@ -0,0 +1,129 @@
+from metrics import timed
+from waits import wait_until
+
+# Geometry of a virtualized grid: the scroll container is sized for every row,
+# while only the rows near the viewport are rendered
+GRID_METRICS_SCRIPT = """
+var scroller = document.getElementById(arguments[0]);
+var row = document.querySelector(arguments[1]);
+if (!scroller) { return null; }
+return {
+    scrollTop: scroller.scrollTop,
+    clientHeight: scroller.clientHeight,
+    scrollHeight: scroller.scrollHeight,
+    rowHeight: row ? row.getBoundingClientRect().height : 0
+};
+"""
+
+# Returns only the rendered rows whose key has not been returned before; keys are kept
+# in the page under a per-harvest namespace so they are never sent back and forth
+NEW_ROWS_SCRIPT = """
+var seen = window.__gridSeen = window.__gridSeen || {};
+var keys = seen[arguments[2]] = seen[arguments[2]] || {};
+var keyColumn = arguments[1];
+var rows = document.querySelectorAll(arguments[0]);
+var fresh = [];
+for (var i = 0; i < rows.length; i++) {
+    var cells = Array.prototype.map.call(rows[i].querySelectorAll('td'), function (cell) {
+        return (cell.innerText || '').trim();
+    });
+    if (!cells.some(function (text) { return text.length > 0; })) { continue; }
+    var key = cells.length > keyColumn ? cells[keyColumn] : JSON.stringify(cells);
+    if (keys[key]) { continue; }
+    keys[key] = true;
+    fresh.push(cells);
+}
+return fresh;
+"""
+
+# Seconds to wait for late rows once the grid cannot scroll further
+BOTTOM_SETTLE = 1
+
+SCROLL_SCRIPT = """
+var scroller = document.getElementById(arguments[0]);
+scroller.scrollTop = scroller.scrollTop + arguments[1];
+return scroller.scrollTop;
+"""
+
+
+class GridHarvester:
+    """Collect every row of a virtualized grid by scrolling one viewport at a time
+
+    Each step scrolls by the viewport height less one row of overlap, then waits
+    only until rows with unseen keys are rendered; reading them is the wait's own
+    condition, so no rendered row is read twice. The harvest stops at the bottom
+    of the grid, once total_rows keys were seen, or after max_misses steps that
+    brought nothing new.
+    """
+
+    def __init__(self, driver, scroll_element_id, row_selector, key_column=0, total_rows=None,
+                 max_misses=2, step_timeout=None, namespace='grid'):
+        self.driver = driver
+        self.scroll_element_id = scroll_element_id
+        self.row_selector = row_selector
+        self.key_column = key_column
+        self.total_rows = total_rows
+        self.max_misses = max_misses
+        self.step_timeout = step_timeout
+        self.namespace = namespace
+        self.seen = 0
+        self.steps = 0
+
+    def metrics(self):
+        return self.driver.execute_script(GRID_METRICS_SCRIPT, self.scroll_element_id, self.row_selector)
+
+    def read_new_rows(self):
+        """Rows rendered now whose key was not read before"""
+        return self.driver.execute_script(NEW_ROWS_SCRIPT, self.row_selector, self.key_column, self.namespace) or []
+
+    def estimate_total_rows(self, metrics):
+        if metrics and metrics['rowHeight']:
+            return round(metrics['scrollHeight'] / metrics['rowHeight'])
+        return None
+
+    def harvest(self):
+        """Yield lists of new rows, in grid order, until the whole grid was read"""
+        rows = self.read_new_rows()
+        self.seen += len(rows)
+        if rows:
+            yield rows
+
+        metrics = self.metrics()
+        if metrics is None:
+            print(f"Scroll container {self.scroll_element_id} not found")
+            return
+        total_rows = self.total_rows or self.estimate_total_rows(metrics)
+        row_height = metrics['rowHeight'] or 1
+        step = max(metrics['clientHeight'] - row_height, row_height)
+        print(f"Grid: about {total_rows or '?'} rows of {row_height:.0f}px, "
+              f"scrolling {step:.0f}px per step")
+
+        misses = 0
+        while not (self.total_rows and self.seen >= self.total_rows):
+            before = self.metrics()
+            at_bottom = before['scrollTop'] + before['clientHeight'] >= before['scrollHeight'] - 1
+            if not at_bottom:
+                with timed('navigation'):
+                    self.driver.execute_script(SCROLL_SCRIPT, self.scroll_element_id, step)
+            self.steps += 1
+
+            # The condition both detects and reads the newly rendered rows. At the bottom
+            # only rows still rendering are waited for, unless the known total says more
+            # rows are being loaded
+            expecting_more = self.total_rows and self.seen < self.total_rows
+            timeout = BOTTOM_SETTLE if at_bottom and not expecting_more else self.step_timeout
+            rows = wait_until(self.driver, lambda d: self.read_new_rows() or None, 'table_change', timeout)
+            if rows:
+                self.seen += len(rows)
+                misses = 0
+                yield rows
+                continue
+
+            if at_bottom:
+                print(f"Reached the bottom of the grid after {self.steps} steps, {self.seen} rows")
+                return
+            misses += 1
+            print(f"No new rows after scrolling ({misses}/{self.max_misses})")
+            if misses >= self.max_misses:
+                return
+        print(f"Read all {self.seen} rows in {self.steps} steps")
@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from metrics import get_metrics
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: lock the first byte of the state file instead
+    fcntl = None
+    import msvcrt
+
+DEFAULT_STATE_DIR = os.path.join("tenders", "rate_limits")
+
+# Requests per second each portal is allowed across every scraper process, with bursts of
+# twice that; hosts are matched on their domain suffix
+HOST_RATES = {
+    'acquistinretepa.it': 4.0,
+    'jetro.go.jp': 8.0,
+    'e-pazar.gov.mk': 4.0,
+    'g2b.go.kr': 4.0,
+}
+DEFAULT_RATE = 4.0
+
+# Local fixture servers (benchmarks/) are never limited
+UNLIMITED_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+INITIAL_CONCURRENCY = 2
+MAX_CONCURRENCY = 16
+# A request slower than this many times the host's best recent latency signals overload
+SLOW_FACTOR = 3.0
+# ... but only above this many seconds, so fast hosts are not throttled on jitter
+SLOW_FLOOR = 1.0
+# The best latency drifts up by this factor per request, so it follows a slower network
+BEST_LATENCY_DRIFT = 1.01
+
+
+@contextmanager
+def locked_file(path):
+    """Open path for reading and writing under an exclusive lock shared by every process"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a+', encoding='utf-8') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            f.seek(0)
+            yield f
+        finally:
+            f.flush()
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TokenBucket:
+    """Request budget of one host, refilled at rate per second and shared through a locked file
+
+    Every process scraping the host takes its tokens from the same file, so parallel
+    scrapers and overlapping runs together stay within the rate.
+    """
+
+    def __init__(self, host, rate, burst=None, state_dir=DEFAULT_STATE_DIR):
+        self.host = host
+        self.rate = rate
+        self.burst = burst or max(rate * 2, 1.0)
+        self.path = os.path.join(state_dir, f"{host}.json")
+
+    def take(self):
+        """Wait until a token is available and take it"""
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            get_metrics().sleep(wait, 'rate_limit')
+
+    def _try_take(self):
+        """Take a token and return 0, or return the seconds until one is available"""
+        with locked_file(self.path) as f:
+            now = time.time()
+            try:
+                state = json.loads(f.read())
+                tokens = min(self.burst, state['tokens'] + max(now - state['updated'], 0) * self.rate)
+            except (ValueError, KeyError, TypeError):
+                # New or unreadable state: start with a full bucket
+                tokens = self.burst
+            if tokens < 1:
+                return (1 - tokens) / self.rate
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps({'tokens': tokens - 1, 'updated': now}))
+            return 0
+
+
+class HostController:
+    """Concurrency limit of one host, adjusted by AIMD from every request's latency and outcome
+
+    A request that succeeds without being slow raises the limit by 1/limit, about one
+    slot per round of requests. A failure (an exception, a 429 or 5xx, a timeout) or a
+    request slower than SLOW_FACTOR times the best recent latency halves it. Only
+    requests started after the last decrease can decrease it again, so one overload
+    seen by many requests in flight counts once.
+    """
+
+    def __init__(self, host, bucket=None, initial=INITIAL_CONCURRENCY, max_limit=MAX_CONCURRENCY):
+        self.host = host
+        self.bucket = bucket
+        self.limit = float(initial)
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.best_latency = None
+        self.last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        if self.bucket is not None:
+            try:
+                self.bucket.take()
+            except Exception:
+                self.release(time.perf_counter(), 0.0, False, count=False)
+                raise
+
+    def release(self, started, latency, failed, count=True):
+        with self._condition:
+            self.in_flight -= 1
+            if count:
+                self._adjust(started, latency, failed)
+            self._condition.notify_all()
+
+    def _adjust(self, started, latency, failed):
+        slow = False
+        if not failed:
+            if self.best_latency is None or latency < self.best_latency:
+                self.best_latency = latency
+            else:
+                self.best_latency *= BEST_LATENCY_DRIFT
+            slow = latency > max(self.best_latency * SLOW_FACTOR, SLOW_FLOOR)
+
+        if failed or slow:
+            if started > self.last_decrease:
+                self.limit = max(self.limit / 2, 1.0)
+                self.last_decrease = time.perf_counter()
+                get_metrics().count(f"throttle_{self.host}")
+        else:
+            self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the host's slots for a request; set the yielded 'failed' for a bad response"""
+        self.acquire()
+        outcome = {'failed': False}
+        started = time.perf_counter()
+        try:
+            yield outcome
+        except BaseException:
+            outcome['failed'] = True
+            raise
+        finally:
+            self.release(started, time.perf_counter() - started, outcome['failed'])
+
+    def to_dict(self):
+        with self._condition:
+            return {'limit': round(self.limit, 2), 'in_flight': self.in_flight,
+                    'best_latency': round(self.best_latency or 0.0, 3)}
+
+
+def host_rate(host):
+    for domain, rate in HOST_RATES.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return rate
+    return DEFAULT_RATE
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(url):
+    """Return the process-wide controller of url's host, or None if the host is not limited"""
+    host = (urlsplit(url).hostname or '').lower()
+    if not host or host in UNLIMITED_HOSTS:
+        return None
+    with _controllers_lock:
+        controller = _controllers.get(host)
+        if controller is None:
+            controller = _controllers[host] = HostController(host, TokenBucket(host, host_rate(host)))
+        return controller
+
+
+@contextmanager
+def throttled(url):
+    """Run a request or navigation to url within its host's concurrency limit and rate
+
+    Yields a dict whose 'failed' may be set for a response that signals overload;
+    an exception raised inside counts as a failure too.
+    """
+    controller = get_controller(url)
+    if controller is None:
+        yield {'failed': False}
+        return
+    with controller.slot() as outcome:
+        yield outcome
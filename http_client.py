@@ -0,0 +1,75 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from host_limiter import throttled
+
+# Same browser identity the Korean scraper presents to g2b.go.kr
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_TIMEOUT = 15
+# Responses telling the client to back off
+OVERLOAD_STATUSES = (429, 500, 502, 503, 504)
+# Methods whose overloaded responses are retried, and the wait before the first retry (doubling)
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+RETRY_BACKOFF = 0.5
+
+
+class ThrottledSession(requests.Session):
+    """Session whose requests wait for their host's slot and token (see host_limiter)
+
+    Overloaded responses are retried here rather than by urllib3, so every attempt
+    takes its own token and reports its outcome to the host's controller.
+    """
+
+    status_retries = 2
+
+    def request(self, method, url, *args, **kwargs):
+        attempts = 1 + (self.status_retries if method.upper() in RETRY_METHODS else 0)
+        for attempt in range(attempts):
+            if attempt:
+                response.close()
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            with throttled(url) as outcome:
+                response = super().request(method, url, *args, **kwargs)
+                outcome['failed'] = response.status_code in OVERLOAD_STATUSES
+            if not outcome['failed']:
+                break
+        return response
+
+
+def create_session(pool_size=16, retries=2):
+    """Create a requests session with a connection pool sized for concurrent workers"""
+    session = ThrottledSession()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9'
+    })
+    session.status_retries = retries
+    # urllib3 only retries connection errors; status retries are left to ThrottledSession
+    retry = Retry(
+        total=retries,
+        status=0,
+        backoff_factor=RETRY_BACKOFF,
+        allowed_methods=RETRY_METHODS
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
@@ -1,42 +1,42 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, NoSuchElementException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-import time
-from datetime import datetime
-import os
-from deep_translator import GoogleTranslator
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, StaleElementReferenceException
+import argparse
+from translation_cache import save_translation_cache
+from translation_engine import CacheOnlyBackend, TranslationEngine, get_translation_engine
+from link_resolver import resolve_links
+from seen_index import SeenIndex
+from output_sink import open_sink
+from dom_extract import extract_rows, extract_rows_from_html
+from driver_pool import DriverPool, run_page_ranges
+from run_summary import StageTimer, finish_summary
+from checkpoint import CheckpointStore
+from metrics import instrumented, reset_metrics, timed
+from host_limiter import throttled
+from pipeline import Pipeline, Stage, combine_stage_stats, parse_stage_workers
+from page_archive import archive_page, get_page_archive, latest_by_url, parse_entries
+from tender_filter import add_filter_arguments, filter_from_args
+from waits import (first_row_text, report_waits, wait_for_angular, wait_for_first_row_change,
+                   wait_for_page_load, wait_for_rows, wait_for_url_stable)
 
-def setup_driver():
-    # Set up Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-popup-blocking")
-    
-    # Set up the Chrome driver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+LIST_URL = "https://www.acquistinretepa.it/opencms/opencms/vetrina_bandi.html?filter=CO#!#post_call_position"
 
-def wait_for_angular(driver):
-    """Wait for Angular to finish processing and for page to be fully loaded"""
-    try:
-        script = """
-        return (window.jQuery != null) && (jQuery.active === 0) && 
-               (typeof angular === 'undefined' || !angular.element(document).injector() || 
-                angular.element(document).injector().get('$http').pendingRequests.length === 0);
-        """
-        WebDriverWait(driver, 20).until(lambda driver: driver.execute_script(script))
-    except:
-        WebDriverWait(driver, 20).until(
-            lambda driver: driver.execute_script('return document.readyState') == 'complete'
-        )
+# Each tender on the list page is one of these rows
+ROW_SELECTOR = "div.listVetrina.col-sm-12.nopadding.ng-scope"
+
+# Fields read from each row by dom_extract.extract_rows: name -> (selector, kind)
+# Published/expires use the hidden-sm hidden-md version for a consistent date format
+ROW_FIELDS = {
+    'N.RDO': ("div.stato.borderElenco.nopadding.col-sm-1 p.regular-14", 'text'),
+    'DESCRIPTION': ("div.borderElenco p.semibold.semibold-16-sm.ellipsis a.ng-binding", 'text'),
+    'description_href': ("div.borderElenco p.semibold.semibold-16-sm.ellipsis a.ng-binding", 'href'),
+    'PRODUCT AREA': ("div.listaCatIniz div.regular.responsiveText16 strong", 'text'),
+    'CONTRACTING ENTITY': ("div.stato.borderElenco.nopadding.col-sm-2 div[style*='font-size:12px']", 'text'),
+    'VALUE': ("div.stato.borderElenco.nopadding.col-sm-2.col-md-1 div.regular-14", 'text'),
+    'PUBLISHED ON': ("div.stato.borderElenco.nopadding div.hidden-sm.hidden-md", 'text'),
+    'EXPIRES ON': ("div.stato.nopadding.noBorderElenco div.hidden-sm.hidden-md", 'text'),
+}
 
 def select_rdo_aperte(driver):
     try:
@@ -61,6 +61,7 @@ def select_rdo_aperte(driver):
 
         wait.until(EC.element_to_be_clickable((By.ID, rdo_checkbox.get_attribute('id'))))
         
+        previous_first_row = first_row_text(driver, ROW_SELECTOR)
         try:
             rdo_checkbox.click()
             print("Clicked RDO checkbox normally")
@@ -69,7 +70,7 @@ def select_rdo_aperte(driver):
             print("Clicked RDO checkbox using JavaScript")
         
         print("Waiting for page update...")
-        time.sleep(10)
+        wait_for_first_row_change(driver, ROW_SELECTOR, previous_first_row)
         wait_for_angular(driver)
         print("Page update complete")
         
@@ -100,12 +101,15 @@ def get_total_pages(driver):
         print(f"Error getting total pages: {str(e)}")
         return 1
 
+@instrumented('navigation')
 def go_to_page(driver, page_number):
     """Navigate to a specific page"""
     try:
         print(f"\nNavigating to page {page_number}...")
         wait = WebDriverWait(driver, 10)
         
+        previous_first_row = first_row_text(driver, ROW_SELECTOR)
+        
         # Find and click the page number
         page_link = wait.until(EC.presence_of_element_located(
             (By.XPATH, f"//a[contains(@ng-click, 'selectPage') and contains(text(), '{page_number}')]")
@@ -113,54 +117,90 @@ def go_to_page(driver, page_number):
         
         # Scroll the page link into view
         driver.execute_script("arguments[0].scrollIntoView(true);", page_link)
-        time.sleep(1)  # Short pause after scrolling
         
-        # Click the page link
-        try:
-            page_link.click()
-        except:
-            driver.execute_script("arguments[0].click();", page_link)
-        
-        # Wait for page to load
-        time.sleep(5)
-        wait_for_angular(driver)
+        # The click loads the page's rows from the portal
+        with throttled(LIST_URL):
+            # Click the page link
+            try:
+                page_link.click()
+            except:
+                driver.execute_script("arguments[0].click();", page_link)
+            
+            # Wait for the list to re-render with the new page's rows
+            wait_for_first_row_change(driver, ROW_SELECTOR, previous_first_row)
+            wait_for_angular(driver)
         print(f"Successfully navigated to page {page_number}")
         return True
     except Exception as e:
         print(f"Error navigating to page {page_number}: {str(e)}")
         return False
 
+# List fields that identify a changed tender, hashed before any expensive stage
+SEEN_HASH_FIELDS = ['N.RDO', 'DESCRIPTION', 'PRODUCT AREA', 'CONTRACTING ENTITY', 'VALUE', 'PUBLISHED ON', 'EXPIRES ON']
+
 # Translation function
 def translate_text(text, source='it', target='en'):
     """Translate text from Italian to English."""
-    if not text or not isinstance(text, str) or text == "N/A":
-        return text
+    return get_translation_engine().translate(text, source, target)
+
+@instrumented('detail_resolution')
+def resolve_link_in_browser(driver, href):
+    """Open a link in a new tab and return the URL it lands on"""
+    with throttled(href):
+        # Open the link in a new tab
+        driver.execute_script(f"window.open('{href}', '_blank');")
+        
+        # Switch to the new tab
+        driver.switch_to.window(driver.window_handles[-1])
+        
+        try:
+            # Wait for page to load and any client-side redirect to land
+            wait_for_page_load(driver, 15)
+            wait_for_url_stable(driver)
+            
+            # Get the document URL
+            return driver.current_url
+        finally:
+            # Close the tab and switch back to main window
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+
+def row_to_tender(row, index):
+    """Turn one extracted row into basic tender information, keeping the description href"""
+    tender = {}
+    for field in ['N.RDO', 'DESCRIPTION', 'PRODUCT AREA', 'CONTRACTING ENTITY', 'VALUE', 'PUBLISHED ON', 'EXPIRES ON']:
+        value = row[field]
+        if value is None:
+            print(f"Error finding {field} in tender {index}")
+            value = "N/A"
+        elif field == 'VALUE' and not value:
+            value = "Not specified"
+        tender[field] = value
+        print(f"{field}: {value}")
     
-    # Skip translation for numeric or very short strings
-    if text.isdigit() or len(text) < 2:
-        return text
+    # Store the description element's href for later use
+    tender['description_href'] = row['description_href']
+    print(f"Description href: {tender['description_href']}")
     
-    try:
-        # Split long text to handle Google Translator's character limit
-        if len(text) > 4000:  # Google Translator has a limit
-            chunks = [text[i:i+4000] for i in range(0, len(text), 4000)]
-            translated_chunks = []
-            for chunk in chunks:
-                translated = GoogleTranslator(source=source, target=target).translate(chunk)
-                if translated:
-                    translated_chunks.append(translated)
-                else:
-                    translated_chunks.append(chunk)
-            return ' '.join(translated_chunks)
-        else:
-            translated = GoogleTranslator(source=source, target=target).translate(text)
-            return translated if translated else text
-    except Exception as e:
-        print(f"Translation error: {str(e)} for text: '{text[:50]}...'")
-        return text  # Return original text if translation fails
+    # Add website link and country
+    tender['Website Link'] = LIST_URL
+    tender['Country'] = "Italy"
+    return tender
+
+def tender_filter_values(tender):
+    """The filter values a list row carries; all of them, before any link is resolved"""
+    return {'published': tender['PUBLISHED ON'], 'deadline': tender['EXPIRES ON'],
+            'notice_type': tender['PRODUCT AREA'], 'entity': tender['CONTRACTING ENTITY'],
+            'text': tender['DESCRIPTION']}
 
-def extract_tender_details(driver):
-    """Extract tender details from the page"""
+def collect_tenders(driver, seen_index=None, incremental=True, checkpoint=None, page_number=None, filters=None):
+    """Read the tenders of the page shown in the browser; returns (tenders, main page URL)
+
+    Rows failing filters (a FilterSpec) or unchanged since an earlier run are dropped.
+    Links a checkpoint already holds are reused, and tenders without a stored href are
+    found on the page and clicked here, while the browser still shows it; the rest keep
+    their href for resolve_document_links.
+    """
     print("Extracting tender details...")
     wait = WebDriverWait(driver, 20)
     
@@ -173,14 +213,15 @@ def extract_tender_details(driver):
         EC.presence_of_element_located((By.CSS_SELECTOR, "div.listVetrina.col-sm-12.nopadding.ng-scope"))
     )
     print("Found main list container")
+    archive_page('italy', 'list', main_page_url, driver.page_source, page=page_number)
     
-    # Find all tender rows
-    tender_rows = driver.find_elements(By.CSS_SELECTOR, "div.listVetrina.col-sm-12.nopadding.ng-scope")
+    # Read every row in one round-trip instead of one find_element per field
+    tender_rows = extract_rows(driver, ROW_SELECTOR, ROW_FIELDS)
     print(f"Found {len(tender_rows)} tender rows")
     
     if len(tender_rows) == 0:
         print("No tender rows found.")
-        return []
+        return [], main_page_url
     
     # STEP 1: First collect all basic information from tenders
     print("\n--- STEP 1: Collecting basic tender information ---")
@@ -188,110 +229,7 @@ def extract_tender_details(driver):
     
     for index, row in enumerate(tender_rows, 1):
         try:
-            tender={}
-            # N.RDO
-            try:
-                n_rdo = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.stato.borderElenco.nopadding.col-sm-1 p.regular-14"
-                ).text.strip()
-                tender['N.RDO'] = n_rdo
-                print(f"N.RDO: {n_rdo}")
-            except NoSuchElementException as e:
-                print(f"Error finding N.RDO: {str(e)}")
-                tender['N.RDO'] = "N/A"
-            
-            # Description
-            try:
-                # Find the description element based on the HTML structure provided
-                description_element = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.borderElenco p.semibold.semibold-16-sm.ellipsis a.ng-binding"
-                )
-                description = description_element.text.strip()
-                tender['DESCRIPTION'] = description
-                print(f"Description: {description}")
-                
-                # Store the description element's href for later use
-                try:
-                    href = description_element.get_attribute('href')
-                    tender['description_href'] = href
-                    print(f"Description href: {href}")
-                except:
-                    tender['description_href'] = None
-                    print("Could not get description href")
-                
-            except NoSuchElementException as e:
-                print(f"Error finding description: {str(e)}")
-                tender['DESCRIPTION'] = "N/A"
-                tender['description_href'] = None
-            
-            # Product Area
-            try:
-                product_area = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.listaCatIniz div.regular.responsiveText16 strong"
-                ).text.strip()
-                tender['PRODUCT AREA'] = product_area
-                print(f"Product Area: {product_area}")
-            except NoSuchElementException as e:
-                print(f"Error finding product area: {str(e)}")
-                tender['PRODUCT AREA'] = "N/A"
-            
-            # Contracting Entity
-            try:
-                entity = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.stato.borderElenco.nopadding.col-sm-2 div[style*='font-size:12px']"
-                ).text.strip()
-                tender['CONTRACTING ENTITY'] = entity
-                print(f"Contracting Entity: {entity}")
-            except NoSuchElementException as e:
-                print(f"Error finding contracting entity: {str(e)}")
-                tender['CONTRACTING ENTITY'] = "N/A"
-            
-            # Value
-            try:
-                value = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.stato.borderElenco.nopadding.col-sm-2.col-md-1 div.regular-14"
-                ).text.strip()
-                tender['VALUE'] = value if value else "Not specified"
-                print(f"Value: {value}")
-            except NoSuchElementException as e:
-                print(f"Error finding value: {str(e)}")
-                tender['VALUE'] = "N/A"
-            
-            # Published On (using hidden-sm hidden-md version for consistent date format)
-            try:
-                published = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.stato.borderElenco.nopadding div.hidden-sm.hidden-md"
-                ).text.strip()
-                tender['PUBLISHED ON'] = published
-                print(f"Published On: {published}")
-            except NoSuchElementException as e:
-                print(f"Error finding published date: {str(e)}")
-                tender['PUBLISHED ON'] = "N/A"
-            
-            # Expires On (using hidden-sm hidden-md version for consistent date format)
-            try:
-                expires = row.find_element(
-                    By.CSS_SELECTOR, 
-                    "div.stato.nopadding.noBorderElenco div.hidden-sm.hidden-md"
-                ).text.strip()
-                tender['EXPIRES ON'] = expires
-                print(f"Expires On: {expires}")
-            except NoSuchElementException as e:
-                print(f"Error finding expiry date: {str(e)}")
-                tender['EXPIRES ON'] = "N/A"
-            
-            # Add website link and country
-            tender['Website Link'] = "https://www.acquistinretepa.it/opencms/opencms/vetrina_bandi.html?filter=CO#!#post_call_position"
-            tender['Country'] = "Italy"
-            
-            # Add to the list of tenders with basic info
-            tenders_basic_info.append(tender)
+            tenders_basic_info.append(row_to_tender(row, index))
             print(f"✓ Successfully collected basic info for tender {index}")
             
         except Exception as e:
@@ -299,223 +237,443 @@ def extract_tender_details(driver):
             continue
     
     print(f"\nSuccessfully collected basic info for {len(tenders_basic_info)} tenders")
+    if filters:
+        tenders_basic_info = filters.apply(tenders_basic_info, tender_filter_values, 'list')
     
-    # STEP 2: Extract document links for each tender
-    print("\n--- STEP 2: Extracting document links ---")
-    for index, tender in enumerate(tenders_basic_info, 1):
-        try:
-            print(f"\nExtracting document link for tender {index}: {tender['N.RDO']} - {tender['DESCRIPTION'][:30]}...")
-            
-            # If we have a direct href, we can use it
-            if tender['description_href']:
-                print(f"Using stored href: {tender['description_href']}")
-                
-                # Open the link in a new tab
-                driver.execute_script(f"window.open('{tender['description_href']}', '_blank');")
-                
-                # Switch to the new tab
-                driver.switch_to.window(driver.window_handles[-1])
-                
-                # Wait for page to load
-                WebDriverWait(driver, 15).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                time.sleep(2)  # Additional wait to ensure page is fully loaded
-                
-                # Get the document URL
-                document_link = driver.current_url
+    # Only new or changed tenders go through the detail-link and translation stages
+    if seen_index is not None:
+        tenders_basic_info = seen_index.filter_changed(
+            'italy', tenders_basic_info, 'N.RDO', SEEN_HASH_FIELDS, skip_unchanged=incremental
+        )
+        if not tenders_basic_info:
+            print("No new or changed tenders on this page")
+            return [], main_page_url
+    
+    # Links resolved before an interrupted run are taken from the checkpoint
+    if checkpoint is not None:
+        reused = 0
+        for tender in tenders_basic_info:
+            document_link = checkpoint.tender_stage(tender['N.RDO'], 'detail')
+            if document_link:
                 tender['Document page Link'] = document_link
-                print(f"Document page Link: {document_link}")
-                
-                # Close the tab and switch back to main window
-                driver.close()
-                driver.switch_to.window(driver.window_handles[0])
-                
-            else:
-                # If we don't have a direct href, we need to find the tender on the page again
-                print("No stored href, finding tender on page again...")
-                
-                # Wait for the tender rows to be loaded
-                tender_rows = WebDriverWait(driver, 15).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.listVetrina.col-sm-12.nopadding.ng-scope"))
-                )
-                
-                # Find the tender row with matching N.RDO
-                found = False
-                for row in tender_rows:
-                    try:
-                        n_rdo_element = row.find_element(By.CSS_SELECTOR, "div.stato.borderElenco.nopadding.col-sm-1 p.regular-14")
-                        if n_rdo_element.text.strip() == tender['N.RDO']:
-                            print(f"Found tender with N.RDO {tender['N.RDO']} on page")
-                            
-                            # Find the description link
-                            description_element = row.find_element(
-                                By.CSS_SELECTOR, 
-                                "div.borderElenco p.semibold.semibold-16-sm.ellipsis a.ng-binding"
-                            )
-                            
-                            # Scroll the element into view and click it
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", description_element)
-                            time.sleep(1)
-                            driver.execute_script("arguments[0].click();", description_element)
-                            
-                            # Wait for page to load
-                            WebDriverWait(driver, 15).until(
-                                lambda d: d.execute_script("return document.readyState") == "complete"
-                            )
-                            time.sleep(2)  # Additional wait to ensure page is fully loaded
-                            
-                            # Get the document URL
-                            document_link = driver.current_url
-                            tender['Document page Link'] = document_link
-                            print(f"Document page Link: {document_link}")
-                            
-                            # Go back to the main page
-                            driver.get(main_page_url)
-                            WebDriverWait(driver, 15).until(
-                                lambda d: d.execute_script("return document.readyState") == "complete"
-                            )
-                            time.sleep(2)  # Wait for main page to reload
-                            
-                            found = True
-                            break
-                    except:
-                        continue
-                
-                if not found:
-                    print(f"Could not find tender with N.RDO {tender['N.RDO']} on page")
-                    tender['Document page Link'] = "Not found"
+                reused += 1
+        if reused:
+            print(f"Reusing {reused} document links from the checkpoint")
+    
+    # Tenders without a stored href can only be reached from this page
+    for tender in tenders_basic_info:
+        if 'Document page Link' not in tender and not tender['description_href']:
+            find_link_on_page(driver, tender, main_page_url)
+            record_document_link(tender, checkpoint, page_number)
+    
+    return tenders_basic_info, main_page_url
+
+def find_link_on_page(driver, tender, main_page_url):
+    """Click a tender without a stored href on the list page and return to the page"""
+    try:
+        # If we don't have a direct href, we need to find the tender on the page again
+        print(f"No stored href for tender {tender['N.RDO']}, finding tender on page again...")
         
-        except Exception as e:
-            print(f"Error extracting document link for tender {index}: {str(e)}")
-            tender['Document page Link'] = f"Error: {str(e)}"
-            
-            # Try to return to the main page if there was an error
+        # Wait for the tender rows to be loaded
+        tender_rows = WebDriverWait(driver, 15).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.listVetrina.col-sm-12.nopadding.ng-scope"))
+        )
+        
+        # Find the tender row with matching N.RDO
+        found = False
+        for row in tender_rows:
             try:
-                # Close all tabs except the first one
-                current_handle = driver.current_window_handle
-                for handle in driver.window_handles:
-                    if handle != driver.window_handles[0]:
-                        driver.switch_to.window(handle)
-                        driver.close()
-                
-                # Switch back to the main tab
-                driver.switch_to.window(driver.window_handles[0])
-                
-                # Go back to the main page
-                driver.get(main_page_url)
-                WebDriverWait(driver, 15).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                time.sleep(2)
+                n_rdo_element = row.find_element(By.CSS_SELECTOR, "div.stato.borderElenco.nopadding.col-sm-1 p.regular-14")
+                if n_rdo_element.text.strip() == tender['N.RDO']:
+                    print(f"Found tender with N.RDO {tender['N.RDO']} on page")
+                    
+                    # Find the description link
+                    description_element = row.find_element(
+                        By.CSS_SELECTOR, 
+                        "div.borderElenco p.semibold.semibold-16-sm.ellipsis a.ng-binding"
+                    )
+                    
+                    # Scroll the element into view and click it
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", description_element)
+                    with throttled(main_page_url):
+                        driver.execute_script("arguments[0].click();", description_element)
+                        
+                        # Wait for page to load
+                        wait_for_page_load(driver, 15)
+                        wait_for_url_stable(driver)
+                    
+                    # Get the document URL
+                    document_link = driver.current_url
+                    tender['Document page Link'] = document_link
+                    print(f"Document page Link: {document_link}")
+                    
+                    # Go back to the main page
+                    with throttled(main_page_url):
+                        driver.get(main_page_url)
+                        wait_for_page_load(driver, 15)
+                        wait_for_rows(driver, ROW_SELECTOR)
+                    
+                    found = True
+                    break
             except:
-                print("Error returning to main page")
+                continue
+        
+        if not found:
+            print(f"Could not find tender with N.RDO {tender['N.RDO']} on page")
+            tender['Document page Link'] = "Not found"
     
-    # STEP 3: Translate tender information to English
+    except Exception as e:
+        print(f"Error extracting document link for tender {tender['N.RDO']}: {str(e)}")
+        tender['Document page Link'] = f"Error: {str(e)}"
+        
+        # Try to return to the main page if there was an error
+        try:
+            # Close all tabs except the first one
+            current_handle = driver.current_window_handle
+            for handle in driver.window_handles:
+                if handle != driver.window_handles[0]:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            
+            # Switch back to the main tab
+            driver.switch_to.window(driver.window_handles[0])
+            
+            # Go back to the main page
+            with throttled(main_page_url):
+                driver.get(main_page_url)
+                wait_for_page_load(driver, 15)
+                wait_for_rows(driver, ROW_SELECTOR)
+        except:
+            print("Error returning to main page")
+
+def link_failed(tender):
+    """Whether resolving the tender's document link raised, so a later run should try again"""
+    return tender.get('Document page Link', '').startswith("Error")
+
+def record_document_link(tender, checkpoint=None, page_number=None):
+    """Record a link as soon as it is resolved; failures are retried on resume"""
+    document_link = tender.get('Document page Link', '')
+    if document_link != "Not found" and not link_failed(tender):
+        if tender['description_href']:
+            archive_page('italy', 'link', tender['description_href'], final_url=document_link)
+        if checkpoint is not None:
+            checkpoint.mark_tender(tender['N.RDO'], 'detail', document_link, page_number)
+            checkpoint.save()
+
+def resolve_document_links(tenders, fallback=None, checkpoint=None, page_number=None):
+    """STEP 2: resolve the stored hrefs of tenders that have no document link yet
+
+    Every href is followed over HTTP at once; only links that need JavaScript go to
+    fallback(href), which opens them in a browser.
+    """
+    print("\n--- STEP 2: Extracting document links ---")
+    to_resolve = [tender for tender in tenders if 'Document page Link' not in tender]
+    resolved_links = resolve_links([tender['description_href'] for tender in to_resolve], fallback=fallback)
+    
+    for index, tender in enumerate(to_resolve, 1):
+        print(f"\nExtracting document link for tender {index}: {tender['N.RDO']} - {tender['DESCRIPTION'][:30]}...")
+        document_link = resolved_links.get(tender['description_href'])
+        if document_link:
+            tender['Document page Link'] = document_link
+            print(f"Document page Link: {document_link}")
+        else:
+            print(f"Error extracting document link for tender {index}: Could not resolve href {tender['description_href']}")
+            tender['Document page Link'] = f"Error: Could not resolve href {tender['description_href']}"
+        record_document_link(tender, checkpoint, page_number)
+    return tenders
+
+def translate_tenders(tenders, checkpoint=None, page_number=None):
+    """STEP 3: translate the tenders to English, reusing translations a checkpoint holds"""
     print("\n--- STEP 3: Translating tender information to English ---")
     
     # Fields to translate
     fields_to_translate = ['DESCRIPTION', 'PRODUCT AREA', 'CONTRACTING ENTITY']
     
-    for index, tender in enumerate(tenders_basic_info, 1):
-        print(f"\nTranslating tender {index}: {tender['N.RDO']}...")
-        
-        # Translate each field
-        for field in fields_to_translate:
-            if field in tender and tender[field] != "N/A":
-                try:
-                    original_text = tender[field]
-                    translated_text = translate_text(original_text)
-                    tender[field] = translated_text
-                    print(f"✓ Translated {field}")
-                except Exception as e:
-                    print(f"✗ Failed to translate {field}: {str(e)}")
+    to_translate = tenders
+    if checkpoint is not None:
+        to_translate = []
+        for tender in tenders:
+            translated = checkpoint.tender_stage(tender['N.RDO'], 'translation')
+            if translated:
+                tender.update(translated)
+            else:
+                to_translate.append(tender)
+    
+    try:
+        originals = [[tender.get(field) for field in fields_to_translate] for tender in to_translate]
+        failed = set()
+        get_translation_engine().translate_records(to_translate, fields_to_translate, source='it', target='en',
+                                                   failed=failed)
+        print(f"✓ Translated {len(to_translate)} tenders")
+        if failed:
+            print(f"✗ {len(failed)} texts kept in Italian after failed requests; a resumed run retries them")
+        if checkpoint is not None:
+            # Tenders with text left untranslated are not checkpointed, so a resumed run retries them
+            for tender, texts in zip(to_translate, originals):
+                if not failed.intersection(texts):
+                    checkpoint.mark_tender(tender['N.RDO'], 'translation',
+                                           {field: tender[field] for field in fields_to_translate}, page_number)
+            checkpoint.save()
+    except Exception as e:
+        print(f"✗ Failed to translate tenders: {str(e)}")
     
     # Remove the temporary field used for processing
-    for tender in tenders_basic_info:
+    for tender in tenders:
         if 'description_href' in tender:
             del tender['description_href']
     
-    print(f"\nSuccessfully processed {len(tenders_basic_info)} tenders")
-    return tenders_basic_info
+    print(f"\nSuccessfully processed {len(tenders)} tenders")
+    return tenders
+
+def extract_tender_details(driver, seen_index=None, incremental=True, checkpoint=None, page_number=None,
+                           filters=None):
+    """Extract tender details from the page, reusing stages a checkpoint says already finished
+
+    Runs the three steps one after another in this browser; scrape_page_range runs
+    them as a pipeline instead.
+    """
+    tenders, _ = collect_tenders(driver, seen_index, incremental, checkpoint, page_number, filters)
+    if not tenders:
+        return []
+    resolve_document_links(tenders, lambda href: resolve_link_in_browser(driver, href), checkpoint, page_number)
+    return translate_tenders(tenders, checkpoint, page_number)
 
-def save_to_excel(tenders, page_number):
-    """Save tender details to Excel file"""
+def save_tenders(sink, tenders, page_number):
+    """Append tender details for a page to the run's output file"""
     if not tenders:
         print(f"No tender details to save for page {page_number}!")
         return
     
-    # Create output directory if it doesn't exist
-    output_dir = "tender_details"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(output_dir, f"italy_tender_page{page_number}.xlsx")
-    
-    # Create DataFrame and save to Excel
-    df = pd.DataFrame(tenders)
-    df.to_excel(filename, index=False)
-    print(f"\nTender details for page {page_number} saved to {filename}")
+    sink.write(tenders)
     
     # Display summary
     print(f"\nExtracted Tenders Summary for Page {page_number}:")
     print(f"Total tenders found: {len(tenders)}")
-    print("\nFirst few records:")
-    print(df.head().to_string())
 
-def main():
-    # Get starting page number from user
-    while True:
-        try:
-            start_page = int(input("Enter the starting page number (1 or greater): "))
-            if start_page < 1:
-                print("Please enter a number greater than or equal to 1")
-                continue
-            break
-        except ValueError:
-            print("Please enter a valid number")
+def scrape_page_range(pool, url, first_page, last_page, total_pages, seen_index, sink, incremental=True,
+                      checkpoint=None, filters=None, link_pool=None, stage_workers=None):
+    """Scrape list pages first_page..last_page in one leased browser, skipping pages already written
+
+    The browser only reads the list pages; each page then goes through the links,
+    translate and write stages of a pipeline, so the next page is read while the
+    previous ones are resolved and translated. stage_workers ({stage: threads}) widens
+    a stage. Links that need JavaScript are opened in a browser from link_pool.
+    """
+    stage_workers = stage_workers or {}
     
-    url = "https://www.acquistinretepa.it/opencms/opencms/vetrina_bandi.html?filter=CO#!#post_call_position"
+    def open_in_browser(href):
+        with link_pool.lease() as link_driver:
+            return resolve_link_in_browser(link_driver, href)
     
-    try:
-        driver = setup_driver()
+    def resolve(item):
+        if item['tenders']:
+            resolve_document_links(item['tenders'], open_in_browser if link_pool else None, checkpoint, item['page'])
+        return item
+    
+    def translate(item):
+        if item['tenders']:
+            translate_tenders(item['tenders'], checkpoint, item['page'])
+        return item
+    
+    def write(item):
+        save_tenders(sink, item['tenders'], item['page'])
+        # Tenders whose link failed stay unseen, so an incremental run resolves them again
+        seen_index.mark_done('italy', [tender['N.RDO'] for tender in item['tenders'] if not link_failed(tender)])
+        if checkpoint is not None:
+            checkpoint.mark_page(item['page'], 'done')
+            checkpoint.save()
+        print(f"\nCompleted processing page {item['page']} of {total_pages}")
+        return item
+    
+    pipeline = Pipeline([
+        Stage('links', resolve, stage_workers.get('links', 1)),
+        Stage('translate', translate, stage_workers.get('translate', 1)),
+        Stage('write', write),
+    ])
+    with pool.lease(pages=last_page - first_page + 1) as driver:
+        print(f"Opening the website for pages {first_page}-{last_page}...")
+        with timed('navigation'), throttled(url):
+            driver.get(url)
+            
+            # Select RDO APERTE
+            select_rdo_aperte(driver)
         
-        print("Opening the website...")
-        driver.get(url)
+        # The pagination only links nearby pages, so walk to the first page of the range
+        for page_num in range(2, first_page + 1):
+            if not go_to_page(driver, page_num):
+                raise Exception(f"Could not reach page {first_page}")
         
-        # Select RDO APERTE
-        select_rdo_aperte(driver)
+        def read_pages():
+            for page_num in range(first_page, last_page + 1):
+                if page_num > first_page:
+                    # Navigate to the next page
+                    if not go_to_page(driver, page_num):
+                        print(f"Failed to navigate to page {page_num}, stopping pagination")
+                        break
+                
+                if checkpoint is not None and checkpoint.page_done(page_num):
+                    print(f"Page {page_num} was written before the interruption, skipping it")
+                    continue
+                
+                tenders, _ = collect_tenders(driver, seen_index, incremental, checkpoint, page_num, filters)
+                yield {'page': page_num, 'tenders': tenders}
         
+        pipeline.run(read_pages())
+    pipeline.report()
+    return pipeline.to_dict()
+
+def main(start_page=1, end_page=None, incremental=True, export_excel=True, workers=1, max_pages=25, headless=True,
+         run_id=None, output_format='jsonl', resume=True, filters=None, stage_workers=None):
+    """Scrape pages start_page..end_page (default: the last page) and return the run summary
+
+    With resume, an interrupted run is continued from its checkpoint: written pages are
+    skipped and finished link and translation stages are reused. filters (a FilterSpec)
+    is checked on every list row before its document link is resolved. stage_workers
+    ({'links': n, 'translate': n}) sets the threads of each pipeline stage.
+    """
+    url = LIST_URL
+    
+    summary = {'country': 'italy'}
+    reset_metrics()
+    timer = StageTimer()
+    timer.start('setup')
+    seen_index = SeenIndex()
+    scope = {'start_page': start_page, 'end_page': end_page, 'filters': filters.to_dict() if filters else None}
+    checkpoint = CheckpointStore('italy', resume=resume, scope=scope)
+    # A resumed run keeps appending to the interrupted run's file (Parquet files cannot be appended to)
+    if output_format == 'jsonl':
+        run_id = run_id or checkpoint.run_id
+    sink = open_sink('italy', run_id=run_id, output_format=output_format)
+    checkpoint.run_id = sink.run_id
+    # Each worker leases a warm browser; a browser is replaced after max_pages pages
+    pool = DriverPool(size=workers, max_pages=max_pages, headless=headless)
+    # Links that need JavaScript open in their own browsers, started only if one does; every
+    # links thread of every page range may need one at once
+    link_threads = workers * (stage_workers or {}).get('links', 1)
+    link_pool = DriverPool(size=link_threads, max_pages=max_pages, headless=headless)
+    
+    try:
         # Get total number of pages
-        total_pages = get_total_pages(driver)
+        with pool.lease(pages=0) as driver:
+            print("Opening the website...")
+            with timed('navigation'), throttled(url):
+                driver.get(url)
+                select_rdo_aperte(driver)
+            total_pages = get_total_pages(driver)
         print(f"\nTotal pages found: {total_pages}")
+        end_page = min(end_page or total_pages, total_pages)
         
-        # Process each page starting from start_page
-        for page_num in range(start_page, total_pages + 1):
-            if page_num > start_page:
-                # Navigate to the next page
-                if not go_to_page(driver, page_num):
-                    print(f"Failed to navigate to page {page_num}, stopping pagination")
-                    break
-            
-            # Extract and save tender details for current page
-            tenders = extract_tender_details(driver)
-            save_to_excel(tenders, page_num)
-            
-            print(f"\nCompleted processing page {page_num} of {total_pages}")
+        # Pages written before an interruption are not visited again
+        first_pending = checkpoint.first_pending_page(start_page, end_page)
+        if first_pending is None:
+            print(f"Pages {start_page}-{end_page} were all written by the interrupted run")
+        elif first_pending > start_page:
+            print(f"Resuming at page {first_pending}")
+        
+        # Split the pages from the first pending page across the workers
+        timer.start('scrape')
+        if first_pending is not None:
+            summary['pipeline'] = combine_stage_stats(run_page_ranges(
+                first_pending, end_page,
+                lambda first, last: scrape_page_range(pool, url, first, last, total_pages, seen_index, sink,
+                                                      incremental, checkpoint, filters, link_pool, stage_workers),
+                workers=workers, max_chunk=max_pages
+            ))
+        if checkpoint.first_pending_page(start_page, end_page) is None:
+            checkpoint.clear()
             
     except Exception as e:
         print(f"An error occurred: {str(e)}")
-        if 'driver' in locals():
-            print(f"Final URL: {driver.current_url}")
+        summary['error'] = str(e)
     
     finally:
-        try:
-            if 'driver' in locals():
-                driver.quit()
-        except:
-            pass
+        timer.start('export')
+        pool.close()
+        link_pool.close()
+        save_translation_cache()
+        report_waits()
+        seen_index.close()
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
+
+def parse_archived_page(entry, html):
+    """Read the tenders of an archived list page (run in page_archive.parse_entries workers)"""
+    rows = extract_rows_from_html(html, ROW_SELECTOR, ROW_FIELDS, base_url=entry['url'])
+    return [row_to_tender(row, index) for index, row in enumerate(rows, 1)]
+
+def reparse_archive(since=None, until=None, workers=None, run_id=None, output_format='jsonl', export_excel=False,
+                    archive=None):
+    """Re-run the row extraction over the list pages archived from since to until
+
+    No browser or network is used: document links come from the archived link
+    resolutions (the latest of each href) and translations from the translation cache;
+    text missing from the cache stays in Italian. A tender listed on several captures
+    is written once, as last listed. Returns the run summary.
+    """
+    summary = {'country': 'italy', 'reparse': True}
+    reset_metrics()
+    timer = StageTimer()
+    archive = archive or get_page_archive()
+    sink = open_sink('italy', run_id=run_id, output_format=output_format)
+    try:
+        timer.start('parse')
+        lists = archive.entries('italy', since, until, kinds={'list'})
+        links = latest_by_url(archive.entries('italy', since, until, kinds={'link'}))
+        print(f"Re-parsing {len(lists)} list pages from {archive.root}")
+        tenders = {}
+        for page_tenders in parse_entries(lists, parse_archived_page, workers, archive.root):
+            for tender in page_tenders or []:
+                tenders[tender['N.RDO']] = tender
+        
+        timer.start('translate')
+        tenders = list(tenders.values())
+        for tender in tenders:
+            link = links.get(tender.pop('description_href') or '')
+            tender['Document page Link'] = link['final_url'] if link else "Not found"
+        TranslationEngine(backend=CacheOnlyBackend()).translate_records(
+            tenders, ['DESCRIPTION', 'PRODUCT AREA', 'CONTRACTING ENTITY'], source='it', target='en'
+        )
+        
+        timer.start('write')
+        sink.write(tenders)
+        summary['pages'] = len(lists)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        summary['error'] = str(e)
+    finally:
+        timer.start('export')
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape open RDO tenders from acquistinretepa.it")
+    parser.add_argument('--start', type=int, default=1, help="First page (default 1)")
+    parser.add_argument('--end', type=int, help="Last page (default: the last page)")
+    parser.add_argument('--workers', type=int, default=1, help="Browsers scraping in parallel")
+    parser.add_argument('--max-pages', type=int, default=25, help="Pages per browser before it is replaced")
+    parser.add_argument('--headed', action='store_true', help="Show the browser windows")
+    parser.add_argument('--full', action='store_true', help="Re-scrape tenders seen in earlier runs")
+    parser.add_argument('--no-excel', action='store_true', help="Skip the Excel export")
+    parser.add_argument('--restart', action='store_true', help="Discard the checkpoint of an interrupted run")
+    parser.add_argument('--reparse', action='store_true', help="Re-parse the archived pages instead of scraping")
+    parser.add_argument('--since', help="First fetch date re-parsed, YYYY-MM-DD (default: all)")
+    parser.add_argument('--until', help="Last fetch date re-parsed, YYYY-MM-DD (default: all)")
+    parser.add_argument('--stage-workers', action='append', metavar='STAGE=N',
+                        help="Threads of a pipeline stage, links or translate (default 1 each)")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+    try:
+        filters = filter_from_args(args)
+        stage_workers = parse_stage_workers(args.stage_workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.reparse:
+        reparse_archive(since=args.since, until=args.until, export_excel=not args.no_excel)
+    else:
+        main(start_page=max(args.start, 1), end_page=args.end, incremental=not args.full,
+             export_excel=not args.no_excel, workers=args.workers, max_pages=args.max_pages,
+             headless=not args.headed, resume=not args.restart, filters=filters, stage_workers=stage_workers)
\ No newline at end of file
@@ -1,518 +1,765 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
-import pandas as pd
-import os
-from datetime import datetime
+import argparse
+import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from bs4 import BeautifulSoup
+from http_client import DEFAULT_TIMEOUT, get_session
+from detail_cache import get_detail_cache
+from page_archive import archive_page, get_page_archive, latest_by_url, parse_entries
+from date_utils import standardize_datetime
+from seen_index import SeenIndex
+from output_sink import open_sink
+from driver_pool import DriverPool, run_page_ranges
+from run_summary import StageTimer, finish_summary
+from checkpoint import CheckpointStore
+from metrics import instrumented, reset_metrics, timed
+from host_limiter import throttled
+from tender_filter import add_filter_arguments, filter_from_args
+from tender_schema import japan_deadline
+from waits import report_waits, wait_for_page_load
 
-def standardize_datetime(date_string):
-    """Convert various date/time formats to dd-mm-yyyy and hh-mm-ss format"""
-    # Remove any leading/trailing whitespace and commas
-    date_string = date_string.strip().strip(',')
-    
-    # Initialize variables
-    date_part = ""
-    time_part = ""
-    
-    # First try to separate time if it exists (looking for patterns like "17:00" or "17 : 00")
-    time_match = re.search(r'(\d{1,2}\s*:\s*\d{2})', date_string)
-    if time_match:
-        time_str = time_match.group(1)
-        # Remove the time from the date string
-        date_string = date_string.replace(time_str, '').strip().strip(',').strip()
-        # Standardize time format
-        time_parts = re.findall(r'\d+', time_str)
-        if len(time_parts) >= 2:
-            hours = time_parts[0].zfill(2)
-            minutes = time_parts[1].zfill(2)
-            time_part = f"{hours}-{minutes}-00"  # Adding 00 for seconds
-    
-    # Try different date formats
-    try:
-        # Remove any extra spaces between components and standardize separators
-        date_string = re.sub(r'\s+', ' ', date_string)
-        date_string = re.sub(r'[.,]', '', date_string)  # Remove periods and commas
-        
-        # Common Japanese date format: Reiwa X Year Month Day
-        reiwa_match = re.search(r'(?:Reiwa|令和)\s*(\d+)\s*(?:Year|年)\s*(\d+)\s*(?:Month|月)\s*(\d+)\s*(?:Day|日)', date_string)
-        if reiwa_match:
-            reiwa_year = int(reiwa_match.group(1))
-            month = int(reiwa_match.group(2))
-            day = int(reiwa_match.group(3))
-            # Convert Reiwa year to Gregorian (Reiwa 1 = 2019)
-            gregorian_year = 2018 + reiwa_year
-            return f"{str(day).zfill(2)}-{str(month).zfill(2)}-{str(gregorian_year)}"
-        
-        # Try different date formats
-        date_formats = [
-            '%d %B %Y',
-            '%d %b %Y',
-            '%B %d %Y',
-            '%b %d %Y',
-            '%Y/%m/%d',
-            '%d/%m/%Y',
-            '%Y-%m-%d',
-            '%d-%m-%Y',
-            '%Y年%m月%d日',  # Japanese format
-            '%Y.%m.%d',
-            '%d.%m.%Y',
-            '%m/%d/%Y',
-            '%d %m %Y',
-            '%Y %m %d'
-        ]
-        
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(date_string, fmt)
-                date_part = parsed_date.strftime('%d-%m-%Y')
-                break
-            except ValueError:
-                continue
-        
-        if not date_part:
-            # Try to extract components for more flexible parsing
-            # Look for patterns like "2 July, 2025" or "July 2, 2025"
-            components = re.findall(r'(\d{1,4}|[A-Za-z]+)', date_string)
-            if len(components) >= 3:
-                year = None
-                month = None
-                day = None
-                
-                # Process each component
-                for comp in components:
-                    # Check for year (4 digits)
-                    if comp.isdigit() and len(comp) == 4:
-                        year = int(comp)
-                    # Check for month name
-                    elif comp.isalpha() and len(comp) >= 3:
-                        try:
-                            month = datetime.strptime(comp[:3], '%b').month
-                        except ValueError:
-                            try:
-                                month = datetime.strptime(comp, '%B').month
-                            except ValueError:
-                                continue
-                    # Check for day (1-2 digits)
-                    elif comp.isdigit() and len(comp) <= 2:
-                        day = int(comp)
-                
-                # If we found all components, format the date
-                if year and month and day:
-                    date_part = f"{str(day).zfill(2)}-{str(month).zfill(2)}-{str(year)}"
+# Comment deadlines on numbered lines such as "⑴ Comment deadline: ..."
+COMMENT_PATTERNS = [
+    (r'[⑴-⑽]\s*Time\s*limit\s*for\s*(?:the\s*)?submission\s*of\s*comments\s*:\s*([^<>\n]+)', 'Comment Submission'),
+    (r'[⑴-⑽]\s*Comment\s*deadline\s*:\s*([^<>\n]+)', 'Comment Deadline'),
+    (r'[⑴-⑽]\s*Comments\s*due\s*by\s*:\s*([^<>\n]+)', 'Comments Due'),
+    (r'[⑴-⑽]\s*Comment\s*period\s*(?:ends|closes)\s*:\s*([^<>\n]+)', 'Comment Period End')
+]
+
+# Time-limit for the tender entries
+TENDER_PATTERNS = [
+    # Electronic bidding patterns
+    (r'[⑴-⑽]\s*Term\s*for\s*(?:the\s*)?submission\s*of\s*tenders?\s*by\s*electronic\s*bidding\s*system[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+    (r'[⑴-⑽]\s*Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+    (r'[⑴-⑽]\s*E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
+    (r'[⑴-⑽]\s*Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
     
-    except Exception as e:
-        print(f"Error parsing date: {e}")
+    # Specific tender submission patterns
+    (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Mailing\)[^:]*:\s*([^<>\n]+)', 'Tender (Mailing)'),
+    (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Bringing\)[^:]*:\s*([^<>\n]+)', 'Tender (Bringing)'),
+    (r'[⑴-⑽]\s*Time-limit\s*for\s*(?:tender|submission|application)[^:]*:\s*([^<>\n]+)', 'Tender'),
+    (r'[⑴-⑽]\s*Time-limit\s*for\s*receipt\s*of\s*tenders[^:]*:\s*([^<>\n]+)', 'Tender Receipt'),
+    (r'[⑴-⑽]\s*Time-limit\s*for\s*submission[^:]*:\s*([^<>\n]+)', 'Submission'),
+    (r'[⑴-⑽]\s*Due\s*date[^:]*:\s*([^<>\n]+)', 'Due Date'),
+    
+    # Specific date patterns
+    (r'[⑴-⑽]\s*Submission\s*deadline[^:]*:\s*([^<>\n]+)', 'Submission Deadline'),
+    (r'[⑴-⑽]\s*Application\s*deadline[^:]*:\s*([^<>\n]+)', 'Application Deadline'),
+    (r'[⑴-⑽]\s*Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing Date'),
+    (r'[⑴-⑽]\s*Expiration\s*date[^:]*:\s*([^<>\n]+)', 'Expiration Date'),
+    (r'[⑴-⑽]\s*Tender\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Tender Closing Date'),
+    (r'[⑴-⑽]\s*Bid\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Bid Closing Date'),
     
-    # Return formatted date and time
-    if date_part and time_part:
-        return f"{date_part} {time_part}"
-    elif date_part:
-        return f"{date_part}"
-    elif time_part:
-        return f"{time_part}"
-    return date_string  # Return original string if parsing failed
+    # Specific time patterns
+    (r'[⑴-⑽]\s*Time\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender Time'),
+    (r'[⑴-⑽]\s*Time\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission Time'),
+    (r'[⑴-⑽]\s*Time\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing Time'),
+    (r'[⑴-⑽]\s*Tender\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Tender Closing Time'),
+    (r'[⑴-⑽]\s*Bid\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Bid Closing Time'),
+    
+    # Combined date and time patterns
+    (r'[⑴-⑽]\s*Deadline\s*for\s*(?:tender|submission)[^:]*:\s*([^<>\n]+)', 'Tender Deadline'),
+    (r'[⑴-⑽]\s*Final\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Final Date/Time'),
+    (r'[⑴-⑽]\s*Last\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Last Date/Time'),
+    (r'[⑴-⑽]\s*Tender\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender Date/Time'),
+    (r'[⑴-⑽]\s*Bid\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid Date/Time')
+]
+
+# Broader patterns, only used if no specific time limit is found
+BROADER_PATTERNS = [
+    # Electronic bidding patterns
+    (r'Term\s*for\s*(?:the\s*)?submission\s*(?:of\s*tenders?)?\s*by\s*electronic\s*bidding[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+    (r'Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+    (r'E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
+    (r'Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Online submission'),
+    
+    # General time limit patterns
+    (r'Time-limit[^:]*:\s*([^<>\n]+)', 'Time-limit'),
+    (r'Deadline[^:]*:\s*([^<>\n]+)', 'Deadline'),
+    (r'Due\s*date[^:]*:\s*([^<>\n]+)', 'Due date'),
+    (r'Submission\s*date[^:]*:\s*([^<>\n]+)', 'Submission date'),
+    
+    # Additional date patterns
+    (r'Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing date'),
+    (r'End\s*date[^:]*:\s*([^<>\n]+)', 'End date'),
+    (r'Expiry\s*date[^:]*:\s*([^<>\n]+)', 'Expiry date'),
+    (r'Tender\s*date[^:]*:\s*([^<>\n]+)', 'Tender date'),
+    (r'Bid\s*date[^:]*:\s*([^<>\n]+)', 'Bid date'),
+    
+    # Additional time patterns
+    (r'Closing\s*time[^:]*:\s*([^<>\n]+)', 'Closing time'),
+    (r'End\s*time[^:]*:\s*([^<>\n]+)', 'End time'),
+    (r'Final\s*time[^:]*:\s*([^<>\n]+)', 'Final time'),
+    (r'Tender\s*time[^:]*:\s*([^<>\n]+)', 'Tender time'),
+    (r'Bid\s*time[^:]*:\s*([^<>\n]+)', 'Bid time'),
+    
+    # Date/time combinations
+    (r'(?:Date|Time)\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission date/time'),
+    (r'(?:Date|Time)\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing date/time'),
+    (r'(?:Date|Time)\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender date/time'),
+    (r'(?:Date|Time)\s*of\s*bid[^:]*:\s*([^<>\n]+)', 'Bid date/time'),
+    
+    # Additional combinations
+    (r'Tender\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender closing'),
+    (r'Bid\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid closing'),
+    (r'Submission\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Submission closing')
+]
+
+def compile_time_limit_patterns(*pattern_groups):
+    """Merge (pattern, label) lists into one case-insensitive alternation with named groups
+
+    Each alternative becomes (?P<pN>...) with its value captured as (?P<vN>...), so one
+    search per line returns the matched alternative and its label directly.
+    """
+    alternatives = []
+    labels = {}
+    for group_index, patterns in enumerate(pattern_groups):
+        for pattern, label in patterns:
+            index = len(alternatives)
+            named = pattern.replace('([^<>\\n]+)', f'(?P<v{index}>[^<>\\n]+)')
+            if named == pattern:
+                raise ValueError(f"Pattern has no value group: {pattern}")
+            alternatives.append(f'(?P<p{index}>{named})')
+            labels[f'p{index}'] = (group_index, label, f'v{index}')
+    return re.compile('|'.join(alternatives), re.IGNORECASE), labels
+
+# Compiled once at import: comment and tender patterns share one scan, broader patterns another
+PRIMARY_TIME_LIMIT_REGEX, PRIMARY_TIME_LIMIT_LABELS = compile_time_limit_patterns(COMMENT_PATTERNS, TENDER_PATTERNS)
+BROADER_TIME_LIMIT_REGEX, BROADER_TIME_LIMIT_LABELS = compile_time_limit_patterns(BROADER_PATTERNS)
+
+# Detail results cached by another parser are not reused (see detail_cache): bump the
+# revision when parse_detail_page changes; editing the patterns changes the version itself
+DETAIL_PARSER_REVISION = 1
+DETAIL_PARSER_VERSION = f"{DETAIL_PARSER_REVISION}-" + hashlib.sha1(
+    repr((COMMENT_PATTERNS, TENDER_PATTERNS, BROADER_PATTERNS)).encode('utf-8')).hexdigest()[:12]
+
+HTML_TAG_REGEX = re.compile(r'<(?!br|/br)[^>]+>')
+WHITESPACE_REGEX = re.compile(r'\s+')
+BR_SPLIT_REGEX = re.compile(r'<br\s*/?>')
+
+def scan_time_limits(lines, regex, labels, group_count):
+    """Scan each line once, returning the formatted matches per pattern group"""
+    found = [[] for _ in range(group_count)]
+    for line in lines:
+        match = regex.search(line)
+        if not match:
+            continue
+        group_index, label, value_group = labels[match.lastgroup]
+        time_limit = match.group(value_group).strip()
+        if time_limit and time_limit.lower() != 'none':
+            # Standardize the date/time format
+            found[group_index].append(f"{label}: {standardize_datetime(time_limit)}")
+    return found
 
 def extract_time_limit(text):
     """Extract time limit information from the summary text using regex"""
-    time_limits = []
-    
     # Clean the text by removing unnecessary HTML tags and normalizing spaces
-    text = re.sub(r'<(?!br|/br)[^>]+>', ' ', text)  # Keep <br> tags for splitting
-    text = re.sub(r'\s+', ' ', text)
+    text = HTML_TAG_REGEX.sub(' ', text)  # Keep <br> tags for splitting
+    text = WHITESPACE_REGEX.sub(' ', text)
     
     # Split text by <br> tags to process line by line
-    lines = re.split(r'<br\s*/?>', text)
+    lines = BR_SPLIT_REGEX.split(text)
     
-    # First look for comment submission deadline in the specific format
-    comment_patterns = [
-        (r'[⑴-⑽]\s*Time\s*limit\s*for\s*(?:the\s*)?submission\s*of\s*comments\s*:\s*([^<>\n]+)', 'Comment Submission'),
-        (r'[⑴-⑽]\s*Comment\s*deadline\s*:\s*([^<>\n]+)', 'Comment Deadline'),
-        (r'[⑴-⑽]\s*Comments\s*due\s*by\s*:\s*([^<>\n]+)', 'Comments Due'),
-        (r'[⑴-⑽]\s*Comment\s*period\s*(?:ends|closes)\s*:\s*([^<>\n]+)', 'Comment Period End')
-    ]
-    
-    for line in lines:
-        for pattern, label in comment_patterns:
-            comment_match = re.search(pattern, line, re.IGNORECASE)
-            if comment_match:
-                comment_deadline = comment_match.group(1).strip()
-                if comment_deadline and comment_deadline.lower() != 'none':
-                    # Standardize the date/time format
-                    formatted_deadline = standardize_datetime(comment_deadline)
-                    time_limits.append(f"{label}: {formatted_deadline}")
-    
-    # Pattern to match time-limit for the tender entries
-    tender_patterns = [
-        # Electronic bidding patterns
-        (r'[⑴-⑽]\s*Term\s*for\s*(?:the\s*)?submission\s*of\s*tenders?\s*by\s*electronic\s*bidding\s*system[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
-        (r'[⑴-⑽]\s*Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
-        (r'[⑴-⑽]\s*E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
-        (r'[⑴-⑽]\s*Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic Bidding'),
-        
-        # Specific tender submission patterns
-        (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Mailing\)[^:]*:\s*([^<>\n]+)', 'Tender (Mailing)'),
-        (r'[⑴-⑽]\s*Time-limit\s*for\s*the\s*tender\s*\(Bringing\)[^:]*:\s*([^<>\n]+)', 'Tender (Bringing)'),
-        (r'[⑴-⑽]\s*Time-limit\s*for\s*(?:tender|submission|application)[^:]*:\s*([^<>\n]+)', 'Tender'),
-        (r'[⑴-⑽]\s*Time-limit\s*for\s*receipt\s*of\s*tenders[^:]*:\s*([^<>\n]+)', 'Tender Receipt'),
-        (r'[⑴-⑽]\s*Time-limit\s*for\s*submission[^:]*:\s*([^<>\n]+)', 'Submission'),
-        (r'[⑴-⑽]\s*Due\s*date[^:]*:\s*([^<>\n]+)', 'Due Date'),
-        
-        # Specific date patterns
-        (r'[⑴-⑽]\s*Submission\s*deadline[^:]*:\s*([^<>\n]+)', 'Submission Deadline'),
-        (r'[⑴-⑽]\s*Application\s*deadline[^:]*:\s*([^<>\n]+)', 'Application Deadline'),
-        (r'[⑴-⑽]\s*Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing Date'),
-        (r'[⑴-⑽]\s*Expiration\s*date[^:]*:\s*([^<>\n]+)', 'Expiration Date'),
-        (r'[⑴-⑽]\s*Tender\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Tender Closing Date'),
-        (r'[⑴-⑽]\s*Bid\s*closing\s*date[^:]*:\s*([^<>\n]+)', 'Bid Closing Date'),
-        
-        # Specific time patterns
-        (r'[⑴-⑽]\s*Time\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender Time'),
-        (r'[⑴-⑽]\s*Time\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission Time'),
-        (r'[⑴-⑽]\s*Time\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing Time'),
-        (r'[⑴-⑽]\s*Tender\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Tender Closing Time'),
-        (r'[⑴-⑽]\s*Bid\s*closing\s*time[^:]*:\s*([^<>\n]+)', 'Bid Closing Time'),
-        
-        # Combined date and time patterns
-        (r'[⑴-⑽]\s*Deadline\s*for\s*(?:tender|submission)[^:]*:\s*([^<>\n]+)', 'Tender Deadline'),
-        (r'[⑴-⑽]\s*Final\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Final Date/Time'),
-        (r'[⑴-⑽]\s*Last\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Last Date/Time'),
-        (r'[⑴-⑽]\s*Tender\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender Date/Time'),
-        (r'[⑴-⑽]\s*Bid\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid Date/Time')
-    ]
-    
-    # Look for tender time limits
-    for line in lines:
-        for pattern, label in tender_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                time_limit = match.group(1).strip()
-                if time_limit and time_limit.lower() != 'none':
-                    # Standardize the date/time format
-                    formatted_time_limit = standardize_datetime(time_limit)
-                    time_limits.append(f"{label}: {formatted_time_limit}")
+    # Comment deadlines are listed before tender time limits
+    comment_limits, tender_limits = scan_time_limits(lines, PRIMARY_TIME_LIMIT_REGEX, PRIMARY_TIME_LIMIT_LABELS, 2)
+    time_limits = comment_limits + tender_limits
     
     # If no specific time limits found, try broader patterns
     if not time_limits:
-        broader_patterns = [
-            # Electronic bidding patterns
-            (r'Term\s*for\s*(?:the\s*)?submission\s*(?:of\s*tenders?)?\s*by\s*electronic\s*bidding[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
-            (r'Electronic\s*bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
-            (r'E-bidding\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Electronic bidding'),
-            (r'Online\s*submission\s*(?:period|term|deadline)[^:]*:\s*([^<>\n]+)', 'Online submission'),
-            
-            # General time limit patterns
-            (r'Time-limit[^:]*:\s*([^<>\n]+)', 'Time-limit'),
-            (r'Deadline[^:]*:\s*([^<>\n]+)', 'Deadline'),
-            (r'Due\s*date[^:]*:\s*([^<>\n]+)', 'Due date'),
-            (r'Submission\s*date[^:]*:\s*([^<>\n]+)', 'Submission date'),
-            
-            # Additional date patterns
-            (r'Closing\s*date[^:]*:\s*([^<>\n]+)', 'Closing date'),
-            (r'End\s*date[^:]*:\s*([^<>\n]+)', 'End date'),
-            (r'Expiry\s*date[^:]*:\s*([^<>\n]+)', 'Expiry date'),
-            (r'Tender\s*date[^:]*:\s*([^<>\n]+)', 'Tender date'),
-            (r'Bid\s*date[^:]*:\s*([^<>\n]+)', 'Bid date'),
-            
-            # Additional time patterns
-            (r'Closing\s*time[^:]*:\s*([^<>\n]+)', 'Closing time'),
-            (r'End\s*time[^:]*:\s*([^<>\n]+)', 'End time'),
-            (r'Final\s*time[^:]*:\s*([^<>\n]+)', 'Final time'),
-            (r'Tender\s*time[^:]*:\s*([^<>\n]+)', 'Tender time'),
-            (r'Bid\s*time[^:]*:\s*([^<>\n]+)', 'Bid time'),
-            
-            # Date/time combinations
-            (r'(?:Date|Time)\s*of\s*submission[^:]*:\s*([^<>\n]+)', 'Submission date/time'),
-            (r'(?:Date|Time)\s*of\s*closing[^:]*:\s*([^<>\n]+)', 'Closing date/time'),
-            (r'(?:Date|Time)\s*of\s*tender[^:]*:\s*([^<>\n]+)', 'Tender date/time'),
-            (r'(?:Date|Time)\s*of\s*bid[^:]*:\s*([^<>\n]+)', 'Bid date/time'),
-            
-            # Additional combinations
-            (r'Tender\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Tender closing'),
-            (r'Bid\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Bid closing'),
-            (r'Submission\s*(?:closing|end)\s*(?:date|time)[^:]*:\s*([^<>\n]+)', 'Submission closing')
-        ]
-        
-        for line in lines:
-            for pattern, label in broader_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    time_limit = match.group(1).strip()
-                    if time_limit and time_limit.lower() != 'none':
-                        # Standardize the date/time format
-                        formatted_time_limit = standardize_datetime(time_limit)
-                        time_limits.append(f"{label}: {formatted_time_limit}")
+        time_limits = scan_time_limits(lines, BROADER_TIME_LIMIT_REGEX, BROADER_TIME_LIMIT_LABELS, 1)[0]
     
     if time_limits:
         # Remove duplicates while preserving order
-        unique_limits = []
-        for limit in time_limits:
-            if limit not in unique_limits:
-                unique_limits.append(limit)
-        return " | ".join(unique_limits)
+        return " | ".join(dict.fromkeys(time_limits))
     
     return "Not specified"
 
-def extract_detail_info(driver, title_element):
-    """Extract detailed information by clicking on the tender title"""
-    print(f"Clicking on title: {title_element.text[:50]}...")
+JAPAN_BASE_URL = "https://www.jetro.go.jp/en/database/procurement/national/list.html?type=&from=&to=&entity=&area=&keyword=&classification1=&classification2=&classification3=&deadline="
+
+# JETRO lists the newest notices first, so paging can stop at a page published before the filter's window
+LIST_NEWEST_FIRST = True
+
+# Filter conditions JETRO's list applies itself: query parameter -> FilterSpec attribute.
+# The rows are still checked, so a parameter the site reads loosely only costs a few rows.
+URL_FILTERS = {
+    'from': 'published_since',
+    'to': 'published_until',
+    'deadline': 'deadline_after',
+    'keyword': 'keyword',
+}
+URL_DATE_FORMAT = '%Y/%m/%d'
+
+# List fields that identify a changed tender, hashed before the detail page is fetched
+SEEN_HASH_FIELDS = ['Publishing Date', 'Procurement Entity', 'Type of Notice', 'Title']
+
+# Selectors tried in order on the detail page to find the summary cells
+DETAIL_SELECTORS = [
+    "table.elem_table_basic td",
+    "table.search-detail td",
+    "div.search-detail td",
+    "table td"
+]
+
+def parse_detail_page(html, detail_url):
+    """Extract the time limit and document links from a detail page's HTML"""
+    soup = BeautifulSoup(html, 'html.parser')
     
-    # Store the current window handle
-    main_window = driver.current_window_handle
+    detail_info = {
+        'Detail URL': detail_url,
+        'Time Limit': "Not specified"
+    }
     
     try:
-        # Click on the title to open the detail page
-        title_element.click()
-        time.sleep(3)
-        
-        # Switch to the new window if one opened
-        all_windows = driver.window_handles
-        detail_window = None
-        for window in all_windows:
-            if window != main_window:
-                detail_window = window
+        # Look for the summary cell that contains time limit information
+        # Try different CSS selectors to find the relevant content
+        found_time_limit = False
+        for selector in DETAIL_SELECTORS:
+            if found_time_limit:
                 break
-        
-        if detail_window:
-            driver.switch_to.window(detail_window)
-            time.sleep(3)
-        
-        # Get the current URL after clicking
-        detail_url = driver.current_url
-        print(f"Detail page URL: {detail_url}")
-        
-        detail_info = {
-            'Detail URL': detail_url,
-            'Time Limit': "Not specified"
-        }
-        
-        try:
-            print("Searching for time limit information...")
             
-            # Look for the summary cell that contains time limit information
-            # Try different CSS selectors to find the relevant content
-            selectors = [
-                "table.elem_table_basic td",
-                "table.search-detail td",
-                "div.search-detail td",
-                "table td"
-            ]
-            
-            found_time_limit = False
-            for selector in selectors:
-                if found_time_limit:
+            for cell in soup.select(selector):
+                cell_text = cell.decode_contents()
+                if not cell_text:
+                    continue
+                
+                # Extract time limits from the cell text
+                time_limit = extract_time_limit(cell_text)
+                if time_limit != "Not specified":
+                    if detail_info['Time Limit'] == "Not specified":
+                        detail_info['Time Limit'] = time_limit
+                    else:
+                        detail_info['Time Limit'] += f" | {time_limit}"
+                    found_time_limit = True
                     break
-                    
-                summary_cells = driver.find_elements(By.CSS_SELECTOR, selector)
-                for cell in summary_cells:
-                    cell_text = cell.get_attribute('innerHTML')
-                    if not cell_text:
-                        continue
-                    
-                    # Extract time limits from the cell text
-                    time_limit = extract_time_limit(cell_text)
-                    if time_limit != "Not specified":
-                        if detail_info['Time Limit'] == "Not specified":
-                            detail_info['Time Limit'] = time_limit
-                        else:
-                            detail_info['Time Limit'] += f" | {time_limit}"
-                        found_time_limit = True
-                        break
-            
-        except Exception as e:
-            print(f"Error extracting time limit: {e}")
+    
+    except Exception as e:
+        print(f"Error extracting time limit: {e}")
+    
+    # Try to find any documents or attachments
+    document_links = []
+    try:
+        for link in soup.select("a[href*='pdf'], a[href*='doc'], a[href*='xls']"):
+            doc_url = urljoin(detail_url, link.get('href', ''))
+            doc_text = link.get_text(strip=True)
+            if doc_url and doc_text:
+                document_links.append({"text": doc_text, "url": doc_url})
+    except:
+        pass
+    
+    if document_links:
+        detail_info["Document Links"] = document_links
+    
+    return detail_info
+
+def fetch_detail_info(detail_url, session=None):
+    """Download a detail page over HTTP and extract its information
+
+    A page unchanged since it was last parsed answers with 304 and its stored result
+    is reused (see detail_cache).
+    """
+    with timed('detail_resolution') as measured:
+        def parse(response):
+            response.raise_for_status()
+            measured['bytes'] = len(response.content)
+            archive_page('japan', 'detail', detail_url, response.text, final_url=response.url)
+            return parse_detail_page(response.text, response.url)
         
-        # Try to find any documents or attachments
-        document_links = []
+        return get_detail_cache().fetch(detail_url, parse, session=session, version=DETAIL_PARSER_VERSION)
+
+@instrumented('detail_resolution')
+def extract_detail_info(driver, detail_url):
+    """Extract detailed information by opening the detail page in the browser"""
+    print(f"Opening detail page in browser: {detail_url}")
+    with throttled(detail_url):
+        driver.get(detail_url)
+        wait_for_page_load(driver, 15)
+    html = driver.page_source
+    archive_page('japan', 'detail', detail_url, html, final_url=driver.current_url)
+    return parse_detail_page(html, driver.current_url)
+
+def fetch_detail_pages(detail_urls, fallback=None, max_workers=8, on_fetched=None):
+    """Fetch detail pages concurrently, using the fallback (the browser) for pages that fail over HTTP
+
+    on_fetched(detail_url, detail_info) is called as each page is read.
+    """
+    details = {}
+    failed = []
+    
+    def fetch(detail_url):
         try:
-            links = driver.find_elements(By.CSS_SELECTOR, "a[href*='pdf'], a[href*='doc'], a[href*='xls']")
-            for link in links:
-                doc_url = link.get_attribute("href")
-                doc_text = link.text.strip()
-                if doc_url and doc_text:
-                    document_links.append({"text": doc_text, "url": doc_url})
-        except:
-            pass
+            return detail_url, fetch_detail_info(detail_url)
+        except Exception as e:
+            print(f"HTTP fetch failed for {detail_url}: {e}")
+            return detail_url, None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for detail_url, detail_info in executor.map(fetch, detail_urls):
+            if detail_info is None:
+                failed.append(detail_url)
+            else:
+                details[detail_url] = detail_info
+                if on_fetched is not None:
+                    on_fetched(detail_url, detail_info)
+    print(f"Fetched {len(details)}/{len(detail_urls)} detail pages over HTTP")
+    
+    if failed and fallback is not None:
+        for detail_url in failed:
+            try:
+                details[detail_url] = fallback(detail_url)
+                if on_fetched is not None:
+                    on_fetched(detail_url, details[detail_url])
+            except Exception as e:
+                print(f"Error extracting detail information: {e}")
+    
+    return details
+
+def parse_list_page(html, page_url):
+    """Read every row's fields and detail link from list page HTML"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    tenders = []
+    for row in soup.select("div.elem_table_basic.spv table.var_base_color tbody tr"):
+        # Skip the hidden template row
+        style = (row.get('style') or '').replace(' ', '')
+        if 'display:none' in style or "local_results_template" in (row.get('id') or ''):
+            continue
         
-        if document_links:
-            detail_info["Document Links"] = document_links
+        cells = row.find_all('td')
+        if len(cells) < 4:
+            continue
         
-        # Close the detail window and switch back to the main window
-        if detail_window:
-            driver.close()
-            driver.switch_to.window(main_window)
+        date_span = cells[0].select_one("span[data-role='date']")
+        info_span = cells[1].select_one("span[data-role='info']")
+        cate_span = cells[2].select_one("span[data-role='cate']")
+        title = cells[3].get_text(strip=True)
+        link = cells[3].find('a', href=True)
+        if not (date_span and info_span and cate_span):
+            continue
+        if link is None:
+            print(f"No link found for tender: {title[:50]}...")
+            continue
         
-    except Exception as e:
-        print(f"Error extracting detail information: {e}")
-        # Make sure we're back on the main window
-        for window in driver.window_handles:
-            if window == main_window:
-                driver.switch_to.window(main_window)
-                break
+        tenders.append({
+            'Publishing Date': standardize_datetime(date_span.get_text(strip=True)),
+            'Procurement Entity': info_span.get_text(strip=True),
+            'Type of Notice': cate_span.get_text(strip=True),
+            'Title': title,
+            'Country': 'Japan',
+            'Website Link': page_url,
+            'detail_href': urljoin(page_url, link['href'])
+        })
     
-    return detail_info
+    return tenders
+
+def list_page_url(base_url, page_number):
+    return f"{base_url}&_page={page_number}"
+
+def filtered_base_url(base_url, filters):
+    """base_url with the filter's conditions set in the list's own query parameters (URL_FILTERS)"""
+    if not filters:
+        return base_url
+    parts = urlsplit(base_url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    for name, attribute in URL_FILTERS.items():
+        value = getattr(filters, attribute)
+        if value is not None:
+            query[name] = value.strftime(URL_DATE_FORMAT) if hasattr(value, 'strftime') else value
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def row_filter_values(row):
+    """The filter values a list row already carries"""
+    return {'published': row['Publishing Date'], 'notice_type': row['Type of Notice'],
+            'entity': row['Procurement Entity'], 'text': row['Title']}
+
+def detail_filter_values(tender):
+    """The filter values the detail page adds: the deadline of its time limit"""
+    return {'deadline': japan_deadline(tender.get('Time Limit'))}
 
-def scrape_japan_tenders(start_page=1, end_page=1):
-    # Setup Chrome options
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    # Uncomment the line below if you want to run Chrome in headless mode
-    # chrome_options.add_argument("--headless")
+def past_filter_window(filters, rows):
+    """Whether a list page lies wholly before the filter's publication window, and so does every later page"""
+    return bool(filters and rows) and filters.past_window(
+        [row['Publishing Date'] for row in rows], 'published', LIST_NEWEST_FIRST
+    )
+
+def fetch_list_page(page_number, base_url=JAPAN_BASE_URL, session=None):
+    """Download one list page over HTTP and parse its rows"""
+    session = session or get_session()
+    page_url = list_page_url(base_url, page_number)
+    with timed('navigation') as measured:
+        response = session.get(page_url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        measured['bytes'] = len(response.content)
+    archive_page('japan', 'list', page_url, response.text, page=page_number)
+    with timed('list_extraction', measured['bytes']):
+        return parse_list_page(response.text, page_url)
+
+def fetch_list_pages(start_page, end_page, base_url=JAPAN_BASE_URL, max_workers=4, skip=(), stop=None):
+    """Fetch a range of list pages, except those in skip, concurrently, returning {page: rows}
+
+    Pages that fail or come back without rows (e.g. rendered client-side) are left out
+    so the caller can read them with the browser instead. Pages are fetched max_workers
+    at a time, and none are started after a page whose rows stop(rows) is true for.
+    """
+    pages = {}
     
-    # Initialize the Chrome driver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    def fetch(page_number):
+        try:
+            return page_number, fetch_list_page(page_number, base_url)
+        except Exception as e:
+            print(f"HTTP fetch failed for list page {page_number}: {e}")
+            return page_number, None
     
-    # Base URL without pagination
-    base_url = "https://www.jetro.go.jp/en/database/procurement/national/list.html?type=&from=&to=&entity=&area=&keyword=&classification1=&classification2=&classification3=&deadline="
+    page_numbers = [page_number for page_number in range(start_page, end_page + 1) if page_number not in skip]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if stop is None:
+            batches = [page_numbers]
+        else:
+            batches = [page_numbers[i:i + max_workers] for i in range(0, len(page_numbers), max_workers)]
+        for batch in batches:
+            stopped = False
+            for page_number, rows in executor.map(fetch, batch):
+                if rows:
+                    pages[page_number] = rows
+                    stopped = stopped or stop is not None and stop(rows)
+            if stopped:
+                break
+    print(f"Fetched {len(pages)}/{len(page_numbers)} list pages over HTTP")
+    return pages
+
+@instrumented('list_extraction')
+def read_list_rows(driver, page_url):
+    """Read every row's fields and detail link from the list page in a single pass"""
+    # Wait for the table to be present using the correct CSS selector
+    table = WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "div.elem_table_basic.spv table.var_base_color"))
+    )
+    archive_page('japan', 'list', page_url, driver.page_source)
     
-    # Navigate to the JETRO government procurement website with starting page
-    initial_url = f"{base_url}&_page={start_page}"
-    print(f"Opening URL: {initial_url}")
+    # Find all rows in the table (excluding the hidden template row)
+    rows = table.find_elements(By.CSS_SELECTOR, "tbody tr:not([style*='display:none'])")
+    print(f"Found {len(rows)} rows in the table")
     
-    try:
-        driver.get(initial_url)
-        print("Successfully loaded the page")
-        
-        # Wait for the page to load completely
-        time.sleep(5)
-        
-        # Get the page title to verify we're on the right page
-        page_title = driver.title
-        print(f"Page title: {page_title}")
+    tenders = []
+    for row in rows:
+        try:
+            # Skip if this is the template row
+            if "local_results_template" in (row.get_attribute("id") or "") and "display: none" in (row.get_attribute("style") or ""):
+                continue
+            
+            cells = row.find_elements(By.TAG_NAME, "td")
+            if len(cells) < 4:
+                continue
+            
+            # Extract data from each cell using the data-role attributes
+            raw_publishing_date = cells[0].find_element(By.CSS_SELECTOR, "span[data-role='date']").text.strip()
+            procurement_entity = cells[1].find_element(By.CSS_SELECTOR, "span[data-role='info']").text.strip()
+            notice_type = cells[2].find_element(By.CSS_SELECTOR, "span[data-role='cate']").text.strip()
+            title = cells[3].text.strip()
+            
+            # Get the detail link instead of clicking it
+            try:
+                detail_href = cells[3].find_element(By.TAG_NAME, "a").get_attribute("href")
+            except:
+                detail_href = None
+            if not detail_href:
+                print(f"No link found for tender: {title[:50]}...")
+                continue
+            
+            tenders.append({
+                # Standardize the publishing date format
+                'Publishing Date': standardize_datetime(raw_publishing_date),
+                'Procurement Entity': procurement_entity,
+                'Type of Notice': notice_type,
+                'Title': title,
+                'Country': 'Japan',
+                'Website Link': page_url,
+                'detail_href': detail_href
+            })
+        except Exception as e:
+            print(f"Error reading row: {e}")
+    
+    return tenders
+
+def merge_detail(tender_info, detail_info):
+    """The list row merged with its detail page, or None unless the detail page gives a time limit"""
+    if not detail_info or detail_info.get('Time Limit') == "Not specified":
+        return None
+    tender_info = {**tender_info, **detail_info}
+    del tender_info['detail_href']
+    return tender_info
+
+def scrape_page_range(pool, first_page, last_page, list_pages, base_url, seen_index, sink, incremental=True,
+                      checkpoint=None, filters=None):
+    """Scrape list pages first_page..last_page, leasing a browser only when a page needs one
+
+    With a checkpoint, pages already written are skipped and list rows and detail pages
+    read before an interruption are not downloaded again. filters (a FilterSpec) drops
+    rows before their detail page is fetched and ends the range at a page published
+    before its window.
+    """
+    current_page = first_page
+    
+    while current_page <= last_page:
+        if checkpoint is not None and checkpoint.page_done(current_page):
+            print(f"Page {current_page} was written before the interruption, skipping it")
+            current_page += 1
+            continue
+        print(f"Processing page {current_page} of {last_page}")
+        current_url = list_page_url(base_url, current_page)
         
-        # Process each page from start_page to end_page
-        current_page = start_page
+        # Initialize page-specific tender data list
+        page_tender_data = []
         
-        while current_page <= end_page:
-            print(f"Processing page {current_page} of {end_page}")
-            current_url = f"{base_url}&_page={current_page}"
+        try:
+            # Phase 1: read every row and its detail link from the list page once
+            tenders = list_pages.get(current_page)
+            if not tenders and checkpoint is not None:
+                tenders = checkpoint.page_stage(current_page, 'listing')
+            if not tenders:
+                print(f"Opening URL: {current_url}")
+                with pool.lease() as browser:
+                    with timed('navigation'), throttled(current_url):
+                        browser.get(current_url)
+                    tenders = read_list_rows(browser, current_url)
+                if checkpoint is not None and tenders:
+                    checkpoint.mark_page(current_page, 'listing', tenders)
+                    checkpoint.save()
             
-            # Initialize page-specific tender data list
-            page_tender_data = []
+            if past_filter_window(filters, tenders):
+                print(f"Page {current_page} was published before the filter's window, stopping")
+                break
+            if filters:
+                tenders = filters.apply(tenders, row_filter_values, 'list')
             
-            try:
-                # If not on the first page iteration, navigate to the current page
-                if current_page != start_page or current_page > start_page:
-                    driver.get(current_url)
-                    time.sleep(3)
-                
-                # Wait for the table to be present using the correct CSS selector
-                table = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.elem_table_basic.spv table.var_base_color"))
-                )
-                
-                # Find all rows in the table (excluding the hidden template row)
-                rows = table.find_elements(By.CSS_SELECTOR, "tbody tr:not([style*='display:none'])")
-                
-                print(f"Found {len(rows)} rows in the table on page {current_page}")
-                
-                # Process each row to get basic and detailed information
-                tenders_per_page = len(rows)
-                tenders_with_time_limit = 0
-                
-                for i in range(tenders_per_page):
-                    # Refresh the page to avoid stale element references
-                    if i > 0:
-                        driver.get(current_url)
-                        time.sleep(3)
-                        
-                        # Re-locate the table and rows
-                        table = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "div.elem_table_basic.spv table.var_base_color"))
-                        )
-                        rows = table.find_elements(By.CSS_SELECTOR, "tbody tr:not([style*='display:none'])")
-                    
-                    # Get the current row
-                    row = rows[i]
-                    
-                    # Skip if this is the template row
-                    if "local_results_template" in row.get_attribute("id") and "display: none" in row.get_attribute("style"):
-                        continue
-                    
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 4:
-                        # Extract data from each cell using the data-role attributes
-                        raw_publishing_date = cells[0].find_element(By.CSS_SELECTOR, "span[data-role='date']").text.strip()
-                        # Standardize the publishing date format
-                        publishing_date = standardize_datetime(raw_publishing_date)
-                        procurement_entity = cells[1].find_element(By.CSS_SELECTOR, "span[data-role='info']").text.strip()
-                        notice_type = cells[2].find_element(By.CSS_SELECTOR, "span[data-role='cate']").text.strip()
-                        
-                        # For the title, we need to get the element to click on it
-                        title_cell = cells[3]
-                        title = title_cell.text.strip()
-                        
-                        # Get the title link element
-                        detail_link_element = None
-                        try:
-                            detail_link_element = title_cell.find_element(By.TAG_NAME, "a")
-                        except:
-                            print(f"No link found for tender: {title[:50]}...")
-                            continue
-                        
-                        # Store the basic data
-                        tender_info = {
-                            'Publishing Date': publishing_date,
-                            'Procurement Entity': procurement_entity,
-                            'Type of Notice': notice_type,
-                            'Title': title,
-                            'Country': 'Japan',
-                            'Website Link': current_url
-                        }
-                        
-                        print(f"Processing tender {i+1}/{tenders_per_page} on page {current_page}")
-                        
-                        # Click on the title and extract detailed information
-                        if detail_link_element:
-                            detail_info = extract_detail_info(driver, detail_link_element)
-                            
-                            # Only add tenders with specified time limits
-                            if detail_info.get('Time Limit') != "Not specified":
-                                # Merge basic and detailed information
-                                tender_info = {**tender_info, **detail_info}
-                                page_tender_data.append(tender_info)
-                                tenders_with_time_limit += 1
-                
-                # Save the data for this page to Excel
-                if page_tender_data:
-                    df = pd.DataFrame(page_tender_data)
-                    
-                    # Handle document links column which contains lists
-                    if 'Document Links' in df.columns:
-                        df['Document Links'] = df['Document Links'].apply(lambda x: str(x) if isinstance(x, list) else x)
-                    
-                    # Create timestamp for the filename
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    output_file = f"japan_tenders_page_{current_page}_{timestamp}.xlsx"
-                    df.to_excel(output_file, index=False)
-                    print(f"Data for page {current_page} saved to {os.path.abspath(output_file)}")
-                    print(f"Found {tenders_with_time_limit} tenders with specified time limits on page {current_page}")
-                else:
-                    print(f"No tenders with specified time limits found on page {current_page}")
-                
-                # Move to the next page
-                current_page += 1
-                
-            except Exception as e:
-                print(f"Error processing page {current_page}: {e}")
-                current_page += 1  # Try to continue with the next page even if there was an error
+            # Only new or changed tenders need their detail page fetched
+            tenders = seen_index.filter_changed(
+                'japan', tenders, 'detail_href', SEEN_HASH_FIELDS, skip_unchanged=incremental
+            )
+            
+            # Phase 2: fetch all detail pages independently, in parallel
+            def read_in_browser(detail_url):
+                with pool.lease() as browser:
+                    return extract_detail_info(browser, detail_url)
+            
+            # Detail pages read before an interruption come from the checkpoint
+            details = {}
+            if checkpoint is not None:
+                for tender in tenders:
+                    detail_info = checkpoint.tender_stage(tender['detail_href'], 'detail')
+                    if detail_info:
+                        details[tender['detail_href']] = detail_info
+                if details:
+                    print(f"Reusing {len(details)} detail pages from the checkpoint")
+            
+            def record_detail(detail_url, detail_info, page_number=current_page):
+                checkpoint.mark_tender(detail_url, 'detail', detail_info, page_number)
+                checkpoint.save()
+            
+            details.update(fetch_detail_pages(
+                [tender['detail_href'] for tender in tenders if tender['detail_href'] not in details],
+                fallback=read_in_browser,
+                on_fetched=record_detail if checkpoint is not None else None
+            ))
+            
+            merged = []
+            for tender in tenders:
+                tender_info = merge_detail(tender, details.get(tender['detail_href']))
+                if tender_info:
+                    merged.append((tender['detail_href'], tender_info))
+            tenders_with_time_limit = len(merged)
+            # Tenders the filter drops stay unseen, so a run with other filters still writes them
+            filtered_out = set()
+            if filters:
+                kept = filters.apply(merged, lambda pair: detail_filter_values(pair[1]), 'detail')
+                filtered_out = {href for href, _ in merged} - {href for href, _ in kept}
+                merged = kept
+            page_tender_data = [tender_info for _, tender_info in merged]
+            
+            # Append the data for this page to the run's output file
+            if page_tender_data:
+                sink.write(page_tender_data)
+                print(f"Found {tenders_with_time_limit} tenders with specified time limits on page {current_page}")
+            else:
+                print(f"No tenders with specified time limits found on page {current_page}")
+            
+            # Tenders whose detail page was read are done, with or without a time limit
+            seen_index.mark_done('japan', [href for href in details if href not in filtered_out])
+            if checkpoint is not None:
+                checkpoint.mark_page(current_page, 'done')
+                checkpoint.save()
+            
+            # Move to the next page
+            current_page += 1
+            
+        except Exception as e:
+            print(f"Error processing page {current_page}: {e}")
+            current_page += 1  # Try to continue with the next page even if there was an error
+
+def scrape_japan_tenders(start_page=1, end_page=1, base_url=JAPAN_BASE_URL, use_browser=False, incremental=True,
+                         export_excel=True, workers=1, max_pages=25, headless=True, run_id=None, output_format='jsonl',
+                         resume=True, filters=None):
+    """Scrape list pages start_page..end_page (default: only start_page) and return the run summary
+
+    With resume, an interrupted run is continued from its checkpoint: written pages are
+    skipped and list rows and detail pages already read are reused. filters (a
+    FilterSpec) is pushed into the list URL, then checked on the list rows and the
+    detail pages; the run ends at the first page published before its window.
+    """
+    end_page = max(end_page or start_page, start_page)
+    base_url = filtered_base_url(base_url, filters)
+    summary = {'country': 'japan'}
+    reset_metrics()
+    timer = StageTimer()
+    timer.start('list_pages')
+    # Browsers are only started if a page cannot be read over HTTP
+    pool = DriverPool(size=workers, max_pages=max_pages, headless=headless)
+    seen_index = SeenIndex()
+    scope = {'start_page': start_page, 'end_page': end_page, 'base_url': base_url,
+             'filters': filters.to_dict() if filters else None}
+    checkpoint = CheckpointStore('japan', resume=resume, scope=scope)
+    # A resumed run keeps appending to the interrupted run's file (Parquet files cannot be appended to)
+    if output_format == 'jsonl':
+        run_id = run_id or checkpoint.run_id
+    sink = open_sink('japan', run_id=run_id, output_format=output_format)
+    checkpoint.run_id = sink.run_id
+    
+    try:
+        # Pages written or listed before an interruption are not fetched again
+        first_pending = checkpoint.first_pending_page(start_page, end_page)
+        if first_pending is None:
+            print(f"Pages {start_page}-{end_page} were all written by the interrupted run")
+            first_pending = end_page + 1
+        elif first_pending > start_page:
+            print(f"Resuming at page {first_pending}")
+        known = {page_number for page_number in range(first_pending, end_page + 1)
+                 if checkpoint.page_done(page_number) or checkpoint.page_stage(page_number, 'listing')}
+        
+        # Read the list pages over HTTP concurrently; Selenium is the fallback
+        list_pages = {}
+        last_page = end_page
+        if not use_browser and first_pending <= end_page:
+            list_pages = fetch_list_pages(first_pending, end_page, base_url, skip=known,
+                                          stop=lambda rows: past_filter_window(filters, rows))
+            # Pages from the first one wholly before the window on are not scraped
+            past = [page_number for page_number, rows in list_pages.items() if past_filter_window(filters, rows)]
+            if past:
+                last_page = min(past) - 1
+                print(f"Page {min(past)} was published before the filter's window; later pages are not scraped")
+                list_pages = {page_number: rows for page_number, rows in list_pages.items() if page_number <= last_page}
+        for page_number, rows in list_pages.items():
+            checkpoint.mark_page(page_number, 'listing', rows)
+        checkpoint.save()
+        
+        # Split the remaining pages across the workers
+        timer.start('scrape')
+        if first_pending <= last_page:
+            run_page_ranges(
+                first_pending, last_page,
+                lambda first, last: scrape_page_range(pool, first, last, list_pages, base_url, seen_index, sink,
+                                                      incremental, checkpoint, filters),
+                workers=workers, max_chunk=max_pages
+            )
+        if checkpoint.first_pending_page(start_page, last_page) is None:
+            checkpoint.clear()
             
     except Exception as e:
         print(f"An error occurred: {e}")
+        summary['error'] = str(e)
     
     finally:
-        # Close the browser
-        driver.quit()
-        print("Browser closed")
+        timer.start('export')
+        # Close the browsers
+        pool.close()
+        report_waits()
+        seen_index.close()
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
+
+def parse_archived_page(entry, html):
+    """Parse an archived list or detail page (run in page_archive.parse_entries workers)"""
+    if entry['kind'] == 'list':
+        return parse_list_page(html, entry['url'])
+    return parse_detail_page(html, entry.get('final_url') or entry['url'])
+
+def reparse_archive(since=None, until=None, workers=None, run_id=None, output_format='jsonl', export_excel=False,
+                    archive=None):
+    """Re-run the list and detail parsers over the pages archived from since to until
+
+    No browser or network is used. Each list row is joined with the latest archived
+    capture of its detail page up to until, even one fetched before since (a detail
+    page is not archived again when it comes back unchanged), and a tender listed on
+    several captures is written once, as last listed. Returns the run summary.
+    """
+    summary = {'country': 'japan', 'reparse': True}
+    reset_metrics()
+    timer = StageTimer()
+    archive = archive or get_page_archive()
+    sink = open_sink('japan', run_id=run_id, output_format=output_format)
+    try:
+        timer.start('parse')
+        lists = archive.entries('japan', since, until, kinds={'list'})
+        listed = [row for rows in parse_entries(lists, parse_archived_page, workers, archive.root)
+                  for row in rows or []]
+        hrefs = {row['detail_href'] for row in listed}
+        captures = latest_by_url(archive.entries('japan', None, until, kinds={'detail'}))
+        details = [entry for url, entry in captures.items() if url in hrefs]
+        print(f"Re-parsing {len(lists)} list and {len(details)} detail pages from {archive.root}")
+        parsed_details = dict(zip((entry['url'] for entry in details),
+                                  parse_entries(details, parse_archived_page, workers, archive.root)))
+        
+        tenders = {}
+        for row in listed:
+            tender_info = merge_detail(row, parsed_details.get(row['detail_href']))
+            if tender_info:
+                tenders[row['detail_href']] = tender_info
+        
+        timer.start('write')
+        sink.write(list(tenders.values()))
+        summary['pages'] = len(lists) + len(details)
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        summary['error'] = str(e)
+    finally:
+        timer.start('export')
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
 
 if __name__ == "__main__":
-    START_PAGE = int(input("enter starting page no:")) 
-    END_PAGE = int(input("enter ending page no:")) 
+    parser = argparse.ArgumentParser(description="Scrape tenders from the JETRO procurement database")
+    parser.add_argument('--start', type=int, default=1, help="First list page (default 1)")
+    parser.add_argument('--end', type=int, help="Last list page (default: the start page)")
+    parser.add_argument('--browser', action='store_true', help="Read the list pages in the browser instead of over HTTP")
+    parser.add_argument('--workers', type=int, default=1, help="Page ranges scraped in parallel")
+    parser.add_argument('--max-pages', type=int, default=25, help="Pages per browser before it is replaced")
+    parser.add_argument('--headed', action='store_true', help="Show the browser windows")
+    parser.add_argument('--full', action='store_true', help="Re-scrape tenders seen in earlier runs")
+    parser.add_argument('--no-excel', action='store_true', help="Skip the Excel export")
+    parser.add_argument('--restart', action='store_true', help="Discard the checkpoint of an interrupted run")
+    parser.add_argument('--reparse', action='store_true', help="Re-parse the archived pages instead of scraping")
+    parser.add_argument('--since', help="First fetch date re-parsed, YYYY-MM-DD (default: all)")
+    parser.add_argument('--until', help="Last fetch date re-parsed, YYYY-MM-DD (default: all)")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+    try:
+        filters = filter_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
     
-    print(f"Scraping tenders from page {START_PAGE} to page {END_PAGE}")
-    scrape_japan_tenders(start_page=START_PAGE, end_page=END_PAGE)
\ No newline at end of file
+    if args.reparse:
+        reparse_archive(since=args.since, until=args.until, export_excel=not args.no_excel)
+    else:
+        START_PAGE = max(args.start, 1)
+        END_PAGE = max(args.end or START_PAGE, START_PAGE)
+        print(f"Scraping tenders from page {START_PAGE} to page {END_PAGE}")
+        scrape_japan_tenders(start_page=START_PAGE, end_page=END_PAGE, use_browser=args.browser,
+                             incremental=not args.full, export_excel=not args.no_excel, workers=args.workers,
+                             max_pages=args.max_pages, headless=not args.headed, resume=not args.restart,
+                             filters=filters)
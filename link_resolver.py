@@ -0,0 +1,75 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from detail_cache import get_detail_cache
+from http_client import DEFAULT_TIMEOUT
+from metrics import timed
+
+# Pages that only reach their destination once scripts run
+META_REFRESH_PATTERN = re.compile(r'<meta[^>]+http-equiv=["\']?refresh', re.IGNORECASE)
+SCRIPT_REDIRECT_PATTERN = re.compile(r'(?:window\.|document\.)?location(?:\.href)?\s*=|location\.replace\(', re.IGNORECASE)
+# A redirect stub is tiny; full pages mention window.location in unrelated scripts
+REDIRECT_STUB_MAX_CHARS = 4000
+
+
+def needs_javascript(response):
+    """Check whether a fetched page has to be opened in the browser to find its final URL"""
+    if response.status_code >= 400:
+        return True
+    if 'html' not in response.headers.get('Content-Type', ''):
+        return False
+    body = response.text
+    if META_REFRESH_PATTERN.search(body):
+        return True
+    return len(body) <= REDIRECT_STUB_MAX_CHARS and bool(SCRIPT_REDIRECT_PATTERN.search(body))
+
+
+def follow_redirects(url, session=None, timeout=DEFAULT_TIMEOUT):
+    """Follow HTTP redirects for a URL, returning the final URL or None if it needs JavaScript
+
+    A page unchanged since its final URL was found answers with 304 and the stored
+    final URL is reused (see detail_cache).
+    """
+    with timed('detail_resolution') as measured:
+        def parse(response):
+            measured['bytes'] = len(response.content)
+            return None if needs_javascript(response) else response.url
+        
+        return get_detail_cache().fetch(url, parse, session=session, timeout=timeout, allow_redirects=True)
+
+
+def resolve_links(urls, fallback=None, max_workers=8, session=None):
+    """Resolve many links concurrently over HTTP, using the fallback for those that need a browser
+
+    Returns a dict of url -> final url. Links that could not be resolved are left out.
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    resolved = {}
+    needs_browser = []
+
+    def resolve(url):
+        try:
+            return url, follow_redirects(url, session=session)
+        except Exception as e:
+            print(f"HTTP resolution failed for {url}: {str(e)}")
+            return url, None
+
+    if urls:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, final_url in executor.map(resolve, urls):
+                if final_url:
+                    resolved[url] = final_url
+                else:
+                    needs_browser.append(url)
+        print(f"Resolved {len(resolved)}/{len(urls)} links over HTTP")
+
+    # The browser is single-threaded, so fallbacks run one at a time in the caller's thread
+    if needs_browser and fallback:
+        print(f"Opening {len(needs_browser)} links in the browser...")
+        for url in needs_browser:
+            try:
+                resolved[url] = fallback(url)
+            except Exception as e:
+                print(f"Browser resolution failed for {url}: {str(e)}")
+
+    return resolved
@@ -1,73 +1,45 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-import time
-from datetime import datetime
+import argparse
+import json
 import re
-from deep_translator import GoogleTranslator
+from datetime import datetime
+from translation_cache import save_translation_cache
+from translation_engine import CacheOnlyBackend, TranslationEngine, get_translation_engine
+from date_utils import is_past, standardize_datetime
+from seen_index import SeenIndex
+from output_sink import open_sink
+from dom_extract import extract_rows, extract_rows_from_html
+from driver_pool import DriverPool, run_page_ranges
+from run_summary import StageTimer, finish_summary
+from metrics import instrumented, reset_metrics
+from host_limiter import throttled
+from page_archive import archive_page, get_page_archive, parse_entries
+from pipeline import Pipeline, Stage, combine_stage_stats, parse_stage_workers
+from tender_filter import add_filter_arguments, filter_from_args
+from request_recorder import (ReplayableRequest, api_text, find_records, find_request_with, flatten_record,
+                              index_records, install_recorder, key_field, match_field, payload_records,
+                              recorded_requests)
+from waits import (count_rows, first_row_text, report_waits, wait_for_first_row_change,
+                   wait_for_page_load, wait_for_row_count_change, wait_for_rows, wait_for_url_stable)
 
 def translate_text(text, source='mk', target='en'):
     """Translate text from source language to target language."""
-    if not text or not isinstance(text, str):
-        return text
-    
-    # Skip translation for numeric or very short strings
-    if text.isdigit() or len(text) < 2:
-        return text
-    
-    try:
-        # Split long text to handle Google Translator's character limit
-        if len(text) > 4000:  # Reduced to be safer
-            chunks = [text[i:i+4000] for i in range(0, len(text), 4000)]
-            translated_chunks = []
-            for chunk in chunks:
-                translated = GoogleTranslator(source=source, target=target).translate(chunk)
-                if translated:
-                    translated_chunks.append(translated)
-                else:
-                    translated_chunks.append(chunk)
-            return ' '.join(translated_chunks)
-        else:
-            translated = GoogleTranslator(source=source, target=target).translate(text)
-            return translated if translated else text
-    except Exception as e:
-        print(f"Translation error: {str(e)} for text: '{text[:50]}...'")
-        return text  # Return original text if translation fails
+    return get_translation_engine().translate(text, source, target)
 
-def setup_driver():
-    
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
-
-def get_page_input(prompt, min_value, max_value=None):
-    while True:
-        try:
-            value = input(prompt)
-            if not value.strip() and max_value is not None:
-                return max_value
-            
-            page_num = int(value)
-            if page_num < min_value:
-                print(f"Page number must be {min_value} or greater")
-                continue
-            if max_value and page_num > max_value:
-                print(f"Page number cannot be greater than {max_value}")
-                continue
-            return page_num
-        except ValueError:
-            print("Please enter a valid number")
+LIST_URL = "https://e-pazar.gov.mk/activeTenders"
+
+# Rows of the MUI tender table
+ROW_SELECTOR = "div.MuiTableContainer-root tbody tr.MuiTableRow-root"
+
+# Fields read from each row by dom_extract.extract_rows: name -> (selector, kind)
+ROW_FIELDS = {
+    'number': ("th.MuiTableCell-body", 'text'),
+    'link': ("th.MuiTableCell-body a", 'href'),
+    'cells': ("td.MuiTableCell-body", 'all'),
+}
 
 def change_ads_per_page(driver, items_per_page=25):
     try:
@@ -78,15 +50,15 @@ def change_ads_per_page(driver, items_per_page=25):
             "div.MuiTablePagination-input div.MuiSelect-select"
         )))
         dropdown.click()
-        time.sleep(1) 
         
         option_25 = wait.until(EC.element_to_be_clickable((
             By.CSS_SELECTOR, 
             f'li[data-value="{items_per_page}"]'
         )))
+        previous_count = count_rows(driver, ROW_SELECTOR)
         option_25.click()
         
-        time.sleep(3)
+        wait_for_row_count_change(driver, ROW_SELECTOR, previous_count)
         print(f"Changed items per page to {items_per_page}")
         return True
     except Exception as e:
@@ -110,6 +82,7 @@ def get_total_pages(driver):
         return None
     return None
 
+@instrumented('navigation')
 def go_to_next_page(driver):
     try:
         wait = WebDriverWait(driver, 10)
@@ -127,249 +100,192 @@ def go_to_next_page(driver):
             "div.MuiTablePagination-actions button[title='Next page']"
         )))
         
-        next_button.click()
-        time.sleep(3)  
+        previous_first_row = first_row_text(driver, ROW_SELECTOR)
+        # The click loads the next page's rows from the portal
+        with throttled(LIST_URL):
+            next_button.click()
+            wait_for_first_row_change(driver, ROW_SELECTOR, previous_first_row)
         return True
     except Exception as e:
         print(f"Error navigating to next page: {str(e)}")
         return False
 
-def extract_table_data(driver):
-    wait = WebDriverWait(driver, 20)
+# The active tender list shows the newest tenders first, so paging can stop at a page
+# published before the filter's window
+LIST_NEWEST_FIRST = True
+
+# List fields that identify a changed tender, hashed before any expensive stage
+SEEN_HASH_FIELDS = ['Number', 'Contracting Authority', 'Subject of Procurement', 'Type of Procurement', 'Publication Date', 'Deadline']
+
+def tender_date(text):
+    """A publication date or deadline as dd-mm-yyyy [hh-mm-ss], whether it came from the table or the API
+
+    The API sends date-only cells as midnight timestamps, so a midnight time is dropped
+    on both paths; the text, and with it the seen-index hash, is the same in either mode.
+    """
+    standardized = standardize_datetime(text)
+    if standardized.endswith(' 00-00-00'):
+        return standardized[:-len(' 00-00-00')]
+    return standardized
+
+def row_to_tender(row, row_index, now=None):
+    """Turn one extracted row into basic tender information, or None if it is skipped
+
+    Deadlines are judged against now, the current time unless given.
+    """
+    # Get the tender number and link
+    number = row['number']
+    tender_link = row['link']
+    if number is None or tender_link is None:
+        raise Exception("tender number link not found")
     
-    # Store the main page URL
-    main_page_url = driver.current_url
-    print(f"Main page URL: {main_page_url}")
+    cells = row['cells']
+    if len(cells) < 5:
+        print(f"Skipping row - insufficient cells: {len(cells)}")
+        return None
     
-    table_container = wait.until(EC.presence_of_element_located(
-        (By.CSS_SELECTOR, "div.MuiTableContainer-root")
-    ))
+    deadline_str = cells[4]
+    
+    # Dates with a time are compared to now, date-only deadlines to today
+    deadline_passed = is_past(deadline_str, now)
+    if deadline_passed is None:
+        print(f"Error parsing date for tender {number}: {deadline_str}")
+        return None
+    if deadline_passed:
+        print(f"Skipping tender {number} - Deadline passed ({deadline_str})")
+        return None
+    
+    # Store basic tender information
+    return {
+        'Number': number,
+        'Contracting Authority': cells[0],
+        'Subject of Procurement': cells[1],
+        'Type of Procurement': cells[2],
+        'Publication Date': tender_date(cells[3]),
+        'Deadline': tender_date(deadline_str),
+        'Website Link': "https://e-pazar.gov.mk/activeTenders",
+        'Country': "Macedonia",
+        # The number link already points at the detail page unless it is script-only
+        'Detail URL': tender_link if tender_link.startswith('http') else None,
+        'Row Index': row_index
+    }
+
+def tender_filter_values(tender):
+    """The filter values a list row carries; all of them, as there is no detail page to wait for"""
+    return {'published': tender['Publication Date'], 'deadline': tender['Deadline'],
+            'notice_type': tender['Type of Procurement'], 'entity': tender['Contracting Authority'],
+            'text': tender['Subject of Procurement']}
+
+def past_filter_window(filters, rows):
+    """Whether a page of extracted rows lies wholly before the filter's publication window"""
+    dates = [row['cells'][3] for row in rows if len(row['cells']) >= 5]
+    return bool(filters and dates) and filters.past_window(dates, 'published', LIST_NEWEST_FIRST)
+
+@instrumented('detail_resolution')
+def click_detail_link(driver, tender, page_number):
+    """Open a script-only detail link by clicking it, then return to the same list page"""
+    previous_first_row = first_row_text(driver, ROW_SELECTOR)
+    rows = driver.find_elements(By.CSS_SELECTOR, ROW_SELECTOR)
+    if tender['Row Index'] > len(rows):
+        print(f"Row index {tender['Row Index']} out of range. Total rows: {len(rows)}")
+        return "Row not found"
     
+    number_link = rows[tender['Row Index'] - 1].find_element(By.CSS_SELECTOR, "th.MuiTableCell-body a")
+    print(f"Clicking on number link for tender {tender['Number']}...")
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", number_link)
+    with throttled(LIST_URL):
+        driver.execute_script("arguments[0].click();", number_link)
+        
+        # Wait for the page to load
+        wait_for_page_load(driver, 15)
+        wait_for_url_stable(driver)
+    detail_url = driver.current_url
+    
+    # Going back keeps the SPA's pagination; reloading the list would reset it to page 1
+    with throttled(LIST_URL):
+        driver.back()
+        wait_for_rows(driver, ROW_SELECTOR)
+    if first_row_text(driver, ROW_SELECTOR) != previous_first_row:
+        print(f"List was reset, returning to page {page_number}...")
+        if not (open_tender_list(driver, LIST_URL) and navigate_to_page(driver, page_number)):
+            raise Exception(f"Could not return to page {page_number}")
+    return detail_url
+
+def process_tenders(driver, rows, page_number=None, seen_index=None, incremental=True, now=None, engine=None,
+                    filters=None):
+    """Run the extracted rows of one page through the detail-URL and translation steps
+
+    engine is the translation engine, the process-wide one unless given. Rows failing
+    filters (a FilterSpec) are dropped before either step.
+    """
     # First collect basic tender information
     print("\n--- STEP 1: Collecting basic tender information ---")
     tenders_basic_info = []
+    print(f"Found {len(rows)} rows")
     
-    try:
-        rows = table_container.find_elements(By.CSS_SELECTOR, "tbody tr.MuiTableRow-root")
-        print(f"Found {len(rows)} rows")
-        
-        for row_index, row in enumerate(rows, 1):
-            try:
-                # Get the tender number and link
-                number_cell = row.find_element(By.CSS_SELECTOR, "th.MuiTableCell-body")
-                number_link = number_cell.find_element(By.TAG_NAME, "a")
-                number = number_cell.text.strip()
-                tender_link = number_link.get_attribute('href')
-                
-                cells = row.find_elements(By.CSS_SELECTOR, "td.MuiTableCell-body")
-                
-                if len(cells) >= 5:
-                    deadline_str = cells[4].text.strip()
-                    try:
-                        # Check if deadline contains time information
-                        if ' ' in deadline_str and len(deadline_str.split(' ')) == 2:
-                            date_part, time_part = deadline_str.split(' ')
-                            # Try to parse with time
-                            try:
-                                deadline_datetime = datetime.strptime(deadline_str, '%d.%m.%Y %H:%M:%S')
-                                # Compare with current date and time
-                                now = datetime.now()
-                                if deadline_datetime < now:
-                                    print(f"Skipping tender {number} - Deadline passed ({deadline_str})")
-                                    continue
-                            except ValueError:
-                                # If specific time format fails, try other common formats
-                                try:
-                                    deadline_datetime = datetime.strptime(deadline_str, '%d.%m.%Y %H:%M')
-                                    now = datetime.now()
-                                    if deadline_datetime < now:
-                                        print(f"Skipping tender {number} - Deadline passed ({deadline_str})")
-                                        continue
-                                except ValueError:
-                                    # Fall back to just date comparison
-                                    deadline_date = datetime.strptime(date_part, '%d.%m.%Y').date()
-                                    today = datetime.now().date()
-                                    if deadline_date < today:
-                                        print(f"Skipping tender {number} - Deadline passed ({deadline_str})")
-                                        continue
-                        else:
-                            # Just date without time
-                            deadline_date = datetime.strptime(deadline_str, '%d.%m.%Y').date()
-                            today = datetime.now().date()
-                            if deadline_date < today:
-                                print(f"Skipping tender {number} - Deadline passed ({deadline_str})")
-                                continue
-                        
-                        # Store basic tender information
-                        tender_info = {
-                            'Number': number,
-                            'Contracting Authority': cells[0].text.strip(),
-                            'Subject of Procurement': cells[1].text.strip(),
-                            'Type of Procurement': cells[2].text.strip(),
-                            'Publication Date': cells[3].text.strip(),
-                            'Deadline': deadline_str,
-                            'Website Link': "https://e-pazar.gov.mk/activeTenders",
-                            'Country': "Macedonia",
-                            'Row Index': row_index
-                        }
-                        
-                        tenders_basic_info.append(tender_info)
-                        print(f"Collected basic info for tender {number}")
-                        
-                    except ValueError as e:
-                        print(f"Error parsing date for tender {number}: {deadline_str} - {e}")
-                        # Try alternate formats if needed
-                        try:
-                            formats_to_try = ['%d-%m-%Y', '%Y-%m-%d', '%d/%m/%Y']
-                            for date_format in formats_to_try:
-                                try:
-                                    deadline_date = datetime.strptime(deadline_str, date_format).date()
-                                    today = datetime.now().date()
-                                    if deadline_date >= today:
-                                        tender_info = {
-                                            'Number': number,
-                                            'Contracting Authority': cells[0].text.strip(),
-                                            'Subject of Procurement': cells[1].text.strip(),
-                                            'Type of Procurement': cells[2].text.strip(),
-                                            'Publication Date': cells[3].text.strip(),
-                                            'Deadline': deadline_str,
-                                            'Website Link': "https://e-pazar.gov.mk/activeTenders",
-                                            'Country': "Macedonia",
-                                            'Row Index': row_index
-                                        }
-                                        tenders_basic_info.append(tender_info)
-                                        print(f"Collected basic info for tender {number} with alternate date format")
-                                    break
-                                except ValueError:
-                                    continue
-                        except Exception as e:
-                            print(f"Could not process tender with alternate format: {str(e)}")
-                else:
-                    print(f"Skipping row - insufficient cells: {len(cells)}")
-                    
-            except Exception as e:
-                print(f"Error processing row {row_index}: {str(e)}")
-                continue
-                
-    except Exception as e:
-        print(f"Error processing table: {str(e)}")
+    for row_index, row in enumerate(rows, 1):
+        try:
+            tender_info = row_to_tender(row, row_index, now)
+            if tender_info:
+                tenders_basic_info.append(tender_info)
+                print(f"Collected basic info for tender {tender_info['Number']}")
+        except Exception as e:
+            print(f"Error processing row {row_index}: {str(e)}")
+            continue
     
     print(f"Collected basic info for {len(tenders_basic_info)} active tenders")
+    if filters:
+        tenders_basic_info = filters.apply(tenders_basic_info, tender_filter_values, 'list')
+    
+    # Only new or changed tenders go through the detail-URL and translation stages
+    if seen_index is not None:
+        tenders_basic_info = seen_index.filter_changed(
+            'macedonia', tenders_basic_info, 'Number', SEEN_HASH_FIELDS, skip_unchanged=incremental
+        )
     
-    # STEP 2: Get detailed tender URLs by clicking on each tender number
+    # STEP 2: Detail URLs come from the number links read in STEP 1; only
+    # script-only links are clicked
     print("\n--- STEP 2: Getting detailed tender URLs ---")
     
-    for index, tender in enumerate(tenders_basic_info):
+    for tender in tenders_basic_info:
+        if tender['Detail URL']:
+            continue
+        if driver is None:
+            tender['Detail URL'] = "Not found"
+            continue
         try:
-            print(f"\nGetting detailed URL for tender {tender['Number']}...")
-            
-            # Find the tender rows again
-            rows = table_container.find_elements(By.CSS_SELECTOR, "tbody tr.MuiTableRow-root")
-            
-            if tender['Row Index'] <= len(rows):
-                # Get the row for this tender
-                row = rows[tender['Row Index'] - 1]
-                
-                # Find the number link in this row
-                number_cell = row.find_element(By.CSS_SELECTOR, "th.MuiTableCell-body")
-                number_link = number_cell.find_element(By.TAG_NAME, "a")
-                
-                # Store the current window handle
-                main_window = driver.current_window_handle
-                
-                # Click on the number link
-                print(f"Clicking on number link for tender {tender['Number']}...")
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", number_link)
-                time.sleep(1)
-                driver.execute_script("arguments[0].click();", number_link)
-                
-                # Wait for the page to load
-                WebDriverWait(driver, 15).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                time.sleep(2)
-                
-                # Get the URL of the tender detail page
-                detail_url = driver.current_url
-                tender['Detail URL'] = detail_url
-                print(f"Got detail URL: {detail_url}")
-                
-                # Go back to the main page
-                driver.get(main_page_url)
-                WebDriverWait(driver, 15).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                time.sleep(2)
-                
-                # Re-find the table container
-                table_container = wait.until(EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "div.MuiTableContainer-root")
-                ))
-                
-            else:
-                print(f"Row index {tender['Row Index']} out of range. Total rows: {len(rows)}")
-                tender['Detail URL'] = "Row not found"
-                
+            tender['Detail URL'] = click_detail_link(driver, tender, page_number)
+            print(f"Got detail URL: {tender['Detail URL']}")
         except Exception as e:
             print(f"Error getting detail URL for tender {tender['Number']}: {str(e)}")
             tender['Detail URL'] = f"Error: {str(e)}"
-            
-            # Try to return to the main page if there was an error
-            try:
-                driver.get(main_page_url)
-                WebDriverWait(driver, 15).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                time.sleep(2)
-                table_container = wait.until(EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "div.MuiTableContainer-root")
-                ))
-            except:
-                print("Error returning to main page")
     
     # STEP 3: Translate tender information
     print("\n--- STEP 3: Translating tender information ---")
     
+    fields_to_translate = ['Contracting Authority', 'Subject of Procurement', 'Type of Procurement']
+    try:
+        texts = [tender[field] for tender in tenders_basic_info for field in fields_to_translate]
+        translations = (engine or get_translation_engine()).translate_many(texts, source='mk', target='en')
+        print(f"✓ Translated {len(tenders_basic_info)} tenders")
+    except Exception as e:
+        print(f"✗ Failed to translate tenders: {str(e)}")
+        translations = {}
+    
     tenders_data = []
     for tender in tenders_basic_info:
         try:
-            print(f"\nTranslating tender {tender['Number']}...")
-            
-            # Translate Contracting Authority
-            try:
-                contracting_authority_en = translate_text(tender['Contracting Authority'])
-                print(f"✓ Translated Contracting Authority")
-            except Exception as e:
-                print(f"✗ Failed to translate Contracting Authority: {str(e)}")
-                contracting_authority_en = tender['Contracting Authority']
-                
-            # Translate Subject of Procurement
-            try:
-                subject_en = translate_text(tender['Subject of Procurement'])
-                print(f"✓ Translated Subject of Procurement")
-            except Exception as e:
-                print(f"✗ Failed to translate Subject of Procurement: {str(e)}")
-                subject_en = tender['Subject of Procurement']
-                
-            # Translate Type of Procurement
-            try:
-                procurement_type_en = translate_text(tender['Type of Procurement'])
-                print(f"✓ Translated Type of Procurement")
-            except Exception as e:
-                print(f"✗ Failed to translate Type of Procurement: {str(e)}")
-                procurement_type_en = tender['Type of Procurement']
-            
             # Create the final tender info with translations
             final_tender = {
                 'Number': tender['Number'],
-                'Contracting Authority': contracting_authority_en,
-                'Subject of Procurement': subject_en,
-                'Type of Procurement': procurement_type_en,
+                'Contracting Authority': translations.get(tender['Contracting Authority'], tender['Contracting Authority']),
+                'Subject of Procurement': translations.get(tender['Subject of Procurement'], tender['Subject of Procurement']),
+                'Type of Procurement': translations.get(tender['Type of Procurement'], tender['Type of Procurement']),
                 'Publication Date': tender['Publication Date'],
                 'Deadline': tender['Deadline'],
                 'Website Link': tender['Website Link'],
                 'Country': tender['Country'],
-                'Detail URL': tender.get('Detail URL', 'N/A')
+                'Detail URL': tender.get('Detail URL') or 'N/A'
             }
             
             tenders_data.append(final_tender)
@@ -378,26 +294,119 @@ def extract_table_data(driver):
         except Exception as e:
             print(f"Error processing tender {tender.get('Number', 'unknown')}: {str(e)}")
     
-    # Remove the temporary row index field
-    for tender in tenders_data:
-        if 'Row Index' in tender:
-            del tender['Row Index']
-    
     print(f"Successfully processed {len(tenders_data)} tenders")
     return tenders_data
 
-def save_to_excel(data, page_number):
+def extract_table_data(driver, seen_index=None, incremental=True, page_number=None, filters=None):
+    """Read the list page shown in the browser; returns (tenders, rows read)"""
+    wait = WebDriverWait(driver, 20)
+    wait.until(EC.presence_of_element_located(
+        (By.CSS_SELECTOR, "div.MuiTableContainer-root")
+    ))
+    
+    archive_page('macedonia', 'list', driver.current_url, driver.page_source, page=page_number)
+    
+    # Read every row in one round-trip instead of one .text call per cell
+    rows = extract_rows(driver, "tbody tr.MuiTableRow-root", ROW_FIELDS, "div.MuiTableContainer-root")
+    return process_tenders(driver, rows, page_number, seen_index, incremental, filters=filters), rows
+
+class MacedoniaApi:
+    """Replays the JSON request behind the tender table, so any page costs one HTTP call
+
+    The table's columns are matched to fields of the API records by comparing the
+    rows shown in the browser with the records of the recorded response, and the
+    detail link is rebuilt from the record field that appears in it.
+    """
+    
+    def __init__(self, request, number_field, cell_fields, link_template, link_field):
+        self.request = request
+        self.number_field = number_field
+        self.cell_fields = cell_fields
+        self.link_template = link_template
+        self.link_field = link_field
+    
+    @classmethod
+    def learn(cls, driver, page_size=25):
+        """Find the table's data request among the recorded requests, or return None"""
+        rows = [row for row in extract_rows(driver, "tbody tr.MuiTableRow-root", ROW_FIELDS, "div.MuiTableContainer-root")
+                if row['number'] and row['link'] and len(row['cells']) >= 5]
+        if not rows:
+            return None
+        entry = find_request_with(recorded_requests(driver), rows[0]['number'])
+        if entry is None:
+            print("No recorded request carries the tender table's rows")
+            return None
+        
+        _, records = find_records(entry['payload'])
+        records, by_number = index_records(records)
+        
+        # The field holding the tender number is the one matching every visible row
+        number_field = key_field(records, by_number, [row['number'] for row in rows])
+        if number_field is None:
+            print("Could not find the tender number among the API fields")
+            return None
+        pairs = [(row, by_number[(number_field, row['number'].strip())]) for row in rows]
+        
+        cell_fields = []
+        for column in range(5):
+            field = match_field([(row['cells'][column], record) for row, record in pairs])
+            if field is None:
+                print(f"Could not match table column {column + 1} to an API field")
+                return None
+            cell_fields.append(field)
+        
+        # The detail link embeds one of the record's values, usually an ID
+        row, record = pairs[0]
+        link_field = max((field for field, value in record.items()
+                          if len(api_text(value)) >= 3 and api_text(value) in row['link']),
+                         key=lambda field: len(api_text(record[field])), default=None)
+        if link_field is None:
+            print("Could not rebuild detail links from the API fields")
+            return None
+        link_template = row['link'].replace(api_text(record[link_field]), '{}', 1)
+        
+        try:
+            request = ReplayableRequest(entry, recorded_page=1)
+        except ValueError as e:
+            print(f"API request is not page-addressable: {e}")
+            return None
+        # Page numbers must mean the same as in the table, 25 tenders each
+        if request.size_location is None and len(records) != page_size:
+            print(f"API pages hold {len(records)} tenders and the size cannot be set")
+            return None
+        request.copy_cookies(driver)
+        request.page_size = page_size
+        print(f"Replaying {request.method} {request.url} for direct page access")
+        return cls(request, number_field, cell_fields, link_template, link_field)
+    
+    def fetch_rows(self, page_number):
+        """Fetch one page and shape its records like the rows read from the table"""
+        records, payload = self.request.fetch(page_number)
+        # The field mapping is archived with the response, so it can be re-read without learning it again
+        archive_page('macedonia', 'api', self.request.url, json.dumps(payload, ensure_ascii=False), page=page_number,
+                     number_field=self.number_field, cell_fields=self.cell_fields, link_template=self.link_template,
+                     link_field=self.link_field, records_path=self.request.records_path)
+        return rows_from_records(records, self.number_field, self.cell_fields, self.link_template, self.link_field)
+
+def rows_from_records(records, number_field, cell_fields, link_template, link_field):
+    """Shape API records like the rows read from the table"""
+    rows = []
+    for record in map(flatten_record, records):
+        rows.append({
+            'number': api_text(record.get(number_field)),
+            # Not str.format: the link may hold other braces
+            'link': link_template.replace('{}', api_text(record.get(link_field)), 1),
+            'cells': [api_text(record.get(field)) for field in cell_fields]
+        })
+    return rows
+
+def save_tenders(sink, data, page_number):
     if not data:
         print(f"No data to save for page {page_number}")
         return None
-        
-    df = pd.DataFrame(data)
-
-    filename = f"Macedonia_tenders_page_{page_number}.xlsx"
     
-    df.to_excel(filename, index=False)
-    print(f"Data saved to {filename}")
-    return filename
+    sink.write(data)
+    return sink.path
 
 def navigate_to_page(driver, target_page):
     try:
@@ -408,88 +417,256 @@ def navigate_to_page(driver, target_page):
                 print(f"Could not navigate to page {target_page}")
                 return False
             current_page += 1
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.MuiTableContainer-root")))
-            time.sleep(2)  
         return True
     except Exception as e:
         print(f"Error navigating to page {target_page}: {str(e)}")
         return False
 
-def main():
-    driver = None
-    try:
-        driver = setup_driver()
-        
-        url = "https://e-pazar.gov.mk/activeTenders"
-        print(f"Opening {url}...")
+@instrumented('navigation')
+def open_tender_list(driver, url):
+    """Open the active tender list showing 25 tenders per page"""
+    print(f"Opening {url}...")
+    with throttled(url):
         driver.get(url)
         
         print("Waiting for page to load...")
-        time.sleep(5)
-        
-        if not change_ads_per_page(driver, 25):
-            print("Failed to change items per page, exiting...")
-            return
-            
-        total_pages = get_total_pages(driver)
-        if not total_pages:
-            print("Could not determine total pages")
-            return
-        print(f"Total pages: {total_pages}")
-        
-        start_page = get_page_input(
-            "Enter the starting page number (1 or greater, press Enter for 1): ",
-            min_value=1,
-            max_value=total_pages
-        )
-        
-        end_page = get_page_input(
-            f"Enter the end page number (press Enter for last page {total_pages}): ",
-            min_value=start_page,
-            max_value=total_pages
-        )
-        
-        print(f"\nWill process pages {start_page} to {end_page}")
+        wait_for_page_load(driver)
+        wait_for_rows(driver, ROW_SELECTOR)
+    
+    return change_ads_per_page(driver, 25)
+
+def scrape_page_range(pool, url, first_page, last_page, seen_index, sink, incremental=True, filters=None):
+    """Scrape pages first_page..last_page in one leased browser, stopping at a page before the filter's window"""
+    with pool.lease(pages=last_page - first_page + 1) as driver:
+        if not open_tender_list(driver, url):
+            raise Exception("Failed to change items per page")
         
-        if start_page > 1:
-            print(f"Navigating to page {start_page}...")
-            if not navigate_to_page(driver, start_page):
+        if first_page > 1:
+            print(f"Navigating to page {first_page}...")
+            if not navigate_to_page(driver, first_page):
                 return
         
-        current_page = start_page
-        while current_page <= end_page:
-            print(f"\nProcessing page {current_page} of {end_page}")
+        current_page = first_page
+        while current_page <= last_page:
+            print(f"\nProcessing page {current_page} of {last_page}")
             
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.MuiTableContainer-root")))
-            time.sleep(2)  
+            wait_for_rows(driver, ROW_SELECTOR)
             
-            tenders_data = extract_table_data(driver)
+            tenders_data, rows = extract_table_data(driver, seen_index, incremental, current_page, filters)
             if tenders_data:
-                filename = save_to_excel(tenders_data, current_page)
+                filename = save_tenders(sink, tenders_data, current_page)
                 print(f"Saved page {current_page} to {filename}")
+                seen_index.mark_done('macedonia', [tender['Number'] for tender in tenders_data])
             
-            if current_page < end_page:
+            if past_filter_window(filters, rows):
+                print(f"Page {current_page} was published before the filter's window, stopping")
+                break
+            
+            if current_page < last_page:
                 if not go_to_next_page(driver):
                     print("Could not go to next page")
                     break
             
             current_page += 1
+
+def scrape_api_page_range(api, first_page, last_page, seen_index, sink, incremental=True, filters=None,
+                          stage_workers=None):
+    """Scrape pages first_page..last_page by replaying the table's data request
+
+    The next page is fetched while earlier ones are processed (translated) and
+    written; stage_workers ({'process': n}) widens processing. The range ends early at
+    a page published before the filter's window. Returns the pipeline's stage stats.
+    """
+    stage_workers = stage_workers or {}
+    
+    def read_pages():
+        for page_number in range(first_page, last_page + 1):
+            print(f"\nFetching page {page_number} of {last_page} from the API")
+            rows = api.fetch_rows(page_number)
+            if not rows:
+                print(f"Page {page_number} is empty, stopping")
+                break
+            yield page_number, rows
+            if past_filter_window(filters, rows):
+                print(f"Page {page_number} was published before the filter's window, stopping")
+                break
+    
+    def process(page):
+        page_number, rows = page
+        return page_number, process_tenders(None, rows, page_number, seen_index, incremental, filters=filters)
+    
+    def write(page):
+        page_number, tenders_data = page
+        if tenders_data:
+            filename = save_tenders(sink, tenders_data, page_number)
+            print(f"Saved page {page_number} to {filename}")
+            seen_index.mark_done('macedonia', [tender['Number'] for tender in tenders_data])
+        return page
+    
+    pipeline = Pipeline([
+        Stage('process', process, stage_workers.get('process', 1)),
+        Stage('write', write),
+    ])
+    pipeline.run(read_pages())
+    pipeline.report()
+    return pipeline.to_dict()
+
+def main(start_page=1, end_page=None, incremental=True, export_excel=True, workers=1, max_pages=25, headless=True,
+         use_api=True, run_id=None, output_format='jsonl', filters=None, stage_workers=None):
+    """Scrape pages start_page..end_page (default: the last page) and return the run summary
+
+    filters (a FilterSpec) is checked on every list row before its detail link or
+    translation, and paging stops at the first page published before its window.
+    stage_workers ({'process': n}) sets the processing threads behind each API page range.
+    """
+    summary = {'country': 'macedonia'}
+    reset_metrics()
+    timer = StageTimer()
+    timer.start('setup')
+    seen_index = SeenIndex()
+    sink = open_sink('macedonia', run_id=run_id, output_format=output_format)
+    # Each worker leases a warm browser; a browser is replaced after max_pages pages
+    pool = DriverPool(size=workers, max_pages=max_pages, headless=headless)
+    url = LIST_URL
+    api = None
+    try:
+        with pool.lease(pages=0) as driver:
+            if use_api:
+                install_recorder(driver)
+            if not open_tender_list(driver, url):
+                print("Failed to change items per page, exiting...")
+                summary['error'] = "Could not open the tender list"
+                return summary
+            
+            total_pages = get_total_pages(driver)
+            
+            # With the table's data request any page is one call away; otherwise
+            # pages are reached by clicking "Next"
+            if use_api:
+                try:
+                    api = MacedoniaApi.learn(driver)
+                except Exception as e:
+                    print(f"Could not learn the tender API: {e}")
+            if api is None:
+                print("Reading pages from the browser")
+        if not total_pages:
+            print("Could not determine total pages")
+            summary['error'] = "Could not determine total pages"
+            return summary
+        print(f"Total pages: {total_pages}")
+        
+        start_page = min(max(start_page, 1), total_pages)
+        end_page = min(max(end_page or total_pages, start_page), total_pages)
+        print(f"\nWill process pages {start_page} to {end_page}")
+        
+        # Split the page range across the workers
+        timer.start('scrape')
+        if api is not None:
+            summary['pipeline'] = combine_stage_stats(run_page_ranges(
+                start_page, end_page,
+                lambda first, last: scrape_api_page_range(api, first, last, seen_index, sink, incremental, filters,
+                                                          stage_workers),
+                workers=workers
+            ))
+        else:
+            run_page_ranges(
+                start_page, end_page,
+                lambda first, last: scrape_page_range(pool, url, first, last, seen_index, sink, incremental,
+                                                      filters),
+                workers=workers, max_chunk=max_pages
+            )
         
         print("\nFinished processing all pages")
         
     except Exception as e:
         print(f"An error occurred: {str(e)}")
+        summary['error'] = str(e)
     
     finally:
+        timer.start('export')
+        pool.close()
+        print("Browsers closed.")
+        save_translation_cache()
+        report_waits()
+        seen_index.close()
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
+
+def parse_archived_page(entry, body):
+    """Read the rows of an archived list page or API response (run in page_archive.parse_entries workers)"""
+    if entry['kind'] == 'api':
+        records = payload_records(json.loads(body), entry.get('records_path'))
+        return rows_from_records(records, entry['number_field'], entry['cell_fields'], entry['link_template'],
+                                 entry['link_field'])
+    return extract_rows_from_html(body, "tbody tr.MuiTableRow-root", ROW_FIELDS, "div.MuiTableContainer-root",
+                                  base_url=entry['url'])
+
+def reparse_archive(since=None, until=None, workers=None, run_id=None, output_format='jsonl', export_excel=False,
+                    archive=None):
+    """Re-run the row processing over the list pages and API responses archived from since to until
+
+    No browser or network is used. Deadlines are judged against each page's fetch
+    time, so a page keeps the tenders that were active when it was fetched; detail
+    links that needed a click are "Not found", and text missing from the translation
+    cache stays in Macedonian. A tender listed on several captures is written once,
+    as last listed. Returns the run summary.
+    """
+    summary = {'country': 'macedonia', 'reparse': True}
+    reset_metrics()
+    timer = StageTimer()
+    archive = archive or get_page_archive()
+    sink = open_sink('macedonia', run_id=run_id, output_format=output_format)
+    engine = TranslationEngine(backend=CacheOnlyBackend())
+    try:
+        timer.start('parse')
+        pages = archive.entries('macedonia', since, until, kinds={'list', 'api'})
+        print(f"Re-parsing {len(pages)} pages from {archive.root}")
+        tenders = {}
+        for entry, rows in zip(pages, parse_entries(pages, parse_archived_page, workers, archive.root)):
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+            for tender in process_tenders(None, rows or [], entry.get('page'), now=fetched_at, engine=engine):
+                tenders[tender['Number']] = tender
         
-        if driver:
-            try:
-                driver.quit()
-                print("Browser closed successfully.")
-            except:
-                print("Browser already closed.")
+        timer.start('write')
+        sink.write(list(tenders.values()))
+        summary['pages'] = len(pages)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        summary['error'] = str(e)
+    finally:
+        timer.start('export')
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
+    return summary
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape active tenders from e-pazar.gov.mk")
+    parser.add_argument('--start', type=int, default=1, help="First page (default 1)")
+    parser.add_argument('--end', type=int, help="Last page (default: the last page)")
+    parser.add_argument('--workers', type=int, default=1, help="Page ranges scraped in parallel")
+    parser.add_argument('--max-pages', type=int, default=25, help="Pages per browser before it is replaced")
+    parser.add_argument('--headed', action='store_true', help="Show the browser windows")
+    parser.add_argument('--browser', action='store_true', help="Click through the pages instead of replaying the table's request")
+    parser.add_argument('--full', action='store_true', help="Re-scrape tenders seen in earlier runs")
+    parser.add_argument('--no-excel', action='store_true', help="Skip the Excel export")
+    parser.add_argument('--reparse', action='store_true', help="Re-parse the archived pages instead of scraping")
+    parser.add_argument('--since', help="First fetch date re-parsed, YYYY-MM-DD (default: all)")
+    parser.add_argument('--until', help="Last fetch date re-parsed, YYYY-MM-DD (default: all)")
+    parser.add_argument('--stage-workers', action='append', metavar='STAGE=N',
+                        help="Threads of a pipeline stage of the API path, process (default 1)")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+    try:
+        filters = filter_from_args(args)
+        stage_workers = parse_stage_workers(args.stage_workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.reparse:
+        reparse_archive(since=args.since, until=args.until, export_excel=not args.no_excel)
+    else:
+        main(start_page=args.start, end_page=args.end, incremental=not args.full, export_excel=not args.no_excel,
+             workers=args.workers, max_pages=args.max_pages, headless=not args.headed, use_api=not args.browser,
+             filters=filters, stage_workers=stage_workers)
@@ -0,0 +1,211 @@
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency samples kept per stage for the percentiles; later samples replace random ones
+MAX_SAMPLES = 2048
+
+# Directory for a Prometheus text file per run (e.g. node_exporter's textfile collector)
+PROMETHEUS_DIR_ENV = "METRICS_PROM_DIR"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class Histogram:
+    """Count, total, max and bytes of one stage, with a bounded sample for p50/p95"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+        self.samples = []
+
+    def observe(self, seconds, size=0):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes += size
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def to_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total': round(self.total, 6),
+            'p50': round(percentile(samples, 0.5), 6),
+            'p95': round(percentile(samples, 0.95), 6),
+            'max': round(self.max, 6),
+            'bytes': self.bytes,
+        }
+
+
+class Metrics:
+    """Stage latencies, counters and sleeps of one scraper run
+
+    Stages used by the scrapers: navigation, list_extraction, detail_resolution,
+    translation, date_parsing, output_writing and archiving. Sleeps are kept apart, per reason,
+    so idle time is never counted as work.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.sleeps = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, size=0):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds, size)
+
+    @contextmanager
+    def timed(self, stage, size=0):
+        """Time the block as one call of stage; the yielded dict's 'bytes' may be set inside"""
+        measured = {'bytes': size}
+        start = time.perf_counter()
+        try:
+            yield measured
+        finally:
+            self.observe(stage, time.perf_counter() - start, measured['bytes'])
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def sleep(self, seconds, reason):
+        """time.sleep that is accounted under the sleep category"""
+        start = time.perf_counter()
+        time.sleep(seconds)
+        with self._lock:
+            histogram = self.sleeps.get(reason)
+            if histogram is None:
+                histogram = self.sleeps[reason] = Histogram()
+            histogram.observe(time.perf_counter() - start)
+
+    def report(self):
+        # Imported here so modules that only parse or write records do not need Selenium
+        from waits import wait_stats
+
+        with self._lock:
+            report = {
+                'elapsed': round(time.perf_counter() - self.started, 3),
+                'stages': {stage: histogram.to_dict() for stage, histogram in sorted(self.stages.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'sleep': {reason: histogram.to_dict() for reason, histogram in sorted(self.sleeps.items())},
+            }
+        report['sleep_total'] = round(sum(entry['total'] for entry in report['sleep'].values()), 3)
+        # Condition waits poll the browser; their time is idle too, but bounded by the signal
+        report['waits'] = {label: {key: round(value, 3) for key, value in entry.items()}
+                           for label, entry in wait_stats().items()}
+        return report
+
+    def prometheus_text(self, source, report=None):
+        """The report in the Prometheus text exposition format, labelled with the source"""
+        report = report or self.report()
+        lines = [
+            "# TYPE tender_stage_seconds summary",
+        ]
+        for stage, entry in report['stages'].items():
+            labels = f'source="{source}",stage="{stage}"'
+            lines.append(f'tender_stage_seconds{{{labels},quantile="0.5"}} {entry["p50"]}')
+            lines.append(f'tender_stage_seconds{{{labels},quantile="0.95"}} {entry["p95"]}')
+            lines.append(f'tender_stage_seconds_sum{{{labels}}} {entry["total"]}')
+            lines.append(f'tender_stage_seconds_count{{{labels}}} {entry["count"]}')
+        lines.append("# TYPE tender_stage_bytes_total counter")
+        for stage, entry in report['stages'].items():
+            lines.append(f'tender_stage_bytes_total{{source="{source}",stage="{stage}"}} {entry["bytes"]}')
+        lines.append("# TYPE tender_sleep_seconds_total counter")
+        for reason, entry in report['sleep'].items():
+            lines.append(f'tender_sleep_seconds_total{{source="{source}",reason="{reason}"}} {entry["total"]}')
+        lines.append("# TYPE tender_wait_seconds_total counter")
+        for label, entry in report['waits'].items():
+            lines.append(f'tender_wait_seconds_total{{source="{source}",wait="{label}"}} {entry["total"]}')
+        lines.append("# TYPE tender_events_total counter")
+        for name, value in report['counters'].items():
+            lines.append(f'tender_events_total{{source="{source}",event="{name}"}} {value}')
+        lines.append("# TYPE tender_run_seconds gauge")
+        lines.append(f'tender_run_seconds{{source="{source}"}} {report["elapsed"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, source, output_dir, run_id):
+        """Write the JSON report, and the Prometheus file if $METRICS_PROM_DIR is set; returns the report"""
+        report = self.report()
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            json_path = os.path.join(output_dir, f"{source}_metrics_{run_id}.json")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Metrics written to {json_path}")
+
+            prometheus_dir = os.environ.get(PROMETHEUS_DIR_ENV)
+            if prometheus_dir:
+                os.makedirs(prometheus_dir, exist_ok=True)
+                prom_path = os.path.join(prometheus_dir, f"tenders_{source}.prom")
+                # Written under a temporary name so a collector never reads half a file
+                with open(f"{prom_path}.tmp", 'w', encoding='utf-8') as f:
+                    f.write(self.prometheus_text(source, report))
+                os.replace(f"{prom_path}.tmp", prom_path)
+                print(f"Prometheus metrics written to {prom_path}")
+        except Exception as e:
+            print(f"Could not write metrics: {str(e)}")
+        return report
+
+    def print_report(self, report=None):
+        report = report or self.report()
+        print("\nStage timings:")
+        for stage, entry in report['stages'].items():
+            print(f"  {stage}: {entry['count']} calls, {entry['total']:.2f}s total, p50 {entry['p50'] * 1000:.0f}ms, "
+                  f"p95 {entry['p95'] * 1000:.0f}ms, max {entry['max'] * 1000:.0f}ms, {entry['bytes']} bytes")
+        if report['sleep']:
+            print(f"  sleep: {report['sleep_total']:.2f}s total")
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide metrics of the current run"""
+    return _metrics
+
+
+def reset_metrics():
+    """Start a fresh set of metrics for a new run in this process"""
+    global _metrics
+    _metrics = Metrics()
+    return _metrics
+
+
+def timed(stage, size=0):
+    """Shorthand for get_metrics().timed(stage, size)"""
+    return _metrics.timed(stage, size)
+
+
+def instrumented(stage):
+    """Decorator timing every call of a function as one call of stage"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _metrics.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
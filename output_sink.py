@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from metrics import timed
+
+DEFAULT_OUTPUT_DIR = "tenders"
+
+
+def make_run_id():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _cell_value(value):
+    """Excel cells hold scalars; lists and dicts (e.g. Japan's Document Links) are written as text"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class RecordSink:
+    """Append-only newline-delimited JSON file holding every record of one run
+
+    Each write() appends the records and flushes them to disk, so memory stays flat and
+    a crash loses at most the batch being written.
+    """
+    extension = 'jsonl'
+
+    def __init__(self, name, output_dir=DEFAULT_OUTPUT_DIR, run_id=None, durable=True):
+        self.name = name
+        self.run_id = run_id or make_run_id()
+        self.durable = durable
+        self.count = 0
+        # Page workers may write concurrently; each batch stays contiguous
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, f"{name}_tenders_{self.run_id}.{self.extension}")
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        """Append a batch of records and flush it durably"""
+        if not records:
+            return 0
+        lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+        with timed('output_writing', len(lines.encode('utf-8'))), self._lock:
+            self._file.write(lines)
+            self._sync()
+            self.count += len(records)
+        print(f"Appended {len(records)} records to {self.path} ({self.count} this run)")
+        return len(records)
+
+    def _sync(self):
+        self._file.flush()
+        if self.durable:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def iter_records(self):
+        """Stream the records written so far"""
+        return read_records(self.path)
+
+    def export_excel(self, xlsx_path=None):
+        """Write all records of the run to one workbook, streaming rows to keep memory flat"""
+        from openpyxl import Workbook
+
+        self.close()
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            print(f"No records to export from {self.path}")
+            return None
+        xlsx_path = xlsx_path or f"{os.path.splitext(self.path)[0]}.xlsx"
+
+        # First pass collects the columns in order of appearance, second pass writes rows
+        columns = {}
+        for record in self.iter_records():
+            columns.update(dict.fromkeys(record))
+        columns = list(columns)
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.name)
+        sheet.append(columns)
+        for record in self.iter_records():
+            sheet.append([_cell_value(record.get(column)) for column in columns])
+        workbook.save(xlsx_path)
+        print(f"Exported {self.path} to {xlsx_path}")
+        return xlsx_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetSink(RecordSink):
+    """Parquet variant (needs pyarrow): records are appended durably to a JSONL staging file
+    and converted to Parquet on close()
+
+    A Parquet file cannot be read before its footer is written, so the staging file is
+    what a crash leaves behind. The columns are every key of every record, in order of
+    appearance; values are stored as strings.
+    """
+    extension = 'parquet'
+    # Records per row group when converting
+    row_group_size = 10000
+
+    def _open(self):
+        self.staging_path = f"{self.path}.jsonl"
+        self._file = open(self.staging_path, 'a', encoding='utf-8')
+
+    def iter_records(self):
+        if self._file is not None:
+            return read_records(self.staging_path)
+        return read_records(self.path)
+
+    def close(self):
+        if self._file is None:
+            return
+        super().close()
+        self._file = None
+        with timed('output_writing'):
+            self._convert()
+
+    def _convert(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {}
+        for record in read_records(self.staging_path):
+            columns.update(dict.fromkeys(record))
+        if not columns:
+            os.remove(self.staging_path)
+            return
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            batch = []
+            for record in read_records(self.staging_path):
+                batch.append(record)
+                if len(batch) >= self.row_group_size:
+                    writer.write_table(self._table(batch, schema))
+                    batch = []
+            if batch:
+                writer.write_table(self._table(batch, schema))
+        os.replace(tmp_path, self.path)
+        os.remove(self.staging_path)
+        print(f"Converted {self.staging_path} to {self.path}")
+
+    @staticmethod
+    def _table(records, schema):
+        import pyarrow as pa
+
+        return pa.table({
+            column: [None if record.get(column) is None else str(_cell_value(record.get(column)))
+                     for record in records]
+            for column in schema.names
+        }, schema=schema)
+
+
+def read_records(path):
+    """Stream the records of a run file written by RecordSink or ParquetSink"""
+    if not os.path.exists(path):
+        return
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def open_sink(name, output_dir=DEFAULT_OUTPUT_DIR, run_id=None, output_format='jsonl'):
+    """Open the run's sink in the requested format ('jsonl' or 'parquet')"""
+    if output_format == 'parquet':
+        return ParquetSink(name, output_dir, run_id)
+    return RecordSink(name, output_dir, run_id)
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from metrics import timed
+
+DEFAULT_ARCHIVE_DIR = os.path.join("tenders", "archive")
+
+
+class PageArchive:
+    """Compressed, content-addressed store of every page the scrapers fetched
+
+    A page body is gzipped once into blobs/<aa>/<sha256>.gz, however often it is fetched.
+    Each fetch appends an entry to manifests/<source>/<YYYY-MM-DD>.jsonl: the fetch time,
+    kind ('list', 'detail', ...), URL, the body's digest and any source-specific fields
+    the re-parser needs. An entry without a body records a fetch whose only result is a
+    URL, such as a resolved link.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, 'blobs', digest[:2], f"{digest}.gz")
+
+    def put(self, body):
+        """Store a body unless it is stored already; returns (digest, size)"""
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Another process may store the same page at the same time; both write the same bytes
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+        return digest, len(data)
+
+    def get(self, digest):
+        with open(self.blob_path(digest), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    def record(self, source, kind, url, body=None, **fields):
+        """Archive one fetch and return its manifest entry; fields that are None are left out"""
+        fetched_at = datetime.now()
+        entry = {'fetched_at': fetched_at.isoformat(timespec='seconds'), 'kind': kind, 'url': url}
+        with timed('archiving') as measured:
+            if body is not None:
+                entry['digest'], entry['size'] = self.put(body)
+                measured['bytes'] = entry['size']
+            entry.update((name, value) for name, value in fields.items() if value is not None)
+            directory = os.path.join(self.root, 'manifests', source)
+            line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+            with self._lock:
+                os.makedirs(directory, exist_ok=True)
+                # One short append per entry, so processes writing the same day do not interleave
+                with open(os.path.join(directory, f"{fetched_at.date().isoformat()}.jsonl"), 'a',
+                          encoding='utf-8') as f:
+                    f.write(line)
+        return entry
+
+    def entries(self, source, since=None, until=None, kinds=None):
+        """Entries of source fetched from since to until (dates, inclusive), oldest first"""
+        since, until = day_text(since), day_text(until)
+        directory = os.path.join(self.root, 'manifests', source)
+        if not os.path.isdir(directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(directory)):
+            day = name[:-len('.jsonl')]
+            if not name.endswith('.jsonl') or (since and day < since) or (until and day > until):
+                continue
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    if kinds is None or entry.get('kind') in kinds:
+                        entries.append(entry)
+        entries.sort(key=lambda entry: entry['fetched_at'])
+        return entries
+
+
+def day_text(value):
+    """A date, datetime or 'YYYY-MM-DD...' string as 'YYYY-MM-DD', or None"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def latest_by_url(entries):
+    """The most recent entry of each URL"""
+    return {entry['url']: entry for entry in entries}
+
+
+def _parse_entry(task):
+    root, parse, entry = task
+    try:
+        body = PageArchive(root).get(entry['digest']) if 'digest' in entry else None
+        return parse(entry, body)
+    except Exception as e:
+        print(f"Could not re-parse {entry.get('url')} fetched at {entry.get('fetched_at')}: {e}")
+        return None
+
+
+def parse_entries(entries, parse, workers=None, root=DEFAULT_ARCHIVE_DIR):
+    """Run parse(entry, body) over archived entries in worker processes, returning results in order
+
+    parse must be a module-level function so the workers can import it; an entry whose
+    parse fails gives None. workers defaults to one per core.
+    """
+    tasks = [(root, parse, entry) for entry in entries]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        return [_parse_entry(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_entry, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_page_archive():
+    """Return the process-wide page archive"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = PageArchive()
+        return _archive
+
+
+def archive_page(source, kind, url, body=None, **fields):
+    """Add a fetched page to the process-wide archive; a failure is reported, never raised"""
+    try:
+        return get_page_archive().record(source, kind, url, body, **fields)
+    except Exception as e:
+        print(f"Could not archive {url}: {str(e)}")
+        return None
@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+
+# Items a stage may have waiting before the stage feeding it blocks
+DEFAULT_QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a Pipeline: func(item) returns the item for the next stage, or None to drop it"""
+
+    def __init__(self, name, func, workers=1, queue_size=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.func = func
+        self.workers = max(int(workers), 1)
+        self.queue_size = max(int(queue_size), 1)
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def to_dict(self):
+        return {'workers': self.workers, 'items': self.items, 'errors': self.errors,
+                'busy_seconds': round(self.busy, 3), 'blocked_seconds': round(self.blocked, 3)}
+
+
+class Pipeline:
+    """Runs the items of a source through stages on worker threads connected by bounded queues
+
+    The source is iterated in the caller's thread (where its browser lives) while each
+    stage works on earlier items, so reading page N+1 overlaps resolving and translating
+    page N. A stage's queue holds at most queue_size items: a stage that gets ahead
+    blocks until the next one catches up, which caps the pages held in memory. An
+    item whose stage raises is reported and dropped, like a page that fails in a
+    serial loop. With several workers a stage may pass items on out of order.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+
+    def run(self, source):
+        """Feed every item of source through the stages and wait until the last one is done"""
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        threads = []
+
+        def put(index, item, stage=None):
+            started = time.perf_counter()
+            queues[index].put(item)
+            if stage is not None:
+                waited = time.perf_counter() - started
+                with stage._lock:
+                    stage.blocked += waited
+
+        def work(index):
+            stage = self.stages[index]
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+                started = time.perf_counter()
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    print(f"Pipeline stage {stage.name} failed: {e}")
+                    result = None
+                    with stage._lock:
+                        stage.errors += 1
+                with stage._lock:
+                    stage.items += 1
+                    stage.busy += time.perf_counter() - started
+                if result is not None and index + 1 < len(self.stages):
+                    put(index + 1, result, stage)
+            # The last worker of a stage to finish tells the next stage's workers to stop
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    put(index + 1, _DONE)
+
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(target=work, args=(index,), name=f"{stage.name}-{worker + 1}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            if self.stages:
+                for item in source:
+                    if item is not None:
+                        put(0, item)
+        finally:
+            # Items already read still go through every stage, even if the source failed
+            for _ in range(self.stages[0].workers if self.stages else 0):
+                put(0, _DONE)
+            for thread in threads:
+                thread.join()
+        return self.to_dict()
+
+    def to_dict(self):
+        return {stage.name: stage.to_dict() for stage in self.stages}
+
+    def report(self):
+        """Print each stage's load; the stage with the most busy time per worker is the one to widen"""
+        for stage in self.stages:
+            print(f"Stage {stage.name}: {stage.items} items on {stage.workers} workers, "
+                  f"{stage.busy:.1f}s busy, {stage.blocked:.1f}s waiting on the next stage"
+                  + (f", {stage.errors} failed" if stage.errors else ""))
+
+
+def parse_stage_workers(values):
+    """['translate=2', 'links=3'] -> {'translate': 2, 'links': 3}"""
+    workers = {}
+    for value in values or []:
+        name, _, count = value.partition('=')
+        if not name.strip() or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Expected STAGE=N with N at least 1, got {value}")
+        workers[name.strip().lower()] = int(count)
+    return workers
+
+
+def combine_stage_stats(results):
+    """Add up the to_dict() of several pipelines (e.g. one per page range), skipping None"""
+    combined = {}
+    for stats in results or []:
+        for name, stage in (stats or {}).items():
+            total = combined.setdefault(name, {'workers': stage['workers'], 'items': 0, 'errors': 0,
+                                               'busy_seconds': 0.0, 'blocked_seconds': 0.0})
+            for key in ('items', 'errors', 'busy_seconds', 'blocked_seconds'):
+                total[key] = round(total[key] + stage[key], 3)
+    return combined
@@ -0,0 +1,372 @@
+import copy
+import json
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from date_utils import parse_components
+from http_client import DEFAULT_TIMEOUT, create_session
+from metrics import timed
+
+# Wraps fetch and XMLHttpRequest so every JSON response the page receives is kept in
+# window.__recordedRequests together with the request that produced it
+RECORDER_SCRIPT = """
+(function () {
+    if (window.__recordedRequests) { return; }
+    var recorded = window.__recordedRequests = [];
+    var MAX_CHARS = 4000000;
+    function keep(entry, text, contentType) {
+        text = text || '';
+        var trimmed = text.replace(/^\\s+/, '');
+        if ((contentType || '').indexOf('json') < 0 && trimmed[0] !== '{' && trimmed[0] !== '[') { return; }
+        if (text.length > MAX_CHARS) { return; }
+        entry.response = text;
+        recorded.push(entry);
+    }
+    function headersOf(headers) {
+        var result = {};
+        if (!headers) { return result; }
+        if (typeof headers.forEach === 'function' && !Array.isArray(headers)) {
+            headers.forEach(function (value, name) { result[name] = value; });
+        } else if (Array.isArray(headers)) {
+            headers.forEach(function (pair) { result[pair[0]] = pair[1]; });
+        } else {
+            for (var name in headers) { result[name] = headers[name]; }
+        }
+        return result;
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            init = init || {};
+            var entry = {
+                url: typeof input === 'string' ? input : input.url,
+                method: (init.method || (input && input.method) || 'GET').toUpperCase(),
+                headers: headersOf(init.headers || (input && input.headers)),
+                body: typeof init.body === 'string' ? init.body : null
+            };
+            return originalFetch.apply(this, arguments).then(function (response) {
+                entry.status = response.status;
+                response.clone().text().then(function (text) {
+                    keep(entry, text, response.headers.get('content-type'));
+                }).catch(function () {});
+                return response;
+            });
+        };
+    }
+    var open = XMLHttpRequest.prototype.open;
+    var setRequestHeader = XMLHttpRequest.prototype.setRequestHeader;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__entry = {url: url, method: String(method).toUpperCase(), headers: {}, body: null};
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.setRequestHeader = function (name, value) {
+        if (this.__entry) { this.__entry.headers[name] = value; }
+        return setRequestHeader.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function (body) {
+        var xhr = this, entry = this.__entry;
+        if (entry) {
+            entry.body = typeof body === 'string' ? body : null;
+            xhr.addEventListener('load', function () {
+                entry.status = xhr.status;
+                var text = (xhr.responseType === '' || xhr.responseType === 'text') ? xhr.responseText :
+                           (xhr.responseType === 'json' ? JSON.stringify(xhr.response) : '');
+                keep(entry, text, xhr.getResponseHeader('content-type'));
+            });
+        }
+        return send.apply(this, arguments);
+    };
+})();
+"""
+
+# ISO timestamps from JSON APIs ("2025-07-02T12:00:00.000+02:00") -> "2025-07-02 12:00:00"
+ISO_TIMESTAMP_REGEX = re.compile(r'^(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2}(?::\d{2})?)\S*$')
+
+# Parameter names that select the page, in the order they are tried
+PAGE_KEYS = ['page', 'pageNumber', 'pageNo', 'pageIndex', 'currentPage', 'curPage', 'pageNum', 'pg']
+OFFSET_KEYS = ['offset', 'skip', 'start', 'firstResult', 'from']
+SIZE_KEYS = ['size', 'pageSize', 'limit', 'take', 'rows', 'perPage', 'recordCountPerPage', 'rowCount', 'length']
+
+
+def install_recorder(driver):
+    """Record JSON responses on every page the driver opens from now on, and on the current one"""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': RECORDER_SCRIPT})
+    except Exception as e:
+        print(f"Could not install the request recorder for new documents: {e}")
+    driver.execute_script(RECORDER_SCRIPT)
+
+
+def recorded_requests(driver):
+    """Return the requests recorded on the current document, newest last"""
+    entries = driver.execute_script("return window.__recordedRequests || [];") or []
+    base_url = driver.current_url
+    for entry in entries:
+        entry['url'] = urljoin(base_url, entry['url'])
+        try:
+            entry['payload'] = json.loads(entry['response'])
+        except (TypeError, ValueError):
+            entry['payload'] = None
+    return entries
+
+
+def find_records(payload):
+    """Return (path, records) for the largest list of objects inside a JSON payload"""
+    best_path, best = None, []
+    stack = [((), payload)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, list):
+            if value and all(isinstance(item, dict) for item in value) and len(value) > len(best):
+                best_path, best = path, value
+            stack.extend((path + (i,), item) for i, item in enumerate(value[:1]))
+        elif isinstance(value, dict):
+            stack.extend((path + (key,), item) for key, item in value.items())
+    return best_path, best
+
+
+def payload_records(payload, records_path):
+    """The records of a response at records_path, or wherever they are if that path is missing"""
+    try:
+        return get_path(payload, records_path) if records_path is not None else []
+    except (KeyError, IndexError, TypeError):
+        _, records = find_records(payload)
+        return records
+
+
+def get_path(value, path):
+    for key in path:
+        value = value[key]
+    return value
+
+
+def find_key(value, names, path=()):
+    """Find the first key (case-insensitive) from names in a nested dict; returns its path"""
+    lowered = {name.lower(): index for index, name in enumerate(names)}
+    if isinstance(value, dict):
+        matches = sorted((lowered[key.lower()], key) for key in value
+                         if isinstance(key, str) and key.lower() in lowered
+                         and not isinstance(value[key], (dict, list)))
+        if matches:
+            return path + (matches[0][1],)
+        for key, item in value.items():
+            found = find_key(item, names, path + (key,))
+            if found:
+                return found
+    return None
+
+
+def set_path(value, path, new_value):
+    for key in path[:-1]:
+        value = value[key]
+    old_value = value[path[-1]]
+    # Keep the type the server sent (e.g. "1" stays a string)
+    value[path[-1]] = str(new_value) if isinstance(old_value, str) else new_value
+
+
+class ReplayableRequest:
+    """A recorded list request that can be sent again for any page
+
+    The page is addressed either by a page-number parameter (PAGE_KEYS) or by an
+    offset (OFFSET_KEYS), found in the query string or in a JSON or form body.
+    recorded_page is the page the table showed when the request was recorded, so a
+    zero-based page parameter is detected from its value. Without a size parameter the
+    page size is the number of records in the recorded response.
+    """
+
+    def __init__(self, entry, recorded_page=1, session=None):
+        self.method = entry.get('method', 'GET')
+        self.headers = {name: value for name, value in (entry.get('headers') or {}).items()
+                        if name.lower() not in ('content-length', 'cookie', 'host')}
+        parts = urlsplit(entry['url'])
+        self.url = urlunsplit(parts._replace(query=''))
+        self.query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        self.body_kind, self.body = self._parse_body(entry.get('body'))
+        self.records_path, recorded_records = find_records(entry.get('payload'))
+        self.session = session or create_session()
+
+        self.page_location = self._locate(PAGE_KEYS)
+        self.offset_location = None if self.page_location else self._locate(OFFSET_KEYS)
+        self.size_location = self._locate(SIZE_KEYS)
+        if not (self.page_location or self.offset_location):
+            raise ValueError(f"No page or offset parameter in {entry['url']}")
+        if self.size_location:
+            self.page_size = int(self._read(self.size_location))
+        else:
+            self.page_size = len(recorded_records) or None
+        if self.offset_location and not self.page_size:
+            raise ValueError(f"Offset paging without a known page size in {entry['url']}")
+        self.page_base = 1
+        if self.page_location:
+            self.page_base = 1 - (recorded_page - int(self._read(self.page_location)))
+
+    @staticmethod
+    def _parse_body(body):
+        if not body:
+            return None, None
+        try:
+            return 'json', json.loads(body)
+        except ValueError:
+            return 'form', dict(parse_qsl(body, keep_blank_values=True))
+
+    def _locate(self, names):
+        path = find_key(self.query, names)
+        if path:
+            return 'query', path
+        if self.body is not None:
+            path = find_key(self.body, names)
+            if path:
+                return 'body', path
+        return None
+
+    def _read(self, location):
+        where, path = location
+        return get_path(self.query if where == 'query' else self.body, path)
+
+    def build(self, page, page_size=None):
+        """Return (query, body) for a page number counted from 1"""
+        query = dict(self.query)
+        body = copy.deepcopy(self.body)
+        page_size = page_size or self.page_size
+        targets = {'query': query, 'body': body}
+        if page_size and self.size_location:
+            where, path = self.size_location
+            set_path(targets[where], path, page_size)
+        if self.page_location:
+            where, path = self.page_location
+            set_path(targets[where], path, page - 1 + self.page_base)
+        else:
+            if not page_size:
+                raise ValueError(f"Offset paging without a known page size in {self.url}")
+            where, path = self.offset_location
+            set_path(targets[where], path, (page - 1) * page_size)
+        return query, body
+
+    def page_of(self, query, body=None):
+        """Inverse of build: the page number (from 1) a request for this endpoint asks for"""
+        targets = {'query': query, 'body': body}
+        page_size = self.page_size or 1
+        if self.size_location:
+            where, path = self.size_location
+            page_size = int(get_path(targets[where], path))
+        if self.page_location:
+            where, path = self.page_location
+            return int(get_path(targets[where], path)) + 1 - self.page_base
+        where, path = self.offset_location
+        return int(get_path(targets[where], path)) // page_size + 1
+
+    def fetch(self, page, page_size=None, timeout=DEFAULT_TIMEOUT):
+        """Send the request for one page and return (records, payload)"""
+        query, body = self.build(page, page_size)
+        kwargs = {'params': query, 'headers': self.headers, 'timeout': timeout}
+        if self.body_kind == 'json':
+            kwargs['data'] = json.dumps(body)
+            if not any(name.lower() == 'content-type' for name in self.headers):
+                kwargs['headers'] = {**self.headers, 'Content-Type': 'application/json'}
+        elif self.body_kind == 'form':
+            kwargs['data'] = urlencode(body)
+        with timed('navigation') as measured:
+            response = self.session.request(self.method, self.url, **kwargs)
+            measured['bytes'] = len(response.content)
+        response.raise_for_status()
+        payload = response.json()
+        return payload_records(payload, self.records_path), payload
+
+    def to_dict(self):
+        """Everything needed to replay the request later without a browser"""
+        return {
+            'method': self.method, 'url': self.url, 'headers': self.headers, 'query': self.query,
+            'body_kind': self.body_kind, 'body': self.body,
+            'records_path': self.records_path, 'page_location': self.page_location,
+            'offset_location': self.offset_location, 'size_location': self.size_location,
+            'page_size': self.page_size, 'page_base': self.page_base
+        }
+
+    @classmethod
+    def from_dict(cls, data, session=None, base_url=None):
+        """Rebuild a saved request; base_url points it at another host, e.g. a local stub server"""
+        request = cls.__new__(cls)
+        request.__dict__.update(data)
+        for name in ('records_path', 'page_location', 'offset_location', 'size_location'):
+            value = data.get(name)
+            if value is not None:
+                request.__dict__[name] = (tuple(value) if name == 'records_path'
+                                          else (value[0], tuple(value[1])))
+        if base_url:
+            parts = urlsplit(request.url)
+            request.url = urljoin(base_url.rstrip('/') + '/', parts.path.lstrip('/'))
+        request.session = session or create_session()
+        return request
+
+    def copy_cookies(self, driver):
+        """Send the browser's cookies with replayed requests"""
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'),
+                                     path=cookie.get('path', '/'))
+
+
+def flatten_record(record, prefix=''):
+    """Flatten nested objects into {'parent.child': value}; lists are left out"""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, f"{name}."))
+        elif not isinstance(value, list):
+            flat[name] = value
+    return flat
+
+
+def find_request_with(entries, value):
+    """Return the newest recorded request whose records contain value"""
+    value = str(value).strip()
+    for entry in reversed(entries):
+        _, records = find_records(entry.get('payload'))
+        for record in records:
+            if any(str(item).strip() == value for item in flatten_record(record).values()):
+                return entry
+    return None
+
+
+def api_text(value):
+    """Render an API value the way a table shows it; ISO timestamps lose their T and zone"""
+    if value is None:
+        return ""
+    return ISO_TIMESTAMP_REGEX.sub(r'\1 \2', str(value)).strip()
+
+
+def same_value(table_text, value):
+    """Compare a table cell with an API value, treating differently formatted dates as equal"""
+    value = api_text(value)
+    if not value:
+        return False
+    if table_text.strip() == value:
+        return True
+    table_date, table_time = parse_components(table_text)
+    api_date, api_time = parse_components(value)
+    return table_date is not None and table_date == api_date and (table_time is None or table_time == api_time)
+
+
+def match_field(pairs):
+    """Return the record field whose value matches the table text in every (table_text, record) pair"""
+    if not pairs:
+        return None
+    return next((field for field in pairs[0][1]
+                 if all(same_value(text, record.get(field)) for text, record in pairs)), None)
+
+
+def index_records(records):
+    """Flatten records and index them by (field, text) for finding the record behind a table row"""
+    records = [flatten_record(record) for record in records]
+    index = {}
+    for record in records:
+        for field, value in record.items():
+            index.setdefault((field, api_text(value)), record)
+    return records, index
+
+
+def key_field(records, index, keys):
+    """Return the field that holds every one of the given row keys"""
+    return next((field for field in (records[0] if records else {})
+                 if all((field, key.strip()) in index for key in keys)), None)
@@ -0,0 +1,284 @@
+"""Run the tender scrapers side by side, one process per country
+
+Usage:
+    python run_all.py [COUNTRY ...] [--pages italy=1-5 --pages japan=1-3] [--workers italy=2] [--parallel N]
+    python run_all.py [COUNTRY ...] --reparse [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+
+Every scraper writes to tenders/<country>_tenders_<run>.jsonl under the same run id and
+its output to tenders/<country>_<run>.log. When all have finished, their records are
+merged into tenders/all_tenders_<run>.jsonl in the shared Tender schema, and the run
+summary (records, errors and per-stage timings of every country) is written to
+tenders/run_summary_<run>.json. With --reparse the countries re-parse the pages archived
+in tenders/archive instead of scraping, without a browser or network.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+
+from metrics import PROMETHEUS_DIR_ENV
+from output_sink import DEFAULT_OUTPUT_DIR, make_run_id, open_sink
+from pipeline import parse_stage_workers
+from run_summary import StageTimer
+from tender_filter import add_filter_arguments, filter_from_args
+from tender_schema import merge_runs
+
+# Country -> (module, entry point, whether it takes a page range and workers)
+SCRAPERS = {
+    'italy': ('italy_scrapper', 'main', True),
+    'japan': ('japan_scrapper', 'scrape_japan_tenders', True),
+    'macedonia': ('macedonia_scrapper', 'main', True),
+    'south_korea': ('southkorea_scrapper', 'main', False),
+}
+
+# Scrapers that continue an interrupted run from its checkpoint
+RESUMABLE = {'italy', 'japan'}
+
+# Scrapers that take a tender_filter.FilterSpec as filters
+FILTERABLE = {'italy', 'japan', 'macedonia'}
+
+# Scrapers running their stages as a pipeline.Pipeline, taking stage_workers
+PIPELINED = {'italy', 'macedonia', 'south_korea'}
+
+# Country -> entry point re-parsing its archived pages, in the module of SCRAPERS
+REPARSERS = {
+    'italy': 'reparse_archive',
+    'japan': 'reparse_archive',
+    'macedonia': 'reparse_archive',
+}
+
+# Merged records are written in chunks of this many
+MERGE_CHUNK = 5000
+
+
+def parse_page_range(text):
+    """'3-10' -> (3, 10); '3-' -> (3, None), up to the last page; '3' -> (3, 3)"""
+    first, dash, last = text.partition('-')
+    first = int(first) if first.strip() else 1
+    if not dash:
+        return first, first
+    last = int(last) if last.strip() else None
+    if first < 1 or (last is not None and last < first):
+        raise ValueError(f"Invalid page range {text}")
+    return first, last
+
+
+def parse_assignments(values, convert):
+    """['italy=1-5', 'japan=2'] -> {'italy': convert('1-5'), 'japan': convert('2')}"""
+    assigned = {}
+    for value in values or []:
+        country, _, setting = value.partition('=')
+        country = country.strip().lower().replace('-', '_')
+        if country not in SCRAPERS or not setting:
+            raise ValueError(f"Expected COUNTRY=VALUE with COUNTRY one of {', '.join(SCRAPERS)}, got {value}")
+        assigned[country] = convert(setting)
+    return assigned
+
+
+def run_country(country, options, log_path=None, reparse=False):
+    """Run one scraper (or its re-parser) in this process and return its summary, with the wall time added"""
+    module_name, entry_point, _ = SCRAPERS[country]
+    if reparse:
+        entry_point = REPARSERS[country]
+    started = time.perf_counter()
+    log = open(log_path, 'a', encoding='utf-8', buffering=1) if log_path else None
+    try:
+        if log:
+            with redirect_stdout(log), redirect_stderr(log):
+                summary = _run_scraper(country, module_name, entry_point, options)
+        else:
+            summary = _run_scraper(country, module_name, entry_point, options)
+    finally:
+        if log:
+            log.close()
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    summary['log'] = log_path
+    return summary
+
+
+def _run_scraper(country, module_name, entry_point, options):
+    try:
+        scraper = getattr(importlib.import_module(module_name), entry_point)
+        return scraper(**options) or {'country': country}
+    except Exception as e:
+        traceback.print_exc()
+        return {'country': country, 'error': str(e)}
+
+
+def merge_outputs(results, run_id, output_format='jsonl'):
+    """Write every country's records of this run to one file in the shared Tender schema"""
+    run_files = {country: result['output'] for country, result in results.items() if result.get('records')}
+    if not run_files:
+        print("No records to merge")
+        return None
+    batch = merge_runs(run_files)
+    with open_sink('all', run_id=run_id, output_format=output_format) as sink:
+        chunk = []
+        for tender in batch:
+            chunk.append(tender.to_dict())
+            if len(chunk) >= MERGE_CHUNK:
+                sink.write(chunk)
+                chunk = []
+        sink.write(chunk)
+    return {'records': sink.count, 'output': sink.path}
+
+
+def run_all(countries, options, parallel=None, run_id=None, merge=True, output_format='jsonl', log_to_files=True,
+            reparse=False):
+    """Run the scrapers of countries ({country: keyword arguments}) in parallel processes
+
+    With reparse the countries' re-parsers run instead, over their archived pages.
+
+    Returns the run summary, which is also written to tenders/run_summary_<run>.json.
+    """
+    run_id = run_id or make_run_id()
+    started_at = datetime.now().isoformat(timespec='seconds')
+    timer = StageTimer()
+    os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+
+    timer.start('scrape')
+    parallel = min(parallel or len(countries), len(countries))
+    print(f"Run {run_id}: {', '.join(countries)} in {parallel} parallel processes")
+    results = {}
+    with ProcessPoolExecutor(max_workers=parallel) as executor:
+        futures = {}
+        for country in countries:
+            log_path = os.path.join(DEFAULT_OUTPUT_DIR, f"{country}_{run_id}.log") if log_to_files else None
+            if log_path:
+                print(f"{country}: logging to {log_path}")
+            futures[executor.submit(run_country, country, options[country], log_path, reparse)] = country
+        for future in as_completed(futures):
+            country = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {'country': country, 'error': str(e)}
+            results[country] = result
+            status = f"failed: {result['error']}" if result.get('error') else "done"
+            print(f"{country}: {status}, {result.get('records', 0)} records in {result.get('seconds', '?')}s")
+
+    merged = None
+    if merge:
+        timer.start('merge')
+        try:
+            merged = merge_outputs(results, run_id, output_format)
+        except Exception as e:
+            print(f"Could not merge the country outputs: {e}")
+    timer.stop()
+
+    summary = {
+        'run_id': run_id,
+        'started_at': started_at,
+        'parallel': parallel,
+        'reparse': reparse,
+        'stages': timer.to_dict(),
+        'sequential_seconds': round(sum(result.get('seconds', 0) for result in results.values()), 3),
+        'merged': merged,
+        'countries': {country: results[country] for country in countries if country in results},
+    }
+    summary_path = os.path.join(DEFAULT_OUTPUT_DIR, f"run_summary_{run_id}.json")
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Run finished in {summary['stages']['total']:.1f}s "
+          f"(the countries took {summary['sequential_seconds']:.1f}s together); summary in {summary_path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('countries', nargs='*', metavar='COUNTRY',
+                        help=f"Countries to scrape: {', '.join(SCRAPERS)} (default: all)")
+    parser.add_argument('--pages', action='append', metavar='COUNTRY=RANGE',
+                        help="Page range of a country, e.g. italy=1-5, macedonia=3- (to the last page)")
+    parser.add_argument('--workers', action='append', metavar='COUNTRY=N',
+                        help="Browsers or page ranges a country scrapes in parallel (default 1)")
+    parser.add_argument('--parallel', type=int, help="Countries running at once (default: all)")
+    parser.add_argument('--max-pages', type=int, default=25, help="Pages per browser before it is replaced")
+    parser.add_argument('--headed', action='store_true', help="Show the browser windows")
+    parser.add_argument('--full', action='store_true', help="Re-scrape tenders seen in earlier runs")
+    parser.add_argument('--no-excel', action='store_true', help="Skip the per-country Excel exports")
+    parser.add_argument('--no-merge', action='store_true', help="Do not merge the countries into one file")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl', help="Output file format")
+    parser.add_argument('--restart', action='store_true', help="Discard the checkpoints of interrupted runs")
+    parser.add_argument('--prom-dir', help="Also write each country's metrics as a Prometheus text file here")
+    parser.add_argument('--console', action='store_true', help="Print scraper output here instead of log files")
+    parser.add_argument('--reparse', action='store_true', help="Re-parse the archived pages instead of scraping")
+    parser.add_argument('--since', help="With --reparse, the first fetch date re-parsed, YYYY-MM-DD")
+    parser.add_argument('--until', help="With --reparse, the last fetch date re-parsed, YYYY-MM-DD")
+    parser.add_argument('--stage-workers', action='append', metavar='STAGE=N',
+                        help="Threads of a pipeline stage in every country that has it: links, translate, process")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    countries = [country.lower().replace('-', '_') for country in args.countries] or list(SCRAPERS)
+    unknown = [country for country in countries if country not in SCRAPERS]
+    if unknown:
+        parser.error(f"Unknown countries: {', '.join(unknown)}")
+    try:
+        pages = parse_assignments(args.pages, parse_page_range)
+        workers = parse_assignments(args.workers, int)
+        filters = filter_from_args(args)
+        stage_workers = parse_stage_workers(args.stage_workers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.prom_dir:
+        # Read by metrics.Metrics.write_report in every scraper process
+        os.environ[PROMETHEUS_DIR_ENV] = args.prom_dir
+
+    run_id = make_run_id()
+    options = {}
+    if args.reparse:
+        for country in dict.fromkeys(countries):
+            if country not in REPARSERS:
+                print(f"{country} pages are not archived; skipping it")
+                continue
+            options[country] = {
+                'since': args.since,
+                'until': args.until,
+                'export_excel': not args.no_excel,
+                'run_id': run_id,
+                'output_format': args.format,
+            }
+        if not options:
+            parser.error("None of the countries can be re-parsed")
+        if filters:
+            print("Re-parsing writes every archived tender; the filter options are ignored")
+    else:
+        for country in dict.fromkeys(countries):
+            options[country] = {
+                'incremental': not args.full,
+                'export_excel': not args.no_excel,
+                'headless': not args.headed,
+                'run_id': run_id,
+                'output_format': args.format,
+            }
+            if SCRAPERS[country][2]:
+                start_page, end_page = pages.get(country, (1, None))
+                options[country].update(start_page=start_page, end_page=end_page,
+                                        workers=max(workers.get(country, 1), 1), max_pages=args.max_pages)
+            if country in RESUMABLE:
+                options[country]['resume'] = not args.restart
+            if not SCRAPERS[country][2] and (country in pages or country in workers):
+                print(f"{country} reads its whole result list; --pages and --workers are ignored")
+            if filters and country in FILTERABLE:
+                options[country]['filters'] = filters
+            elif filters:
+                print(f"{country} cannot filter its tenders; the filter options are ignored")
+            if stage_workers and country in PIPELINED:
+                options[country]['stage_workers'] = stage_workers
+
+    summary = run_all(list(options), options, args.parallel, run_id, merge=not args.no_merge,
+                      output_format=args.format, log_to_files=not args.console, reparse=args.reparse)
+    return 1 if any(result.get('error') for result in summary['countries'].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+from metrics import get_metrics
+
+
+class StageTimer:
+    """Wall-clock seconds per named stage of a run
+
+    start() ends the running stage and begins the next one, so a scraper marks its
+    stages in order without re-indenting them; a stage started twice adds up.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._current = None
+        self._stage_started = None
+        self._lock = threading.Lock()
+
+    def start(self, name):
+        with self._lock:
+            now = time.perf_counter()
+            self._end(now)
+            self._current = name
+            self._stage_started = now
+
+    def stop(self):
+        with self._lock:
+            self._end(time.perf_counter())
+            self._current = None
+
+    def _end(self, now):
+        if self._current is not None:
+            self.stages[self._current] = self.stages.get(self._current, 0.0) + now - self._stage_started
+
+    def to_dict(self):
+        with self._lock:
+            stages = {name: round(seconds, 3) for name, seconds in self.stages.items()}
+            stages['total'] = round(time.perf_counter() - self.started, 3)
+            return stages
+
+
+def finish_summary(summary, sink, timer, xlsx_path=None):
+    """Fill a scraper's run summary: records written, output files, stage timings and metrics
+
+    The metrics report is also written next to the output (see metrics.Metrics.write_report).
+    """
+    timer.stop()
+    metrics = get_metrics()
+    report = metrics.write_report(summary.get('country', sink.name), os.path.dirname(sink.path), sink.run_id)
+    metrics.print_report(report)
+    summary.setdefault('error', None)
+    summary.update({
+        'records': sink.count,
+        'output': sink.path,
+        'excel': xlsx_path,
+        'stages': timer.to_dict(),
+        'metrics': report,
+    })
+    return summary
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_INDEX_PATH = os.path.join("tenders", "seen_tenders.sqlite")
+
+
+def content_hash(record, fields=None):
+    """Hash the given fields (or list indices) of a record, or the whole record, to detect changes"""
+    if fields is not None:
+        if isinstance(record, (list, tuple)):
+            record = [record[field] for field in fields]
+        else:
+            record = {field: record.get(field) for field in fields}
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    """SQLite index of processed tender IDs and their content hashes, per source"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared by page workers running in parallel, so every use takes the lock; scrapers
+        # run side by side by run_all wait for each other's writes instead of failing
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_tenders (
+                source TEXT NOT NULL,
+                tender_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (source, tender_id)
+            )
+        """)
+        self.conn.commit()
+        # Hashes of records handed out by filter_changed, written once they are saved
+        self._pending = {}
+
+    def get_hashes(self, source, tender_ids):
+        """Return {tender_id: content_hash} for the IDs already in the index"""
+        hashes = {}
+        tender_ids = list(tender_ids)
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(tender_ids), 500):
+            chunk = tender_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT tender_id, content_hash FROM seen_tenders WHERE source = ? AND tender_id IN ({placeholders})",
+                    [source, *chunk]
+                ).fetchall()
+            hashes.update(rows)
+        return hashes
+
+    def filter_changed(self, source, records, key, fields=None, skip_unchanged=True):
+        """Return the records that are new or whose content changed since they were last processed
+
+        key is a field name or a callable returning the tender ID; fields limits the hash
+        to the listed fields. With skip_unchanged=False every record is returned but the
+        index is still refreshed when mark_done is called.
+        """
+        get_key = key if callable(key) else (lambda record: record.get(key))
+        keyed = [(str(get_key(record)), content_hash(record, fields), record) for record in records]
+        known = self.get_hashes(source, {tender_id for tender_id, _, _ in keyed})
+
+        changed = []
+        with self._lock:
+            pending = self._pending.setdefault(source, {})
+            for tender_id, digest, record in keyed:
+                if skip_unchanged and known.get(tender_id) == digest:
+                    continue
+                pending[tender_id] = digest
+                changed.append(record)
+
+        skipped = len(records) - len(changed)
+        if skipped:
+            print(f"Skipping {skipped} unchanged {source} tenders, {len(changed)} new or changed")
+        return changed
+
+    def mark_done(self, source, tender_ids):
+        """Record that these tenders made it through every stage"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            pending = self._pending.get(source, {})
+            rows = [(source, str(tender_id), pending.pop(str(tender_id)), now, now)
+                    for tender_id in tender_ids if str(tender_id) in pending]
+            if not rows:
+                return
+            self.conn.executemany("""
+                INSERT INTO seen_tenders (source, tender_id, content_hash, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, tender_id)
+                DO UPDATE SET content_hash = excluded.content_hash, last_seen = excluded.last_seen
+            """, rows)
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,16 +1,29 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-import time
-import pandas as pd
-from deep_translator import GoogleTranslator
+from translation_cache import save_translation_cache
+from translation_engine import get_translation_engine
+from date_utils import split_date_range
+from seen_index import SeenIndex
+from output_sink import open_sink
+from grid_harvester import GridHarvester
+from dom_extract import extract_cells
+from request_recorder import (ReplayableRequest, api_text, find_records, find_request_with, flatten_record,
+                              index_records, install_recorder, key_field, match_field, recorded_requests)
+from driver_pool import create_driver
+from run_summary import StageTimer, finish_summary
+from metrics import reset_metrics, timed
+from host_limiter import throttled
+from pipeline import Pipeline, Stage, parse_stage_workers
+from http_client import USER_AGENT
+from waits import count_rows, first_row_text, report_waits, wait_for_page_load, wait_for_table_change, wait_until
+import argparse
+import json
 import os
 import random
+import re
+from datetime import datetime, timedelta
 from selenium.webdriver.common.action_chains import ActionChains
 import traceback
 import logging
@@ -23,29 +36,325 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-def main():
+# Result count shown above the bid announcement grid, e.g. "총 1,234건"
+TOTAL_COUNT_REGEX = re.compile(r'총\s*([\d,]+)\s*건')
+RESULT_CONTAINER_ID = "mf_wfm_container_tacBidPbancLst_contents_tab2_body"
+G2B_URL = "https://www.g2b.go.kr/"
+
+# Helper to get unique row id (Tender Notice Number or fallback)
+def get_row_id(row):
+    return row[5] if len(row) > 5 else str(row)
+
+# Columns that identify a changed tender; the running "No" column is left out
+SEEN_HASH_COLUMNS = [1, 5, 6, 7, 9]
+
+def translate_batch(rows, seen_index, incremental=True):
+    """Turn a batch of grid rows into translated records; unchanged tenders are left out"""
+    valid_rows = [row for row in rows if len(row) > 9]
+    # Only new or changed tenders are translated and written
+    valid_rows = seen_index.filter_changed(
+        'south_korea', valid_rows, get_row_id, SEEN_HASH_COLUMNS, skip_unchanged=incremental
+    )
+    if not valid_rows:
+        return []
+    no_column = [row[0] for row in valid_rows]
+    division_column = [row[1] for row in valid_rows]
+    tender_notice_number_column = [row[5] for row in valid_rows]
+    announcement_name_column = [row[6] for row in valid_rows]
+    announcement_agency_column = [row[7] for row in valid_rows]
+    # Split publishing date and bid closing date
+    publishing_date_column = []
+    bid_closing_date_column = []
+    for row in valid_rows:
+        publishing_date, bid_closing_date = split_date_range(row[9])
+        publishing_date_column.append(publishing_date)
+        bid_closing_date_column.append(bid_closing_date)
+    country_name_column = ['South Korea'] * len(no_column)
+    website_link_column = [G2B_URL] * len(no_column)
+    # Translate relevant columns to English
+    translations = get_translation_engine().translate_many(
+        division_column + announcement_name_column + announcement_agency_column,
+        source='auto', target='en'
+    )
+    division_column = [translations.get(x, x) for x in division_column]
+    announcement_name_column = [translations.get(x, x) for x in announcement_name_column]
+    announcement_agency_column = [translations.get(x, x) for x in announcement_agency_column]
+    columns = {
+        'No': no_column,
+        'Division': division_column,
+        'Tender Notice Number': tender_notice_number_column,
+        'Announcement Name': announcement_name_column,
+        'Announcement Agency': announcement_agency_column,
+        'Publishing Date': publishing_date_column,
+        'Bid Closing Date': bid_closing_date_column,
+        'Country Name': country_name_column,
+        'Website Link': website_link_column
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def write_batch(records, seen_index, sink, batch_num=None):
+    if not records:
+        return
+    sink.write(records)
+    if batch_num is not None:
+        print(f"Saved batch {batch_num} of {len(records)} rows")
+    else:
+        print(f"Saved initial {len(records)} rows")
+    seen_index.mark_done('south_korea', [record['Tender Notice Number'] for record in records])
+
+# Function to process and save data in batches
+def process_and_save_data(data, start_idx, end_idx, seen_index, sink, incremental=True, batch_num=None):
+    if not data or start_idx >= len(data) or start_idx >= end_idx:
+        return
+    write_batch(translate_batch(data[start_idx:end_idx], seen_index, incremental), seen_index, sink, batch_num)
+
+def save_batches(batches, seen_index, sink, incremental=True, stage_workers=None):
+    """Translate and write (rows, batch number) batches while the next ones are still being read
+
+    batches is iterated in this thread (it may drive the browser); translation and
+    writing run as pipeline stages behind it. stage_workers ({'translate': n})
+    widens the translation stage. Returns the pipeline's stage stats.
+    """
+    stage_workers = stage_workers or {}
+    
+    def translate(batch):
+        rows, batch_num = batch
+        return translate_batch(rows, seen_index, incremental), batch_num
+    
+    def write(batch):
+        records, batch_num = batch
+        write_batch(records, seen_index, sink, batch_num)
+        return batch
+    
+    pipeline = Pipeline([
+        Stage('translate', translate, stage_workers.get('translate', 1)),
+        Stage('write', write),
+    ])
+    pipeline.run(batch for batch in batches if batch[0])
+    pipeline.report()
+    return pipeline.to_dict()
+
+def read_total_count(driver):
+    """Read the number of search results shown with the grid, or None if it is not shown"""
+    try:
+        text = driver.execute_script(
+            "var element = document.getElementById(arguments[0]); return element ? element.innerText : '';",
+            RESULT_CONTAINER_ID
+        )
+        match = TOTAL_COUNT_REGEX.search(text or "")
+        if match:
+            return int(match.group(1).replace(',', ''))
+    except Exception as e:
+        print(f"Could not read the result count: {e}")
+    return None
+
+# Recorded grid data request, replayed by later runs without opening the browser
+G2B_ENDPOINT_PATH = os.path.join("tenders", "g2b_endpoint.json")
+# The request carries the search dates of the day it was recorded and the session's cookies,
+# so it is recorded again on another day or after this long
+ENDPOINT_MAX_AGE = timedelta(hours=6)
+GRID_TABLE_SELECTOR = "table[id*='gridView1_body_table']"
+# Grid columns filled from the endpoint's records: Division, Announcement Name, Announcement Agency
+ENDPOINT_TEXT_COLUMNS = [1, 6, 7]
+
+class G2bEndpoint:
+    """Replays the WebSquare request that feeds the bid announcement grid
+
+    Its records are matched to the grid by the Tender Notice Number (column 5); the
+    other columns are matched by value, and the "publishing (closing)" column by its
+    two dates. Replayed records are shaped like grid rows, so they go through the
+    same process_and_save_data as rows read from the browser.
+    """
+    
+    def __init__(self, request, number_field, column_fields, publishing_field, closing_field, recorded_at=None):
+        self.request = request
+        self.number_field = number_field
+        self.column_fields = column_fields
+        self.publishing_field = publishing_field
+        self.closing_field = closing_field
+        self.recorded_at = recorded_at
+    
+    def stale_reason(self, now=None):
+        """Why the saved request should be recorded again instead of replayed, or None"""
+        now = now or datetime.now()
+        if self.recorded_at is None:
+            return "it was saved without its recording time"
+        if self.recorded_at.date() != now.date():
+            return f"it was recorded on {self.recorded_at:%Y-%m-%d}, with that day's search dates"
+        if now - self.recorded_at > ENDPOINT_MAX_AGE:
+            return f"it is older than {ENDPOINT_MAX_AGE}"
+        return None
+    
+    @classmethod
+    def learn(cls, driver):
+        """Find the grid's data request among the recorded requests, or return None"""
+        rows = [row for row in extract_cells(driver, "tr", "td", GRID_TABLE_SELECTOR) if len(row) > 9]
+        if not rows:
+            return None
+        entry = find_request_with(recorded_requests(driver), rows[0][5])
+        if entry is None:
+            print("No recorded request carries the grid's rows")
+            return None
+        
+        _, records = find_records(entry['payload'])
+        records, index = index_records(records)
+        number_field = key_field(records, index, [row[5] for row in rows])
+        if number_field is None:
+            print("Could not find the Tender Notice Number among the endpoint fields")
+            return None
+        pairs = [(row, index[(number_field, row[5].strip())]) for row in rows]
+        
+        column_fields = {}
+        for column in ENDPOINT_TEXT_COLUMNS:
+            column_fields[column] = match_field([(row[column], record) for row, record in pairs])
+        dates = [(split_date_range(row[9]), record) for row, record in pairs]
+        publishing_field = match_field([(publishing, record) for (publishing, _), record in dates])
+        closing_field = match_field([(closing, record) for (_, closing), record in dates])
+        if None in column_fields.values() or publishing_field is None:
+            print("Could not match every grid column to an endpoint field")
+            return None
+        
+        try:
+            request = ReplayableRequest(entry, recorded_page=1)
+        except ValueError as e:
+            print(f"Grid request is not page-addressable: {e}")
+            return None
+        request.copy_cookies(driver)
+        print(f"Recorded grid request {request.method} {request.url}")
+        return cls(request, number_field, column_fields, publishing_field, closing_field, datetime.now())
+    
+    def save(self, path=G2B_ENDPOINT_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'request': self.request.to_dict(),
+                'number_field': self.number_field,
+                'column_fields': self.column_fields,
+                'publishing_field': self.publishing_field,
+                'closing_field': self.closing_field,
+                'recorded_at': self.recorded_at.isoformat(timespec='seconds') if self.recorded_at else None
+            }, f, ensure_ascii=False, indent=2)
+        print(f"Saved the grid request to {path}")
+    
+    @classmethod
+    def load(cls, path=G2B_ENDPOINT_PATH, base_url=None):
+        """Load a saved endpoint; base_url sends it to another host, such as a fixture server
+
+        Endpoints saved before the recording time was kept are always stale.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        recorded_at = data.get('recorded_at')
+        return cls(
+            ReplayableRequest.from_dict(data['request'], base_url=base_url),
+            data['number_field'],
+            {int(column): field for column, field in data['column_fields'].items()},
+            data['publishing_field'],
+            data['closing_field'],
+            datetime.fromisoformat(recorded_at) if recorded_at else None
+        )
+    
+    def fetch_rows(self, page_number, fixture_dir=None):
+        """Fetch one page of records shaped like grid rows; returns (rows, page was full)"""
+        records, payload = self.request.fetch(page_number)
+        if fixture_dir:
+            os.makedirs(fixture_dir, exist_ok=True)
+            with open(os.path.join(fixture_dir, f"page_{page_number}.json"), 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+        first_no = (page_number - 1) * (self.request.page_size or len(records))
+        rows = []
+        for number, record in enumerate(map(flatten_record, records), first_no + 1):
+            row = [''] * 10
+            row[0] = str(number)
+            row[5] = api_text(record.get(self.number_field))
+            for column, field in self.column_fields.items():
+                row[column] = api_text(record.get(field))
+            publishing = api_text(record.get(self.publishing_field))
+            closing = api_text(record.get(self.closing_field)) if self.closing_field else ''
+            # Same "publishing (closing)" layout as the grid, split again by split_date_range
+            row[9] = f"{publishing} ({closing})" if closing else publishing
+            rows.append(row)
+        if not self.request.page_size:
+            # Endpoints saved before the size was known: keep reading until a page comes back empty
+            return rows, bool(records)
+        return rows, len(records) >= self.request.page_size
+
+def replay_endpoint(endpoint, seen_index, sink, incremental=True, max_pages=1000, fixture_dir=None,
+                    stage_workers=None):
+    """Fetch every page from the grid endpoint and save it; returns the number of rows read
+
+    The next page is fetched while the previous ones are translated and written.
+    """
+    seen_ids = set()
+    total = 0
+    
+    def read_pages():
+        nonlocal total
+        for page_number in range(1, max_pages + 1):
+            rows, full_page = endpoint.fetch_rows(page_number, fixture_dir)
+            rows = [row for row in rows if get_row_id(row) not in seen_ids]
+            if not rows:
+                # Empty, or the server ignored the page parameter and repeated a page
+                break
+            seen_ids.update(get_row_id(row) for row in rows)
+            total += len(rows)
+            print(f"Endpoint page {page_number}: {len(rows)} rows, {total} in total")
+            yield rows, page_number
+            if not full_page:
+                break
+    
+    save_batches(read_pages(), seen_index, sink, incremental, stage_workers)
+    return total
+
+def main(incremental=True, export_excel=True, headless=False, use_endpoint=True, endpoint_url=None,
+         fixture_dir=None, run_id=None, output_format='jsonl', stage_workers=None, relearn=False):
+    """Scrape the open bid announcements of g2b.go.kr and return the run summary
+
+    stage_workers ({'translate': n}) sets the translation threads behind the grid reader.
+    The saved grid request is replayed only on the day it was recorded and for at most
+    ENDPOINT_MAX_AGE; otherwise, or with relearn, the browser records it again. A run
+    pointed at endpoint_url (e.g. a fixture server) replays it whatever its age.
+    """
+    summary = {'country': 'south_korea'}
+    reset_metrics()
+    timer = StageTimer()
     driver = None
+    seen_index = SeenIndex()
+    sink = open_sink('south_korea', run_id=run_id, output_format=output_format)
     try:
         logging.info("Starting script execution")
-        print("Setting up Chrome driver...")
-        chrome_options = Options()
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-popup-blocking')
-        chrome_options.add_argument('--ignore-certificate-errors')
-        # Add user agent to appear more like a real browser
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+        # A recorded grid request is replayed without opening the browser
+        if use_endpoint and not relearn and os.path.exists(G2B_ENDPOINT_PATH):
+            timer.start('replay')
+            try:
+                endpoint = G2bEndpoint.load(G2B_ENDPOINT_PATH, endpoint_url)
+                stale = None if endpoint_url else endpoint.stale_reason()
+                if stale:
+                    print(f"Not replaying the saved grid request: {stale}; recording it again")
+                elif replay_endpoint(endpoint, seen_index, sink, incremental, fixture_dir=fixture_dir,
+                                     stage_workers=stage_workers):
+                    return summary
+                else:
+                    print("Saved grid request returned no rows, recording it again")
+            except Exception as e:
+                print(f"Replaying the saved grid request failed ({e}), recording it again")
         
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
+        timer.start('search')
+        print("Setting up Chrome driver...")
+        # The WebSquare grid needs its stylesheets to scroll, so only images and fonts are blocked.
+        # Same user agent as http_client, to appear more like a real browser
+        driver = create_driver(
+            headless=headless,
+            block=('image', 'font'),
+            arguments=['--disable-extensions', '--ignore-certificate-errors'],
+            user_agent=USER_AGENT
         )
-        print("Opening https://www.g2b.go.kr/ ...")
-        driver.get("https://www.g2b.go.kr/")
-        time.sleep(5)
+        if use_endpoint:
+            install_recorder(driver)
+        print(f"Opening {G2B_URL} ...")
+        with timed('navigation'), throttled(G2B_URL):
+            driver.get(G2B_URL)
+            wait_for_page_load(driver)
         print("Page loaded. Waiting for 'bid' menu item...")
         wait = WebDriverWait(driver, 40)
         
@@ -130,7 +439,7 @@ def main():
                         if button.is_displayed():
                             button.click()
                             print("Clicked modal close button")
-                            time.sleep(1)
+                            wait_until(driver, EC.invisibility_of_element(button), 'element', timeout=2)
             except Exception as e:
                 print(f"Error handling modal popups: {e}")
             
@@ -183,205 +492,138 @@ def main():
             select.select_by_visible_text("100")
             print("Selected '100' tenders per page.")
             
+            # Rows of the WebSquare result grid
+            row_selector = "table[id*='gridView1_body_table'] tr"
+            
             apply_btn_id = "mf_wfm_container_tacBidPbancLst_contents_tab2_body_btnAplcn1"
             print("Waiting for 'apply' button...")
             apply_btn = wait.until(
                 EC.presence_of_element_located((By.ID, apply_btn_id))
             )
             print("Clicking 'apply' button...")
+            previous_row_count = count_rows(driver, row_selector)
+            previous_first_row = first_row_text(driver, row_selector)
             
-            # Try JavaScript click for apply button
-            try:
-                driver.execute_script("arguments[0].click();", apply_btn)
-                print("Clicked 'apply' button using JavaScript.")
-            except Exception as e:
-                print(f"JavaScript click failed: {e}, trying direct click")
-                apply_btn.click()
-                print("Clicked 'apply' button.")
-                
-            print("Waiting for table to load...")
-            time.sleep(5)
+            # The click reloads the grid from the portal
+            with throttled(G2B_URL):
+                # Try JavaScript click for apply button
+                try:
+                    driver.execute_script("arguments[0].click();", apply_btn)
+                    print("Clicked 'apply' button using JavaScript.")
+                except Exception as e:
+                    print(f"JavaScript click failed: {e}, trying direct click")
+                    apply_btn.click()
+                    print("Clicked 'apply' button.")
+                    
+                print("Waiting for table to load...")
+                wait_for_table_change(driver, row_selector, previous_row_count, previous_first_row)
             
-            # Find the scrollable element
+            # Wait for the scrollable element; GridHarvester scrolls it by id
             scroll_element_id = "mf_wfm_container_tacBidPbancLst_contents_tab2_body_gridView1_scrollY_div"
-            scroll_element = wait.until(
-                EC.presence_of_element_located((By.ID, scroll_element_id))
-            )
+            wait.until(EC.presence_of_element_located((By.ID, scroll_element_id)))
             print("Found scrollable element")
             
-            # Find the table
+            # Wait for the table; its rows are read by script, not through the element
             table_xpath = "//table[contains(@id, 'gridView1_body_table')]"
-            table = wait.until(
-                EC.presence_of_element_located((By.XPATH, table_xpath))
-            )
+            wait.until(EC.presence_of_element_located((By.XPATH, table_xpath)))
+            
+            # Record the request behind the grid once and page through it directly
+            if use_endpoint:
+                timer.start('replay')
+                try:
+                    endpoint = G2bEndpoint.learn(driver)
+                    if endpoint is not None:
+                        if replay_endpoint(endpoint, seen_index, sink, incremental, fixture_dir=fixture_dir,
+                                           stage_workers=stage_workers):
+                            endpoint.save()
+                            return summary
+                        print("Grid request returned no rows, reading the grid instead")
+                except Exception as e:
+                    print(f"Could not replay the grid request: {e}")
             
-            # Extract data function
-            def extract_table_data():
-                rows = table.find_elements(By.TAG_NAME, "tr")
-                data = []
-                for row in rows:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    data.append([col.text for col in cols])
-                # Remove empty rows
-                data = [row for row in data if any(cell.strip() for cell in row)]
-                return data
-
-            # Helper to get unique row id (Tender Notice Number or fallback)
-            def get_row_id(row):
-                return row[5] if len(row) > 5 else str(row)
-
-            # Function to process and save data in batches
-            def process_and_save_data(data, start_idx, end_idx, batch_num=None):
-                if not data or start_idx >= len(data) or start_idx >= end_idx:
-                    return
-                rows_to_process = data[start_idx:end_idx]
-                valid_rows = [row for row in rows_to_process if len(row) > 9]
-                if not valid_rows:
-                    return
-                no_column = [row[0] for row in valid_rows]
-                division_column = [row[1] for row in valid_rows]
-                tender_notice_number_column = [row[5] for row in valid_rows]
-                announcement_name_column = [row[6] for row in valid_rows]
-                announcement_agency_column = [row[7] for row in valid_rows]
-                # Split publishing date and bid closing date
-                publishing_date_column = []
-                bid_closing_date_column = []
-                for row in valid_rows:
-                    date_text = row[9]
-                    if '(' in date_text and ')' in date_text:
-                        try:
-                            publishing_date = date_text.split('(')[0].strip()
-                            bid_closing_date = date_text.split('(')[1].replace(')', '').strip()
-                            publishing_date_column.append(publishing_date)
-                            bid_closing_date_column.append(bid_closing_date)
-                        except:
-                            publishing_date_column.append(date_text)
-                            bid_closing_date_column.append("")
-                    else:
-                        publishing_date_column.append(date_text)
-                        bid_closing_date_column.append("")
-                country_name_column = ['South Korea'] * len(no_column)
-                website_link_column = ['https://www.g2b.go.kr/'] * len(no_column)
-                # Translate relevant columns to English
-                translator = GoogleTranslator(source='auto', target='en')
-                def safe_translate(x):
-                    try:
-                        if x and x != 'nan':
-                            return translator.translate(x)
-                        return x
-                    except Exception as e:
-                        print(f"Error translating '{x}': {e}")
-                        return x
-                batch_size = 50
-                for i in range(0, len(division_column), batch_size):
-                    end = min(i + batch_size, len(division_column))
-                    division_column[i:end] = [safe_translate(x) for x in division_column[i:end]]
-                for i in range(0, len(announcement_name_column), batch_size):
-                    end = min(i + batch_size, len(announcement_name_column))
-                    announcement_name_column[i:end] = [safe_translate(x) for x in announcement_name_column[i:end]]
-                for i in range(0, len(announcement_agency_column), batch_size):
-                    end = min(i + batch_size, len(announcement_agency_column))
-                    announcement_agency_column[i:end] = [safe_translate(x) for x in announcement_agency_column[i:end]]
-                df = pd.DataFrame({
-                    'No': no_column,
-                    'Division': division_column,
-                    'Tender Notice Number': tender_notice_number_column,
-                    'Announcement Name': announcement_name_column,
-                    'Announcement Agency': announcement_agency_column,
-                    'Publishing Date': publishing_date_column,
-                    'Bid Closing Date': bid_closing_date_column,
-                    'Country Name': country_name_column,
-                    'Website Link': website_link_column
-                })
-                os.makedirs('tenders/south.korea', exist_ok=True)
-                if batch_num is not None:
-                    filename = f"tenders/south.korea/batch_{batch_num}.xlsx"
-                    df.to_excel(filename, index=False)
-                    print(f"Saved {len(df)} rows to {filename}")
-                else:
-                    filename = "tenders/south.korea/initial_100.xlsx"
-                    df.to_excel(filename, index=False)
-                    print(f"Saved initial {len(df)} rows to {filename}")
-
             # --- Main extraction logic ---
-            all_data = []
-            processed_ids = set()
-            batch_count = 0
-            print("Extracting initial data...")
-            data = extract_table_data()
-            for row in data:
-                row_id = get_row_id(row)
-                if row_id not in processed_ids:
-                    all_data.append(row)
-                    processed_ids.add(row_id)
-            print(f"Initially found {len(all_data)} unique rows")
-            # Save first 100 tenders (or all if less than 100)
-            process_and_save_data(all_data, 0, min(100, len(all_data)), batch_num=None)
-            previous_data_count = min(100, len(all_data))
-            # Scroll and extract more data
-            max_attempts = 100
-            no_new_data_count = 0
-            max_no_new_data = 5
-            for attempt in range(max_attempts):
-                print(f"Scroll attempt {attempt+1}, current rows: {len(all_data)}")
-                current_scroll = driver.execute_script("return arguments[0].scrollTop", scroll_element)
-                scroll_amount = 300
-                driver.execute_script(f"arguments[0].scrollTop = {current_scroll + scroll_amount}", scroll_element)
-                print(f"Scrolled from {current_scroll} to {current_scroll + scroll_amount}")
-                time.sleep(10)
-                data = extract_table_data()
-                new_data = []
-                for row in data:
-                    row_id = get_row_id(row)
-                    if row_id not in processed_ids:
-                        new_data.append(row)
-                        processed_ids.add(row_id)
-                if new_data:
-                    print(f"Found {len(new_data)} new unique rows")
+            timer.start('harvest')
+            # The grid is virtualized: scroll a viewport at a time and read only rows
+            # whose Tender Notice Number was not read yet
+            harvester = GridHarvester(
+                driver, scroll_element_id, row_selector, key_column=5,
+                total_rows=read_total_count(driver), namespace='g2b_bid_list'
+            )
+            def read_batches():
+                all_data = []
+                batch_count = 0
+                previous_data_count = 0
+                print("Extracting initial data...")
+                for step, new_data in enumerate(harvester.harvest()):
                     all_data.extend(new_data)
-                    no_new_data_count = 0
+                    if step == 0:
+                        print(f"Initially found {len(all_data)} unique rows")
+                        # Save first 100 tenders (or all if less than 100)
+                        previous_data_count = min(100, len(all_data))
+                        yield all_data[:previous_data_count], None
+                        continue
+                    print(f"Found {len(new_data)} new unique rows, {len(all_data)} in total")
                     # Save new data in batches of 10
                     while previous_data_count + 10 <= len(all_data):
                         batch_count += 1
-                        process_and_save_data(all_data, previous_data_count, previous_data_count + 10, batch_num=batch_count)
+                        yield all_data[previous_data_count:previous_data_count + 10], batch_count
                         previous_data_count += 10
-                else:
-                    no_new_data_count += 1
-                    print(f"No new unique data found ({no_new_data_count}/{max_no_new_data})")
-                    if no_new_data_count >= max_no_new_data:
-                        print("Reached end of data, stopping scrolling")
-                        break
-            # Save any remaining data that didn't make a full batch
-            if previous_data_count < len(all_data):
-                batch_count += 1
-                process_and_save_data(all_data, previous_data_count, len(all_data), batch_num=batch_count)
+                # Save any remaining data that didn't make a full batch
+                if previous_data_count < len(all_data):
+                    batch_count += 1
+                    yield all_data[previous_data_count:], batch_count
+            
+            # The grid keeps scrolling while earlier batches are translated and written
+            summary['pipeline'] = save_batches(read_batches(), seen_index, sink, incremental, stage_workers)
             
         except Exception as e:
             print(f"Could not complete menu navigation, checkbox selection, or search: {e}")
             logging.error(f"Could not complete menu navigation, checkbox selection, or search: {e}")
             logging.error(traceback.format_exc())
+            summary['error'] = str(e)
             # Save screenshot for debugging
             if driver:
                 screenshot_file = "error_screenshot.png"
                 driver.save_screenshot(screenshot_file)
                 print(f"Saved error screenshot to {screenshot_file}")
                 logging.info(f"Saved error screenshot to {screenshot_file}")
-        print("Press Enter to close the browser...")
-        input()
     except Exception as e:
         print(f"An error occurred: {e}")
         logging.error(f"An error occurred: {e}")
         logging.error(traceback.format_exc())
+        summary['error'] = str(e)
         if driver:
             screenshot_file = "fatal_error_screenshot.png"
             driver.save_screenshot(screenshot_file)
             print(f"Saved fatal error screenshot to {screenshot_file}")
             logging.info(f"Saved fatal error screenshot to {screenshot_file}")
     finally:
+        timer.start('export')
         if driver:
             driver.quit()
         print("Browser closed.")
+        save_translation_cache()
+        report_waits()
+        seen_index.close()
+        sink.close()
+        xlsx_path = sink.export_excel() if export_excel else None
+        finish_summary(summary, sink, timer, xlsx_path)
         logging.info("Browser closed. Script execution complete.")
+    return summary
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape open bid announcements from g2b.go.kr")
+    parser.add_argument('--headless', action='store_true', help="Run the browser without a window")
+    parser.add_argument('--record', action='store_true', help="Read the grid in the browser instead of replaying the saved request")
+    parser.add_argument('--relearn', action='store_true', help="Record the grid request again instead of replaying the saved one")
+    parser.add_argument('--full', action='store_true', help="Re-scrape tenders seen in earlier runs")
+    parser.add_argument('--no-excel', action='store_true', help="Skip the Excel export")
+    parser.add_argument('--stage-workers', action='append', metavar='STAGE=N',
+                        help="Threads of a pipeline stage, translate (default 1)")
+    args = parser.parse_args()
+    try:
+        stage_workers = parse_stage_workers(args.stage_workers)
+    except ValueError as e:
+        parser.error(str(e))
+    main(incremental=not args.full, export_excel=not args.no_excel, headless=args.headless, use_endpoint=not args.record,
+         stage_workers=stage_workers, relearn=args.relearn)
@@ -0,0 +1,128 @@
+from datetime import date, datetime
+
+from metrics import get_metrics
+from tender_schema import parse_date
+
+
+def as_day(value):
+    """A date, datetime or date text as a date, or None if it cannot be parsed"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    parsed = parse_date(str(value))
+    return parsed.date() if parsed else None
+
+
+def bound_day(value, name):
+    """A window bound as a date; a bound that cannot be parsed is an error, not a missing bound"""
+    day = as_day(value)
+    if day is None and value not in (None, ''):
+        raise ValueError(f"Cannot read {name} {value!r} as a date")
+    return day
+
+
+class FilterSpec:
+    """Which tenders a run keeps: deadline and publication windows, notice types, entity and keyword
+
+    Windows are inclusive and compared by day. entity and keyword match case-insensitively
+    anywhere in the text. A scraper checks each condition at the earliest stage that has
+    the value - the portal's URL parameters, the list row, then the detail page - and a
+    value not known yet (None) passes, so later stages decide.
+    """
+
+    def __init__(self, deadline_after=None, deadline_before=None, published_since=None, published_until=None,
+                 notice_types=None, entity=None, keyword=None):
+        self.deadline_after = bound_day(deadline_after, 'deadline_after')
+        self.deadline_before = bound_day(deadline_before, 'deadline_before')
+        self.published_since = bound_day(published_since, 'published_since')
+        self.published_until = bound_day(published_until, 'published_until')
+        self.notice_types = {text.strip().lower() for text in notice_types or []} or None
+        self.entity = entity.strip().lower() if entity else None
+        self.keyword = keyword.strip().lower() if keyword else None
+
+    def __bool__(self):
+        return any(value is not None for value in self.to_dict().values())
+
+    def window(self, field):
+        """(first, last) day of the 'deadline' or 'published' window"""
+        if field == 'deadline':
+            return self.deadline_after, self.deadline_before
+        return self.published_since, self.published_until
+
+    def in_window(self, field, value):
+        day = as_day(value)
+        if day is None:
+            return True
+        first, last = self.window(field)
+        return (first is None or day >= first) and (last is None or day <= last)
+
+    def matches(self, published=None, deadline=None, notice_type=None, entity=None, text=None):
+        """Whether a tender can pass, judging only the values given; text is a string or a list of them"""
+        if not (self.in_window('published', published) and self.in_window('deadline', deadline)):
+            return False
+        if self.notice_types and notice_type is not None and notice_type.strip().lower() not in self.notice_types:
+            return False
+        if self.entity and entity is not None and self.entity not in entity.lower():
+            return False
+        if self.keyword and text is not None:
+            texts = [text] if isinstance(text, str) else text
+            if not any(self.keyword in (piece or '').lower() for piece in texts):
+                return False
+        return True
+
+    def apply(self, rows, values, stage):
+        """Keep the rows for which matches(**values(row)) holds, counting the others as filtered_<stage>"""
+        kept = [row for row in rows if self.matches(**values(row))]
+        if len(kept) < len(rows):
+            get_metrics().count(f"filtered_{stage}", len(rows) - len(kept))
+            print(f"Filter dropped {len(rows) - len(kept)} of {len(rows)} tenders at the {stage} stage")
+        return kept
+
+    def past_window(self, values, field='published', newest_first=True):
+        """Whether a page of a list sorted on field lies wholly beyond the window, so every later page does too
+
+        Only a page whose own dates all parse and follow the given order is judged, so a
+        list sorted differently than assumed never ends a run early.
+        """
+        days = [as_day(value) for value in values]
+        if not days or None in days:
+            return False
+        first, last = self.window(field)
+        if newest_first:
+            ordered = all(earlier >= later for earlier, later in zip(days, days[1:]))
+            return ordered and first is not None and days[0] < first
+        ordered = all(earlier <= later for earlier, later in zip(days, days[1:]))
+        return ordered and last is not None and days[0] > last
+
+    def to_dict(self):
+        return {
+            'deadline_after': self.deadline_after, 'deadline_before': self.deadline_before,
+            'published_since': self.published_since, 'published_until': self.published_until,
+            'notice_types': sorted(self.notice_types) if self.notice_types else None,
+            'entity': self.entity, 'keyword': self.keyword
+        }
+
+    def __repr__(self):
+        return f"FilterSpec({', '.join(f'{name}={value}' for name, value in self.to_dict().items() if value)})"
+
+
+def add_filter_arguments(parser):
+    """Add the filter options to a scraper's argument parser"""
+    parser.add_argument('--deadline-after', help="Keep tenders with a deadline on or after this day, YYYY-MM-DD")
+    parser.add_argument('--deadline-before', help="Keep tenders with a deadline on or before this day")
+    parser.add_argument('--published-since', help="Keep tenders published on or after this day")
+    parser.add_argument('--published-until', help="Keep tenders published on or before this day")
+    parser.add_argument('--type', action='append', dest='notice_types', metavar='TYPE',
+                        help="Keep this notice or procurement type (repeatable)")
+    parser.add_argument('--entity', help="Keep tenders whose contracting entity contains this text")
+    parser.add_argument('--keyword', help="Keep tenders whose title or subject contains this text")
+
+
+def filter_from_args(args):
+    """The FilterSpec of parsed filter options, or None if none was given"""
+    spec = FilterSpec(args.deadline_after, args.deadline_before, args.published_since, args.published_until,
+                      args.notice_types, args.entity, args.keyword)
+    return spec if spec else None
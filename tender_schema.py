@@ -0,0 +1,246 @@
+import json
+from datetime import datetime
+from enum import Enum
+
+from date_utils import parse_datetime
+from output_sink import read_records
+
+
+class Country(Enum):
+    ITALY = 'Italy'
+    JAPAN = 'Japan'
+    MACEDONIA = 'Macedonia'
+    SOUTH_KOREA = 'South Korea'
+
+
+# Layouts written by date_utils.standardize_datetime (Japan's dates and time limits)
+STANDARD_FORMATS = ['%d-%m-%Y %H-%M-%S', '%d-%m-%Y']
+
+
+def parse_date(text):
+    """Parse a scraped date into a datetime, or None if it cannot be parsed"""
+    if not text or not isinstance(text, str):
+        return None
+    text = text.strip()
+    for layout in STANDARD_FORMATS:
+        try:
+            return datetime.strptime(text, layout)
+        except ValueError:
+            pass
+    return parse_datetime(text)[0]
+
+
+def text_or_none(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value not in ('N/A', 'nan') else None
+
+
+class Tender:
+    """One tender from any source, in the shared schema
+
+    country is a Country; published_at and deadline_at are datetimes (or None) parsed
+    from published_text and deadline_text, which keep what the site showed. Every
+    other field is a string or None, except extra: a dict of source-specific fields
+    such as Japan's time limits and document links, or None.
+    """
+    __slots__ = ('country', 'tender_id', 'title', 'buyer', 'category', 'value',
+                 'published_text', 'deadline_text', 'published_at', 'deadline_at',
+                 'detail_url', 'source_url', 'extra')
+
+    def __init__(self, country, tender_id, title=None, buyer=None, category=None, value=None,
+                 published_text=None, deadline_text=None, detail_url=None, source_url=None, extra=None,
+                 published_at=None, deadline_at=None):
+        self.country = Country(country)
+        self.tender_id = str(tender_id)
+        self.title = text_or_none(title)
+        self.buyer = text_or_none(buyer)
+        self.category = text_or_none(category)
+        self.value = text_or_none(value)
+        self.published_text = text_or_none(published_text)
+        self.deadline_text = text_or_none(deadline_text)
+        self.published_at = published_at or parse_date(self.published_text)
+        self.deadline_at = deadline_at or parse_date(self.deadline_text)
+        self.detail_url = text_or_none(detail_url)
+        self.source_url = text_or_none(source_url)
+        # Most tenders have no extra fields; None avoids an empty dict per tender
+        self.extra = extra or None
+
+    def to_dict(self):
+        record = {name: getattr(self, name) for name in self.__slots__}
+        record['country'] = self.country.value
+        return record
+
+    def __repr__(self):
+        return f"Tender({self.country.value}, {self.tender_id!r}, {self.title!r})"
+
+
+def from_italy(record):
+    return Tender(
+        Country.ITALY, record['N.RDO'],
+        title=record.get('DESCRIPTION'),
+        buyer=record.get('CONTRACTING ENTITY'),
+        category=record.get('PRODUCT AREA'),
+        value=None if record.get('VALUE') == "Not specified" else record.get('VALUE'),
+        published_text=record.get('PUBLISHED ON'),
+        deadline_text=record.get('EXPIRES ON'),
+        detail_url=record.get('Document page Link'),
+        source_url=record.get('Website Link')
+    )
+
+
+def japan_deadline(time_limit):
+    """The first tender time limit ("Label: date | ..."), skipping comment deadlines"""
+    for part in (time_limit or "").split(" | "):
+        label, _, value = part.partition(": ")
+        if value and not label.startswith('Comment'):
+            return value
+    return None
+
+
+def from_japan(record):
+    time_limit = record.get('Time Limit')
+    extra = {'Time Limit': time_limit}
+    if record.get('Document Links'):
+        extra['Document Links'] = record['Document Links']
+    # JETRO notices have no number in the list, so the detail page identifies them
+    return Tender(
+        Country.JAPAN, record.get('Detail URL') or record.get('Title'),
+        title=record.get('Title'),
+        buyer=record.get('Procurement Entity'),
+        category=record.get('Type of Notice'),
+        published_text=record.get('Publishing Date'),
+        deadline_text=japan_deadline(time_limit),
+        detail_url=record.get('Detail URL'),
+        source_url=record.get('Website Link'),
+        extra=extra
+    )
+
+
+def from_macedonia(record):
+    return Tender(
+        Country.MACEDONIA, record['Number'],
+        title=record.get('Subject of Procurement'),
+        buyer=record.get('Contracting Authority'),
+        category=record.get('Type of Procurement'),
+        published_text=record.get('Publication Date'),
+        deadline_text=record.get('Deadline'),
+        detail_url=record.get('Detail URL'),
+        source_url=record.get('Website Link')
+    )
+
+
+def from_south_korea(record):
+    return Tender(
+        Country.SOUTH_KOREA, record['Tender Notice Number'],
+        title=record.get('Announcement Name'),
+        buyer=record.get('Announcement Agency'),
+        category=record.get('Division'),
+        published_text=record.get('Publishing Date'),
+        deadline_text=record.get('Bid Closing Date'),
+        source_url=record.get('Website Link')
+    )
+
+
+ADAPTERS = {
+    Country.ITALY: from_italy,
+    Country.JAPAN: from_japan,
+    Country.MACEDONIA: from_macedonia,
+    Country.SOUTH_KOREA: from_south_korea,
+}
+
+# Sink names used by the scrapers -> country
+SOURCE_COUNTRIES = {
+    'italy': Country.ITALY,
+    'japan': Country.JAPAN,
+    'macedonia': Country.MACEDONIA,
+    'south_korea': Country.SOUTH_KOREA,
+}
+
+
+def to_tender(country, record):
+    """Convert a scraper's record to a Tender with the country's adapter"""
+    return ADAPTERS[Country(country)](record)
+
+
+class TenderBatch:
+    """Tenders stored column by column: one list per Tender field
+
+    Converting to Arrow or pandas hands the lists over as they are, and merging
+    batches from several countries is a concatenation of the lists.
+    """
+    columns = Tender.__slots__
+
+    def __init__(self, data=None):
+        self.data = data or {column: [] for column in self.columns}
+
+    def __len__(self):
+        return len(self.data['tender_id'])
+
+    def append(self, tender):
+        for column in self.columns:
+            self.data[column].append(getattr(tender, column))
+
+    def extend(self, tenders):
+        for tender in tenders:
+            self.append(tender)
+        return self
+
+    @classmethod
+    def from_records(cls, country, records):
+        """Adapt a scraper's records, skipping (and reporting) those the adapter rejects"""
+        batch = cls()
+        adapter = ADAPTERS[Country(country)]
+        for record in records:
+            try:
+                batch.append(adapter(record))
+            except (KeyError, ValueError) as e:
+                print(f"Skipping {Country(country).value} record that does not fit the schema: {e}")
+        return batch
+
+    @classmethod
+    def concat(cls, batches):
+        data = {column: [] for column in cls.columns}
+        for batch in batches:
+            for column in cls.columns:
+                data[column].extend(batch.data[column])
+        return cls(data)
+
+    def __iter__(self):
+        """Rebuild Tender objects row by row"""
+        for values in zip(*(self.data[column] for column in self.columns)):
+            tender = Tender.__new__(Tender)
+            for column, value in zip(self.columns, values):
+                setattr(tender, column, value)
+            yield tender
+
+    def _export_columns(self):
+        """Columns ready for Arrow/pandas: countries as their names, extra as JSON text"""
+        data = dict(self.data)
+        data['country'] = [country.value for country in self.data['country']]
+        data['extra'] = [json.dumps(extra, ensure_ascii=False) if extra else None for extra in self.data['extra']]
+        return data
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        return pa.table(self._export_columns())
+
+    def to_pandas(self):
+        import pandas as pd
+
+        return pd.DataFrame(self._export_columns(), columns=list(self.columns))
+
+    def to_records(self):
+        return [tender.to_dict() for tender in self]
+
+
+def read_run(path, source):
+    """Load a scraper's run file (see output_sink) into a TenderBatch"""
+    return TenderBatch.from_records(SOURCE_COUNTRIES.get(source, source), read_records(path))
+
+
+def merge_runs(run_files):
+    """Merge run files of several sources ({source: path}) into one TenderBatch"""
+    return TenderBatch.concat(read_run(path, source) for source, path in run_files.items())
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from host_limiter import locked_file
+
+DEFAULT_CACHE_PATH = os.path.join("tenders", "translation_cache.json")
+DEFAULT_MAX_ENTRIES = 50000
+
+
+def normalize_text(text):
+    """Collapse whitespace so equivalent strings share one cache entry"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TranslationCache:
+    """Disk-backed LRU cache of translations keyed on (source, target, normalized text)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load cached translations from disk, oldest first"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            for source, target, text, translation in stored.get('entries', []):
+                self._entries[(source, target, text)] = translation
+            self._evict()
+            print(f"Loaded {len(self._entries)} cached translations from {self.path}")
+        except Exception as e:
+            print(f"Could not load translation cache {self.path}: {str(e)}")
+            self._entries.clear()
+
+    def get(self, text, source, target):
+        """Return the cached translation or None, counting the hit or miss"""
+        key = (source, target, normalize_text(text))
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def set(self, text, source, target, translation):
+        """Store a translation, evicting the least recently used entries over the cap"""
+        key = (source, target, normalize_text(text))
+        with self._lock:
+            self._entries[key] = translation
+            self._entries.move_to_end(key)
+            self._evict()
+            self._dirty = True
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    def _read_disk_entries(self):
+        """Entries currently on disk, which another scraper process may have saved since load()"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', [])
+        except Exception:
+            return []
+
+    def save(self):
+        """Write the cache to disk atomically if it changed, keeping entries saved by other processes
+
+        Scrapers run by run_all save the same file from separate processes, so the
+        read-merge-replace holds a lock file and each process writes its own tmp file.
+        """
+        if not self.path or not self._dirty:
+            return
+        with locked_file(f"{self.path}.lock"):
+            stored = self._read_disk_entries() if os.path.exists(self.path) else []
+            with self._lock:
+                # Entries only on disk count as older than everything used in this run
+                merged = OrderedDict(((source, target, text), translation)
+                                     for source, target, text, translation in stored
+                                     if (source, target, text) not in self._entries)
+                merged.update(self._entries)
+                self._entries = merged
+                self._evict()
+                entries = [[source, target, text, translation]
+                           for (source, target, text), translation in self._entries.items()]
+                self._dirty = False
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def stats(self):
+        """Return hit/miss counters for the current run"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+    def report(self):
+        stats = self.stats()
+        print(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%} hit rate), {stats['entries']} entries stored")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Return the process-wide translation cache, loading it on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
+
+
+def save_translation_cache():
+    """Persist the shared cache and print how many round-trips it saved"""
+    if _cache is None:
+        return
+    try:
+        _cache.save()
+        _cache.report()
+    except Exception as e:
+        print(f"Error saving translation cache: {str(e)}")
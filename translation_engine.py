@@ -0,0 +1,208 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import get_metrics, timed
+from translation_cache import get_translation_cache
+
+# Strings joined into one request are separated by a newline, which the
+# translator preserves line for line
+SEPARATOR = "\n"
+SKIP_VALUES = {"N/A", "nan", "Not specified"}
+
+
+class GoogleBackend:
+    """Translate through deep-translator, reusing one GoogleTranslator per thread and language pair"""
+    max_chars = 4000
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate(self, text, source, target):
+        from deep_translator import GoogleTranslator
+
+        translators = getattr(self._local, 'translators', None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source, target))
+        if translator is None:
+            translator = translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translator.translate(text)
+
+
+class StubBackend:
+    """Offline backend for tests: translates line by line from a mapping or with a prefix"""
+
+    def __init__(self, mapping=None, prefix="[en] ", max_chars=4000):
+        self.mapping = mapping or {}
+        self.prefix = prefix
+        self.max_chars = max_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text, source, target):
+        with self._lock:
+            self.calls += 1
+        return SEPARATOR.join(self.mapping.get(line, f"{self.prefix}{line}")
+                              for line in text.split(SEPARATOR))
+
+
+class CacheOnlyBackend:
+    """Offline backend for re-parsing archived pages: strings not in the cache keep their source text"""
+    max_chars = 4000
+
+    def translate(self, text, source, target):
+        return text
+
+
+class TranslationEngine:
+    """Deduplicate, pack and translate strings concurrently through a pluggable backend"""
+
+    def __init__(self, backend=None, cache=None, max_workers=4, max_retries=3, backoff=1.0):
+        self.backend = backend if backend is not None else GoogleBackend()
+        self.cache = cache if cache is not None else get_translation_cache()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_chars(self):
+        return getattr(self.backend, 'max_chars', 4000)
+
+    @staticmethod
+    def should_translate(text):
+        """Skip empty, placeholder, numeric and very short strings"""
+        if not text or not isinstance(text, str) or text.strip() in SKIP_VALUES:
+            return False
+        return not (text.isdigit() or len(text) < 2)
+
+    def _send(self, text, source, target):
+        """Call the backend with retry and exponential backoff"""
+        for attempt in range(self.max_retries):
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                with timed('translation', len(text.encode('utf-8'))):
+                    translated = self.backend.translate(text, source, target)
+                return translated if translated else text
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                print(f"Translation request failed ({str(e)}), retrying in {delay:.1f}s...")
+                get_metrics().sleep(delay, 'translation_backoff')
+
+    def _translate_long(self, text, source, target):
+        """Translate text over the size limit chunk by chunk"""
+        limit = self.max_chars
+        chunks = [text[i:i + limit] for i in range(0, len(text), limit)]
+        return ' '.join(self._send(chunk, source, target) for chunk in chunks)
+
+    def _pack(self, texts):
+        """Group texts into batches whose joined length stays under the size limit"""
+        batches = []
+        current = []
+        current_len = 0
+        for text in texts:
+            if len(text) > self.max_chars or SEPARATOR in text:
+                batches.append([text])
+                continue
+            added_len = len(text) + (len(SEPARATOR) if current else 0)
+            if current and current_len + added_len > self.max_chars:
+                batches.append(current)
+                current = []
+                current_len = 0
+                added_len = len(text)
+            current.append(text)
+            current_len += added_len
+        if current:
+            batches.append(current)
+        return batches
+
+    def _translate_batch(self, batch, source, target):
+        """Translate one packed batch, returning {original: translation}"""
+        if len(batch) == 1:
+            text = batch[0]
+            if len(text) > self.max_chars:
+                return {text: self._translate_long(text, source, target)}
+            return {text: self._send(text, source, target)}
+
+        translated = self._send(SEPARATOR.join(batch), source, target)
+        lines = translated.split(SEPARATOR)
+        if len(lines) == len(batch):
+            return {text: line.strip() or text for text, line in zip(batch, lines)}
+
+        # The translator merged or split lines, fall back to one request per string
+        print(f"Batch of {len(batch)} strings came back with {len(lines)} lines, translating individually")
+        return {text: self._send(text, source, target) for text in batch}
+
+    def translate_many(self, texts, source, target='en', failed=None):
+        """Translate a collection of strings, returning a dict of original -> translation
+
+        Strings whose request failed are returned unchanged and, if failed is a set, added to it.
+        """
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            if not self.should_translate(text):
+                results[text] = text
+                continue
+            cached = self.cache.get(text, source, target)
+            if cached is not None:
+                results[text] = cached
+            else:
+                pending.append(text)
+
+        if not pending:
+            return results
+
+        batches = self._pack(pending)
+        print(f"Translating {len(pending)} unique strings in {len(batches)} requests...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._translate_batch, batch, source, target): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    for text, translation in future.result().items():
+                        results[text] = translation
+                        if translation != text:
+                            self.cache.set(text, source, target, translation)
+                except Exception as e:
+                    print(f"Translation error: {str(e)} for batch of {len(batch)} strings")
+                    for text in batch:
+                        results[text] = text  # Keep original text if translation fails
+                    if failed is not None:
+                        failed.update(batch)
+        return results
+
+    def translate(self, text, source, target='en'):
+        """Translate a single string"""
+        return self.translate_many([text], source, target).get(text, text)
+
+    def translate_records(self, records, fields, source, target='en', failed=None):
+        """Translate the given fields of every record in place with one engine call
+
+        failed (a set) collects the original texts left untranslated because their request failed.
+        """
+        texts = [record[field] for record in records for field in fields if field in record]
+        translations = self.translate_many(texts, source, target, failed)
+        for record in records:
+            for field in fields:
+                if field in record:
+                    record[field] = translations.get(record[field], record[field])
+        return records
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_translation_engine():
+    """Return the process-wide engine backed by Google Translate"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TranslationEngine()
+        return _engine
@@ -0,0 +1,151 @@
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Ceiling in seconds for each kind of wait; a wait returns as soon as its signal holds
+WAIT_CEILINGS = {
+    'page_load': 20,
+    'angular': 20,
+    'element': 10,
+    'row_count': 10,
+    'first_row': 10,
+    'table_change': 10,
+    'url_stable': 5,
+}
+POLL_INTERVAL = 0.2
+
+# (label, seconds waited, whether the signal held before the ceiling)
+WAIT_LOG = []
+
+FIRST_ROW_SCRIPT = """
+var row = document.querySelector(arguments[0]);
+return row ? row.innerText : null;
+"""
+
+ROW_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+ANGULAR_IDLE_SCRIPT = """
+return (window.jQuery != null) && (jQuery.active === 0) &&
+       (typeof angular === 'undefined' || !angular.element(document).injector() ||
+        angular.element(document).injector().get('$http').pendingRequests.length === 0);
+"""
+
+
+def wait_until(driver, condition, label, timeout=None):
+    """Poll condition(driver) until it is truthy or the label's ceiling passes
+
+    Returns the condition's result, or None if the ceiling was reached. Every wait is
+    recorded in WAIT_LOG with the time it actually took.
+    """
+    ceiling = timeout if timeout is not None else WAIT_CEILINGS.get(label, 10)
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(
+            driver, ceiling, poll_frequency=POLL_INTERVAL,
+            ignored_exceptions=(StaleElementReferenceException,)
+        ).until(condition)
+        WAIT_LOG.append((label, time.perf_counter() - start, True))
+        return result
+    except TimeoutException:
+        WAIT_LOG.append((label, time.perf_counter() - start, False))
+        print(f"Wait for {label} reached its {ceiling}s ceiling")
+        return None
+
+
+def wait_for_page_load(driver, timeout=None):
+    """Wait for document.readyState to be complete"""
+    return wait_until(
+        driver,
+        lambda d: d.execute_script('return document.readyState') == 'complete',
+        'page_load', timeout
+    )
+
+
+def wait_for_angular(driver, timeout=None):
+    """Wait for jQuery and Angular's $http pendingRequests to drain, or for the page to load"""
+    def angular_idle(d):
+        try:
+            return d.execute_script(ANGULAR_IDLE_SCRIPT)
+        except Exception:
+            return d.execute_script('return document.readyState') == 'complete'
+    return wait_until(driver, angular_idle, 'angular', timeout)
+
+
+def count_rows(driver, selector):
+    return driver.execute_script(ROW_COUNT_SCRIPT, selector)
+
+
+def first_row_text(driver, selector):
+    """Text of the first row matching selector, used as its identity"""
+    return driver.execute_script(FIRST_ROW_SCRIPT, selector)
+
+
+def wait_for_row_count_change(driver, selector, previous_count, timeout=None):
+    """Wait until the number of rows differs from previous_count"""
+    return wait_until(
+        driver,
+        lambda d: count_rows(d, selector) != previous_count,
+        'row_count', timeout
+    )
+
+
+def wait_for_first_row_change(driver, selector, previous_text, timeout=None):
+    """Wait until the table re-renders with a different first row"""
+    def changed(d):
+        text = first_row_text(d, selector)
+        return text is not None and text != previous_text
+    return wait_until(driver, changed, 'first_row', timeout)
+
+
+def wait_for_table_change(driver, selector, previous_count, previous_text, timeout=None):
+    """Wait until rows are added or removed, or a virtualized grid re-renders a different first row"""
+    def changed(d):
+        if count_rows(d, selector) != previous_count:
+            return True
+        text = first_row_text(d, selector)
+        return text is not None and text != previous_text
+    return wait_until(driver, changed, 'table_change', timeout)
+
+
+def wait_for_rows(driver, selector, timeout=None):
+    """Wait until at least one row matching selector is rendered"""
+    return wait_until(driver, lambda d: count_rows(d, selector) > 0, 'element', timeout)
+
+
+def wait_for_url_stable(driver, settle=0.5, timeout=None):
+    """Wait until the URL stops changing, so client-side redirects have landed"""
+    state = {'url': None, 'since': time.perf_counter()}
+
+    def stable(d):
+        url = d.current_url
+        now = time.perf_counter()
+        if url != state['url']:
+            state['url'] = url
+            state['since'] = now
+            return False
+        return now - state['since'] >= settle
+    return wait_until(driver, stable, 'url_stable', timeout)
+
+
+def wait_stats():
+    """Summarize WAIT_LOG per label: count, total, max and how many hit the ceiling"""
+    stats = {}
+    for label, seconds, satisfied in WAIT_LOG:
+        entry = stats.setdefault(label, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+        entry['count'] += 1
+        entry['total'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+        if not satisfied:
+            entry['timeouts'] += 1
+    return stats
+
+
+def report_waits():
+    stats = wait_stats()
+    if not stats:
+        return
+    print("\nWait summary:")
+    for label, entry in sorted(stats.items()):
+        print(f"  {label}: {entry['count']} waits, {entry['total']:.1f}s total, "
+              f"{entry['max']:.1f}s max, {entry['timeouts']} hit the ceiling")